@@ -15,6 +15,10 @@ if [ "$CRON_MODE" = "true" ]; then
     else
         echo "=== Web 面板已关闭 ==="
     fi
+    if [ "$BROWSER_POOL" = "true" ]; then
+        echo "=== 常驻浏览器池启动 ==="
+        /usr/local/bin/python -u -m rainyun.browser.pool &
+    fi
     echo "=== 定时模式启用 ==="
     /usr/local/bin/python -u -m rainyun.scheduler.cron_sync || echo "警告: cron 同步失败"
     echo "=== cron 守护进程启动 ==="
@@ -16,16 +16,22 @@ logger = logging.getLogger(__name__)
 class RainyunAPIError(Exception):
     """雨云 API 调用异常"""
 
+    def __init__(self, message: str, code: int | None = None):
+        super().__init__(message)
+        # 服务端返回的业务错误码；网络错误等未拿到响应时为 None
+        self.code = code
+
 
 class RainyunAPI:
     """雨云 API 客户端"""
 
-    def __init__(self, api_key: str, config: Optional[Config] = None):
+    def __init__(self, api_key: str, config: Optional[Config] = None, cookies: Optional[dict] = None):
         """
         初始化 API 客户端
 
         Args:
             api_key: 雨云 API 密钥（从后台获取）
+            cookies: 浏览器登录后保存的 cookies（name -> value），无 API 密钥时以登录态访问
         """
         self.api_key = api_key
         self.config = config or get_default_config()
@@ -33,10 +39,12 @@ class RainyunAPI:
         self.request_timeout = self.config.request_timeout
         self.max_retries = self.config.max_retries
         self.retry_delay = self.config.retry_delay
+        self.cookies = cookies or None
         self.headers = {
-            "x-api-key": api_key,
             "Content-Type": "application/json",
         }
+        if api_key:
+            self.headers["x-api-key"] = api_key
 
     def _request(self, method: str, endpoint: str, data: dict | None = None) -> dict:
         """
@@ -61,11 +69,14 @@ class RainyunAPI:
         for attempt in range(1, self.max_retries + 1):
             try:
                 if method.upper() == "GET":
-                    response = requests.get(url, headers=self.headers, timeout=self.request_timeout)
+                    response = requests.get(
+                        url, headers=self.headers, cookies=self.cookies, timeout=self.request_timeout
+                    )
                 else:
                     response = requests.post(
                         url,
                         headers=self.headers,
+                        cookies=self.cookies,
                         json=data,
                         timeout=self.request_timeout,
                     )
@@ -85,7 +96,7 @@ class RainyunAPI:
 
                 if api_code != 200:
                     # 业务错误，不需要重试（如积分不足、未到续费时间等）
-                    raise RainyunAPIError(f"API 返回错误 [{api_code}]: {api_message}")
+                    raise RainyunAPIError(f"API 返回错误 [{api_code}]: {api_message}", code=api_code)
 
                 return result.get("data", {})
 
@@ -139,6 +150,16 @@ class RainyunAPI:
         # 返回格式：{"Points": 12345, ...}
         return data.get("Points", 0)
 
+    def get_reward_tasks(self) -> list:
+        """
+        获取积分任务列表
+
+        Returns:
+            任务列表，每项包含 Name（如「每日签到」）、Status、Points 等
+        """
+        data = self._request("GET", "/user/reward/tasks")
+        return data if isinstance(data, list) else []
+
     def renew_server(self, server_id: int, days: int = 7) -> dict:
         """
         使用积分续费服务器
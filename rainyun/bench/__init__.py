@@ -0,0 +1 @@
+"""离线基准测试工具。"""
@@ -0,0 +1,395 @@
+"""验证码求解离线基准：python -m rainyun.bench.captcha [样本目录]
+
+回放 save_captcha_samples 归档的样本（index.jsonl + zip 分片，也兼容旧版的
+background.jpg / sprite_N.jpg / reason.txt 目录），
+依次执行 detect_captcha_bboxes → StrategyCaptchaSolver → check_answer，
+输出各阶段耗时分位数、内存峰值与各匹配策略命中率（表格 + JSON）。
+样本带 truth.json（合成样本，见 rainyun.bench.synthetic）时另统计检测召回率与准确率；
+--synthetic N 可不落盘直接生成 N 个合成样本回放。
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Iterable, Iterator
+
+import cv2
+import numpy as np
+
+from rainyun.captcha.archive import iter_archive
+from rainyun.utils.image import EncodedImage, decode_image_bytes
+
+DEFAULT_SAMPLES_DIR = os.path.join("temp", "captcha_samples")
+
+
+@dataclass
+class CaptchaSample:
+    name: str
+    background_bytes: bytes
+    sprite_bytes: list[bytes]
+    reason: str = ""
+    # 第 i 个小图的真实位置框，仅合成样本提供
+    truth: list[tuple[int, int, int, int]] | None = None
+
+
+@dataclass
+class StageTimer:
+    samples: dict[str, list[float]] = field(default_factory=dict)
+
+    def add(self, stage: str, seconds: float) -> None:
+        self.samples.setdefault(stage, []).append(seconds)
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        result: dict[str, dict[str, float]] = {}
+        for stage, values in self.samples.items():
+            data = np.asarray(values, dtype=np.float64) * 1000
+            result[stage] = {
+                "count": int(data.size),
+                "mean_ms": float(data.mean()),
+                "p50_ms": float(np.percentile(data, 50)),
+                "p90_ms": float(np.percentile(data, 90)),
+                "p99_ms": float(np.percentile(data, 99)),
+                "max_ms": float(data.max()),
+            }
+        return result
+
+
+def _read_reason(path: str) -> str:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                key, _, value = line.strip().partition(":")
+                if key == "reason":
+                    return value
+    except OSError:
+        pass
+    return ""
+
+
+def _read_truth(path: str) -> list[tuple[int, int, int, int]] | None:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            boxes = json.load(f)["boxes"]
+        return [tuple(int(v) for v in box) for box in boxes]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def iter_samples(samples_dir: str) -> Iterator[CaptchaSample]:
+    """先遍历归档分片，再按目录名顺序遍历散落的样本目录（旧格式与合成样本）；
+
+    缺少背景图或小图的样本直接跳过。
+    """
+    if not os.path.isdir(samples_dir):
+        return
+    for sample in iter_archive(samples_dir):
+        if sample.background_bytes and len(sample.sprite_bytes) == 3:
+            yield CaptchaSample(
+                name=sample.id,
+                background_bytes=sample.background_bytes,
+                sprite_bytes=sample.sprite_bytes,
+                reason=sample.reason,
+            )
+    for name in sorted(os.listdir(samples_dir)):
+        sample_dir = os.path.join(samples_dir, name)
+        background_path = os.path.join(sample_dir, "background.jpg")
+        if not os.path.isfile(background_path):
+            continue
+        sprite_bytes: list[bytes] = []
+        for index in range(1, 4):
+            sprite_path = os.path.join(sample_dir, f"sprite_{index}.jpg")
+            if not os.path.isfile(sprite_path):
+                break
+            with open(sprite_path, "rb") as f:
+                sprite_bytes.append(f.read())
+        if len(sprite_bytes) != 3:
+            continue
+        with open(background_path, "rb") as f:
+            background_bytes = f.read()
+        yield CaptchaSample(
+            name=name,
+            background_bytes=background_bytes,
+            sprite_bytes=sprite_bytes,
+            reason=_read_reason(os.path.join(sample_dir, "reason.txt")),
+            truth=_read_truth(os.path.join(sample_dir, "truth.json")),
+        )
+
+
+def iter_synthetic_samples(count: int, seed: int = 0) -> Iterator[CaptchaSample]:
+    """在内存中生成合成样本并编码为 JPEG，与回放落盘样本走同一条解码路径。"""
+    from rainyun.bench.synthetic import iter_cases
+
+    def encode(image: np.ndarray) -> bytes:
+        ok, buffer = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, 90])
+        if not ok:
+            raise ValueError("合成样本编码失败")
+        return buffer.tobytes()
+
+    for case in iter_cases(count, seed):
+        yield CaptchaSample(
+            name=case.name,
+            background_bytes=encode(case.background),
+            sprite_bytes=[encode(sprite) for sprite in case.sprites],
+            reason="synthetic",
+            truth=case.boxes,
+        )
+
+
+def is_correct(result, truth: list[tuple[int, int, int, int]]) -> bool:
+    """每个点击坐标都落在对应小图的真实框内。"""
+    if not result or len(result.positions) != len(truth):
+        return False
+    return all(x1 <= x < x2 and y1 <= y < y2 for (x, y), (x1, y1, x2, y2) in zip(result.positions, truth))
+
+
+def _detect_recall(bboxes: list[tuple[int, int, int, int]], truth: list[tuple[int, int, int, int]]) -> int:
+    """真实框中心被某个检测框覆盖的数量。"""
+    found = 0
+    for x1, y1, x2, y2 in truth:
+        cx, cy = (x1 + x2) / 2, (y1 + y2) / 2
+        if any(bx1 <= cx < bx2 and by1 <= cy < by2 for bx1, by1, bx2, by2 in bboxes):
+            found += 1
+    return found
+
+
+def run_benchmark(
+    samples_dir: str,
+    *,
+    limit: int = 0,
+    repeat: int = 1,
+    parallel: bool = False,
+    samples: Iterable[CaptchaSample] | None = None,
+) -> dict:
+    # 延迟导入：rainyun.main 导入时会加载通知/服务器等模块
+    from rainyun.main import (
+        LazyDdddOcr,
+        StrategyCaptchaSolver,
+        build_default_matchers,
+        check_answer,
+        detect_captcha_bboxes,
+    )
+
+    ctx = SimpleNamespace(det=LazyDdddOcr(det=True))
+    matchers = build_default_matchers()
+    solver = StrategyCaptchaSolver(matchers, concurrent=parallel, accept=check_answer)
+    timer = StageTimer()
+    matcher_stats = {matcher.name: Counter() for matcher in matchers}
+    solver_stats: Counter = Counter()
+    reasons: Counter = Counter()
+    truth_stats: Counter = Counter()
+    sample_count = 0
+
+    tracemalloc.start()
+    try:
+        for sample in samples if samples is not None else iter_samples(samples_dir):
+            if limit and sample_count >= limit:
+                break
+            sample_count += 1
+            reasons[sample.reason or "unknown"] += 1
+            for _ in range(max(1, repeat)):
+                start = time.perf_counter()
+                encoded = EncodedImage(sample.background_bytes, label="验证码背景图")
+                background = encoded.array
+                sprites = [decode_image_bytes(data, "验证码小图") for data in sample.sprite_bytes]
+                timer.add("decode", time.perf_counter() - start)
+
+                start = time.perf_counter()
+                bboxes = detect_captcha_bboxes(ctx, encoded)
+                timer.add("detect", time.perf_counter() - start)
+                if sample.truth:
+                    truth_stats["runs"] += 1
+                    truth_stats["boxes"] += len(sample.truth)
+                    truth_stats["detected"] += _detect_recall(bboxes, sample.truth)
+                if not bboxes:
+                    solver_stats["no_bboxes"] += 1
+                    continue
+
+                for matcher in matchers:
+                    start = time.perf_counter()
+                    result = matcher.match(background, sprites, bboxes)
+                    timer.add(f"match:{matcher.name}", time.perf_counter() - start)
+                    stats = matcher_stats[matcher.name]
+                    stats["runs"] += 1
+                    if result:
+                        stats["results"] += 1
+                        if check_answer(result):
+                            stats["hits"] += 1
+                    if sample.truth and is_correct(result, sample.truth):
+                        stats["correct"] += 1
+
+                start = time.perf_counter()
+                result = solver.solve(background, sprites, bboxes)
+                timer.add("solve", time.perf_counter() - start)
+                solver_stats["runs"] += 1
+                if sample.truth and is_correct(result, sample.truth):
+                    solver_stats["correct"] += 1
+                if not result:
+                    continue
+                start = time.perf_counter()
+                passed = check_answer(result)
+                timer.add("check", time.perf_counter() - start)
+                if passed:
+                    solver_stats["hits"] += 1
+                    solver_stats[f"won:{result.method}"] += 1
+        _, traced_peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    labelled = truth_stats["runs"]
+    return {
+        "samples_dir": samples_dir,
+        "samples": sample_count,
+        "labelled": labelled,
+        "detect_recall": truth_stats["detected"] / truth_stats["boxes"] if truth_stats["boxes"] else None,
+        "repeat": max(1, repeat),
+        "parallel": parallel,
+        "reasons": dict(reasons),
+        "stages": timer.summary(),
+        "matchers": {
+            name: {
+                "runs": stats["runs"],
+                "results": stats["results"],
+                "hits": stats["hits"],
+                "hit_rate": stats["hits"] / stats["runs"] if stats["runs"] else 0.0,
+                "correct": stats["correct"],
+                "accuracy": stats["correct"] / labelled if labelled else None,
+            }
+            for name, stats in matcher_stats.items()
+        },
+        "solver": {
+            "runs": solver_stats["runs"],
+            "hits": solver_stats["hits"],
+            "no_bboxes": solver_stats["no_bboxes"],
+            "hit_rate": solver_stats["hits"] / solver_stats["runs"] if solver_stats["runs"] else 0.0,
+            "correct": solver_stats["correct"],
+            "accuracy": solver_stats["correct"] / labelled if labelled else None,
+            "wins": {key[4:]: value for key, value in solver_stats.items() if key.startswith("won:")},
+        },
+        "memory": {
+            "python_peak_mb": traced_peak / 1024 / 1024,
+            "max_rss_mb": _max_rss_mb(),
+        },
+    }
+
+
+def _max_rss_mb() -> float | None:
+    try:
+        import resource
+    except ImportError:
+        return None
+    # Linux 下 ru_maxrss 单位为 KB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _cell(text: object, width: int, *, left: bool = False) -> str:
+    """按显示宽度补齐（中文占两列）。"""
+    text = str(text)
+    display = sum(2 if unicodedata.east_asian_width(ch) in ("W", "F") else 1 for ch in text)
+    padding = " " * max(0, width - display)
+    return text + padding if left else padding + text
+
+
+def format_report(report: dict) -> str:
+    lines = [
+        f"样本目录: {report['samples_dir']}  样本数: {report['samples']}  重复: {report['repeat']}"
+        f"  并行策略: {'是' if report['parallel'] else '否'}",
+        "",
+        _cell("阶段", 16, left=True)
+        + "".join(_cell(title, 10) for title in ("次数", "平均", "p50", "p90", "p99", "最大"))
+        + "  (ms)",
+    ]
+    for stage, stats in report["stages"].items():
+        values = [stats[key] for key in ("mean_ms", "p50_ms", "p90_ms", "p99_ms", "max_ms")]
+        lines.append(
+            _cell(stage, 16, left=True)
+            + _cell(stats["count"], 10)
+            + "".join(_cell(f"{value:.1f}", 10) for value in values)
+        )
+    labelled = report.get("labelled", 0)
+    lines.append("")
+    titles = ("次数", "有结果", "通过校验", "命中率") + (("准确率",) if labelled else ())
+    lines.append(_cell("策略", 16, left=True) + "".join(_cell(title, 10) for title in titles))
+
+    def accuracy(stats: dict) -> str:
+        return _cell(f"{stats['accuracy']:.1%}", 10) if labelled else ""
+
+    for name, stats in report["matchers"].items():
+        lines.append(
+            _cell(name, 16, left=True)
+            + _cell(stats["runs"], 10)
+            + _cell(stats["results"], 10)
+            + _cell(stats["hits"], 10)
+            + _cell(f"{stats['hit_rate']:.1%}", 10)
+            + accuracy(stats)
+        )
+    solver = report["solver"]
+    lines.append(
+        _cell("solver", 16, left=True)
+        + _cell(solver["runs"], 10)
+        + _cell("", 10)
+        + _cell(solver["hits"], 10)
+        + _cell(f"{solver['hit_rate']:.1%}", 10)
+        + accuracy(solver)
+        + f"  无候选框: {solver['no_bboxes']}"
+    )
+    if labelled:
+        lines.append(f"带真值样本: {labelled}  检测召回率: {report['detect_recall']:.1%}")
+    memory = report["memory"]
+    rss = f"{memory['max_rss_mb']:.1f}MB" if memory["max_rss_mb"] is not None else "未知"
+    lines.append("")
+    lines.append(f"内存峰值: Python 分配 {memory['python_peak_mb']:.1f}MB，进程 RSS {rss}")
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="验证码求解离线基准")
+    parser.add_argument("samples_dir", nargs="?", default=DEFAULT_SAMPLES_DIR, help="样本目录")
+    parser.add_argument("--limit", type=int, default=0, help="最多回放的样本数（0 为全部）")
+    parser.add_argument("--repeat", type=int, default=1, help="每个样本重复次数")
+    parser.add_argument("--parallel", action="store_true", help="使用并行策略求解")
+    parser.add_argument("--synthetic", type=int, default=0, help="不读目录，改为生成 N 个合成样本")
+    parser.add_argument("--seed", type=int, default=0, help="合成样本随机种子")
+    parser.add_argument("--json", dest="json_path", default="", help="JSON 报告输出路径，- 表示标准输出")
+    parser.add_argument("--verbose", action="store_true", help="输出求解过程日志")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+    if not args.verbose:
+        # rainyun.main 导入时会把自身 logger 设为 INFO，需导入后再静音
+        import rainyun.main  # noqa: F401
+
+        logging.getLogger("rainyun.main").setLevel(logging.ERROR)
+
+    samples_dir = f"synthetic:{args.synthetic}@{args.seed}" if args.synthetic else args.samples_dir
+    report = run_benchmark(
+        samples_dir,
+        limit=args.limit,
+        repeat=args.repeat,
+        parallel=args.parallel,
+        samples=iter_synthetic_samples(args.synthetic, args.seed) if args.synthetic else None,
+    )
+    if not report["samples"]:
+        sys.stderr.write(f"未找到可用样本: {samples_dir}\n")
+        return 1
+    if args.json_path == "-":
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        print(format_report(report))
+        if args.json_path:
+            with open(args.json_path, "w", encoding="utf-8") as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,253 @@
+"""合成验证码生成器：python -m rainyun.bench.synthetic 输出目录 [--count N] [--seed S]
+
+把随机图标（多边形、圆、线条、字母）经旋转、缩放后绘制到多样的背景上，
+并加入干扰图标与噪声，同时给出每个小图对应的真实位置。第 index 个样本只由
+(seed, index) 决定，可按需生成任意数量且结果可复现，无需联网。
+
+输出目录结构与 save_captcha_samples 一致（background.jpg / sprite_N.jpg / reason.txt），
+另附 truth.json，可直接用 rainyun.bench.captcha 回放并统计准确率。
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from dataclasses import dataclass, field
+from typing import Iterator
+
+import cv2
+import numpy as np
+
+from rainyun.utils.image import split_sprite_image
+
+Box = tuple[int, int, int, int]
+
+BACKGROUND_SIZE = (672, 390)
+SPRITE_SIZE = 50
+GLYPHS = "ABCDEFGHJKLMNPQRSTUVWXYZ23456789"
+
+
+@dataclass
+class SyntheticCase:
+    name: str
+    background: np.ndarray
+    # 三个图标横向拼接的提示图，与页面上的 CAPTCHA_IMG_INSTRUCTION 一致
+    sprite_strip: np.ndarray
+    # 第 i 个框对应第 i 个小图
+    boxes: list[Box]
+    distractors: list[Box] = field(default_factory=list)
+    seed: int = 0
+    index: int = 0
+
+    @property
+    def sprites(self) -> list[np.ndarray]:
+        return split_sprite_image(self.sprite_strip)
+
+    @property
+    def positions(self) -> list[tuple[int, int]]:
+        return [((x1 + x2) // 2, (y1 + y2) // 2) for x1, y1, x2, y2 in self.boxes]
+
+    def truth(self) -> dict:
+        return {
+            "seed": self.seed,
+            "index": self.index,
+            "boxes": [list(box) for box in self.boxes],
+            "positions": [list(position) for position in self.positions],
+            "distractors": [list(box) for box in self.distractors],
+        }
+
+
+def _color(rng: np.random.Generator, low: int = 0, high: int = 256) -> tuple[int, int, int]:
+    return tuple(int(value) for value in rng.integers(low, high, 3))
+
+
+def render_icon(rng: np.random.Generator, size: int = 96) -> tuple[np.ndarray, np.ndarray]:
+    """返回 (BGR 图标, 前景掩码)，图标由 2~4 个随机图元叠加而成。"""
+    image = np.zeros((size, size, 3), dtype=np.uint8)
+    mask = np.zeros((size, size), dtype=np.uint8)
+    margin = size // 8
+    for _ in range(int(rng.integers(2, 5))):
+        color = _color(rng, 20, 236)
+        kind = int(rng.integers(0, 4))
+        layer = np.zeros_like(mask)
+        if kind == 0:
+            points = rng.integers(margin, size - margin, (int(rng.integers(3, 7)), 2)).astype(np.int32)
+            cv2.fillPoly(layer, [points], 255)
+        elif kind == 1:
+            center = tuple(int(v) for v in rng.integers(size // 3, size - size // 3, 2))
+            cv2.circle(layer, center, int(rng.integers(size // 8, size // 3)), 255, -1)
+        elif kind == 2:
+            for _ in range(int(rng.integers(2, 5))):
+                start = tuple(int(v) for v in rng.integers(margin, size - margin, 2))
+                end = tuple(int(v) for v in rng.integers(margin, size - margin, 2))
+                cv2.line(layer, start, end, 255, int(rng.integers(size // 24 + 1, size // 10 + 2)))
+        else:
+            glyph = GLYPHS[int(rng.integers(0, len(GLYPHS)))]
+            scale = size / 40
+            (text_w, text_h), _ = cv2.getTextSize(glyph, cv2.FONT_HERSHEY_SIMPLEX, scale, max(2, size // 16))
+            origin = ((size - text_w) // 2, (size + text_h) // 2)
+            cv2.putText(layer, glyph, origin, cv2.FONT_HERSHEY_SIMPLEX, scale, 255, max(2, size // 16), cv2.LINE_AA)
+        image[layer > 0] = color
+        mask = np.maximum(mask, layer)
+    return image, mask
+
+
+def render_background(rng: np.random.Generator, size: tuple[int, int] = BACKGROUND_SIZE) -> np.ndarray:
+    """渐变底色 + 模糊噪声 + 随机色块，模拟风景照片式背景。"""
+    width, height = size
+    start, end = np.array(_color(rng, 40, 220), np.float32), np.array(_color(rng, 40, 220), np.float32)
+    ramp = np.linspace(0.0, 1.0, width, dtype=np.float32)[None, :, None]
+    image = np.repeat(start + (end - start) * ramp, height, axis=0)
+    # 亮度噪声为主、少量色彩噪声，避免出现大片饱和色斑
+    shape = (height // 8 + 1, width // 8 + 1)
+    noise = rng.normal(0, float(rng.uniform(10, 35)), (*shape, 1)) + rng.normal(0, 6, (*shape, 3))
+    noise = noise.astype(np.float32)
+    image += cv2.resize(noise, (width, height), interpolation=cv2.INTER_CUBIC)
+    canvas = np.clip(image, 0, 255).astype(np.uint8)
+    for _ in range(int(rng.integers(3, 10))):
+        color = _color(rng, 30, 230)
+        x, y = int(rng.integers(0, width)), int(rng.integers(0, height))
+        axes = (int(rng.integers(20, width // 3)), int(rng.integers(10, height // 3)))
+        overlay = canvas.copy()
+        cv2.ellipse(overlay, (x, y), axes, float(rng.uniform(0, 180)), 0, 360, color, -1)
+        alpha = float(rng.uniform(0.2, 0.5))
+        canvas = cv2.addWeighted(overlay, alpha, canvas, 1.0 - alpha, 0)
+    return cv2.GaussianBlur(canvas, (0, 0), float(rng.uniform(0.5, 2.0)))
+
+
+def _transform_icon(
+    rng: np.random.Generator, icon: np.ndarray, mask: np.ndarray, side: int, max_rotation: float
+) -> tuple[np.ndarray, np.ndarray]:
+    angle = float(rng.uniform(-max_rotation, max_rotation))
+    matrix = cv2.getRotationMatrix2D((icon.shape[1] / 2, icon.shape[0] / 2), angle, 1.0)
+    rotated = cv2.warpAffine(icon, matrix, icon.shape[1::-1], flags=cv2.INTER_LINEAR)
+    rotated_mask = cv2.warpAffine(mask, matrix, mask.shape[1::-1], flags=cv2.INTER_LINEAR)
+    return (
+        cv2.resize(rotated, (side, side), interpolation=cv2.INTER_AREA),
+        cv2.resize(rotated_mask, (side, side), interpolation=cv2.INTER_AREA),
+    )
+
+
+def _place(rng: np.random.Generator, side: int, size: tuple[int, int], taken: list[Box]) -> Box | None:
+    width, height = size
+    for _ in range(200):
+        x, y = int(rng.integers(4, width - side - 4)), int(rng.integers(4, height - side - 4))
+        box = (x, y, x + side, y + side)
+        # 保留间距，避免真实框与干扰框互相重叠
+        if all(
+            x + side + 8 <= bx1 or bx2 + 8 <= x or y + side + 8 <= by1 or by2 + 8 <= y
+            for bx1, by1, bx2, by2 in taken
+        ):
+            return box
+    return None
+
+
+def _paste(canvas: np.ndarray, icon: np.ndarray, mask: np.ndarray, box: Box) -> None:
+    x1, y1, x2, y2 = box
+    alpha = (mask.astype(np.float32) / 255.0)[:, :, None]
+    region = canvas[y1:y2, x1:x2].astype(np.float32)
+    canvas[y1:y2, x1:x2] = (icon * alpha + region * (1 - alpha)).astype(np.uint8)
+
+
+def generate_case(
+    seed: int,
+    index: int,
+    *,
+    size: tuple[int, int] = BACKGROUND_SIZE,
+    distractors: tuple[int, int] = (0, 3),
+    scale: tuple[float, float] = (1.0, 1.6),
+    max_rotation: float = 30.0,
+    noise: float = 6.0,
+) -> SyntheticCase:
+    """生成第 index 个样本，相同 (seed, index, 参数) 总得到相同结果。"""
+    rng = np.random.default_rng([seed, index])
+    background = render_background(rng, size)
+    icons = [render_icon(rng) for _ in range(3)]
+    taken: list[Box] = []
+    boxes: list[Box] = []
+    for icon, mask in icons:
+        side = int(SPRITE_SIZE * rng.uniform(*scale))
+        box = _place(rng, side, size, taken)
+        if box is None:
+            raise RuntimeError(f"无法放置图标: seed={seed} index={index}")
+        _paste(background, *_transform_icon(rng, icon, mask, side, max_rotation), box)
+        taken.append(box)
+        boxes.append(box)
+    distractor_boxes: list[Box] = []
+    for _ in range(int(rng.integers(distractors[0], distractors[1] + 1))):
+        side = int(SPRITE_SIZE * rng.uniform(*scale))
+        box = _place(rng, side, size, taken)
+        if box is None:
+            break
+        icon, mask = render_icon(rng)
+        _paste(background, *_transform_icon(rng, icon, mask, side, max_rotation), box)
+        taken.append(box)
+        distractor_boxes.append(box)
+    if noise > 0:
+        background = np.clip(background + rng.normal(0, noise, background.shape), 0, 255).astype(np.uint8)
+
+    strip = np.full((SPRITE_SIZE, SPRITE_SIZE * 3, 3), 255, dtype=np.uint8)
+    for position, (icon, mask) in enumerate(icons):
+        small = cv2.resize(icon, (SPRITE_SIZE, SPRITE_SIZE), interpolation=cv2.INTER_AREA)
+        small_mask = cv2.resize(mask, (SPRITE_SIZE, SPRITE_SIZE), interpolation=cv2.INTER_AREA)
+        offset = position * SPRITE_SIZE
+        _paste(strip, small, small_mask, (offset, 0, offset + SPRITE_SIZE, SPRITE_SIZE))
+    return SyntheticCase(
+        name=f"synthetic-{seed}-{index:05d}",
+        background=background,
+        sprite_strip=strip,
+        boxes=boxes,
+        distractors=distractor_boxes,
+        seed=seed,
+        index=index,
+    )
+
+
+def iter_cases(count: int, seed: int = 0, *, start: int = 0, **options) -> Iterator[SyntheticCase]:
+    for index in range(start, start + count):
+        yield generate_case(seed, index, **options)
+
+
+def write_case(case: SyntheticCase, out_dir: str, *, jpeg_quality: int = 90) -> str:
+    sample_dir = os.path.join(out_dir, case.name)
+    os.makedirs(sample_dir, exist_ok=True)
+    params = [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality]
+    cv2.imwrite(os.path.join(sample_dir, "background.jpg"), case.background, params)
+    for index, sprite in enumerate(case.sprites, start=1):
+        cv2.imwrite(os.path.join(sample_dir, f"sprite_{index}.jpg"), sprite, params)
+    with open(os.path.join(sample_dir, "reason.txt"), "w", encoding="utf-8") as f:
+        f.write("reason:synthetic\n")
+    with open(os.path.join(sample_dir, "truth.json"), "w", encoding="utf-8") as f:
+        json.dump(case.truth(), f)
+    return sample_dir
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="生成合成验证码样本")
+    parser.add_argument("out_dir", help="输出目录")
+    parser.add_argument("--count", type=int, default=100, help="样本数")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    parser.add_argument("--start", type=int, default=0, help="起始序号（分批生成时使用）")
+    parser.add_argument("--max-distractors", type=int, default=3, help="每张背景最多的干扰图标数")
+    parser.add_argument("--max-rotation", type=float, default=30.0, help="最大旋转角度")
+    parser.add_argument("--noise", type=float, default=6.0, help="高斯噪声标准差")
+    parser.add_argument("--quality", type=int, default=90, help="JPEG 质量")
+    args = parser.parse_args(argv)
+
+    for case in iter_cases(
+        args.count,
+        args.seed,
+        start=args.start,
+        distractors=(0, max(0, args.max_distractors)),
+        max_rotation=args.max_rotation,
+        noise=args.noise,
+    ):
+        write_case(case, args.out_dir, jpeg_quality=args.quality)
+    print(f"已生成 {args.count} 个样本: {args.out_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+"""推理线程数基准：python -m rainyun.bench.threads [样本目录]
+
+依次以不同线程数（1、2、4…直至可用 CPU 数）执行 detect → classification_batch
+→ 匹配，输出每种设置的耗时分位数，并给出当前主机推荐的 inference_threads。
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sys
+import time
+from types import SimpleNamespace
+
+import cv2
+
+from rainyun.bench.captcha import DEFAULT_SAMPLES_DIR, StageTimer, _cell, iter_samples
+from rainyun.captcha.models import apply_thread_profile, available_cpus
+from rainyun.utils.image import EncodedImage, decode_image_bytes
+
+
+def candidate_threads(max_threads: int) -> list[int]:
+    """1、2、4… 翻倍直至上限，并包含上限本身。"""
+    candidates: list[int] = []
+    value = 1
+    while value < max_threads:
+        candidates.append(value)
+        value *= 2
+    candidates.append(max(1, max_threads))
+    return candidates
+
+
+def run_thread_benchmark(samples_dir: str, *, limit: int = 0, repeat: int = 3, max_threads: int = 0) -> dict:
+    # 延迟导入：rainyun.main 导入时会加载通知/服务器等模块
+    from rainyun.main import LazyDdddOcr, build_default_matchers, detect_captcha_bboxes
+
+    samples = []
+    for sample in iter_samples(samples_dir):
+        if limit and len(samples) >= limit:
+            break
+        samples.append(sample)
+    if not samples:
+        return {"samples_dir": samples_dir, "samples": 0, "settings": {}, "recommended": None}
+
+    ctx = SimpleNamespace(det=LazyDdddOcr(det=True))
+    ocr = LazyDdddOcr(det=False)
+    matchers = build_default_matchers()
+    cpus = available_cpus()
+    settings: dict[str, dict] = {}
+    for threads in candidate_threads(max_threads or cpus):
+        apply_thread_profile(threads)
+        timer = StageTimer()
+        # 每种设置先跑一遍不计时，排除首次加载与会话重建的开销
+        for warmup in (True, False):
+            for sample in samples:
+                for _ in range(1 if warmup else max(1, repeat)):
+                    total_start = time.perf_counter()
+                    encoded = EncodedImage(sample.background_bytes, label="验证码背景图")
+                    background = encoded.array
+                    sprites = [decode_image_bytes(data, "验证码小图") for data in sample.sprite_bytes]
+
+                    start = time.perf_counter()
+                    bboxes = detect_captcha_bboxes(ctx, encoded)
+                    detect_seconds = time.perf_counter() - start
+
+                    start = time.perf_counter()
+                    ocr.classification_batch(sample.sprite_bytes)
+                    classify_seconds = time.perf_counter() - start
+
+                    start = time.perf_counter()
+                    if bboxes:
+                        for matcher in matchers:
+                            matcher.match(background, sprites, bboxes)
+                    match_seconds = time.perf_counter() - start
+                    if warmup:
+                        continue
+                    timer.add("detect", detect_seconds)
+                    timer.add("classify", classify_seconds)
+                    timer.add("match", match_seconds)
+                    timer.add("total", time.perf_counter() - total_start)
+        settings[str(threads)] = timer.summary()
+
+    recommended = min(settings, key=lambda key: settings[key]["total"]["p50_ms"])
+    return {
+        "samples_dir": samples_dir,
+        "samples": len(samples),
+        "repeat": max(1, repeat),
+        "available_cpus": cpus,
+        "settings": settings,
+        "recommended": recommended,
+    }
+
+
+def format_report(report: dict) -> str:
+    lines = [
+        f"样本目录: {report['samples_dir']}  样本数: {report['samples']}  重复: {report['repeat']}"
+        f"  可用 CPU: {report['available_cpus']}",
+        "",
+        _cell("线程数", 10, left=True)
+        + "".join(_cell(title, 12) for title in ("detect p50", "classify", "match p50", "总计 p50", "总计 p90"))
+        + "  (ms)",
+    ]
+    for threads, stages in report["settings"].items():
+        lines.append(
+            _cell(threads, 10, left=True)
+            + _cell(f"{stages['detect']['p50_ms']:.1f}", 12)
+            + _cell(f"{stages['classify']['p50_ms']:.1f}", 12)
+            + _cell(f"{stages['match']['p50_ms']:.1f}", 12)
+            + _cell(f"{stages['total']['p50_ms']:.1f}", 12)
+            + _cell(f"{stages['total']['p90_ms']:.1f}", 12)
+        )
+    lines.append("")
+    lines.append(f"推荐设置: inference_threads = {report['recommended']}")
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="推理线程数基准")
+    parser.add_argument("samples_dir", nargs="?", default=DEFAULT_SAMPLES_DIR, help="样本目录")
+    parser.add_argument("--limit", type=int, default=20, help="最多使用的样本数（0 为全部）")
+    parser.add_argument("--repeat", type=int, default=3, help="每个样本重复次数")
+    parser.add_argument("--max-threads", type=int, default=0, help="测试的最大线程数（默认为可用 CPU 数）")
+    parser.add_argument("--json", dest="json_path", default="", help="JSON 报告输出路径，- 表示标准输出")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    import rainyun.main  # noqa: F401
+
+    logging.getLogger("rainyun.main").setLevel(logging.ERROR)
+    logging.getLogger("rainyun.captcha.models").setLevel(logging.WARNING)
+
+    previous_threads = cv2.getNumThreads()
+    try:
+        report = run_thread_benchmark(
+            args.samples_dir, limit=args.limit, repeat=args.repeat, max_threads=args.max_threads
+        )
+    finally:
+        cv2.setNumThreads(previous_threads)
+    if not report["samples"]:
+        sys.stderr.write(f"未找到可用样本: {args.samples_dir}\n")
+        return 1
+    if args.json_path == "-":
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        print(format_report(report))
+        if args.json_path:
+            with open(args.json_path, "w", encoding="utf-8") as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""从浏览器会话取回已加载资源的字节，避免重复下载。"""
+
+import base64
+import json
+import logging
+from collections import OrderedDict
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.webdriver import WebDriver
+
+logger = logging.getLogger(__name__)
+
+# 在当前 frame 内读取资源：force-cache 优先命中浏览器 HTTP 缓存，不产生新请求
+_FETCH_SCRIPT = """
+const url = arguments[0];
+const done = arguments[arguments.length - 1];
+fetch(url, {cache: "force-cache", credentials: "include"})
+  .then((response) => {
+    if (!response.ok) {
+      throw new Error("status " + response.status);
+    }
+    return response.arrayBuffer();
+  })
+  .then((buffer) => {
+    const bytes = new Uint8Array(buffer);
+    let binary = "";
+    for (let i = 0; i < bytes.length; i += 0x8000) {
+      binary += String.fromCharCode.apply(null, bytes.subarray(i, i + 0x8000));
+    }
+    done({ok: true, data: btoa(binary)});
+  })
+  .catch((error) => done({ok: false, error: String(error)}));
+"""
+
+
+def enable_network_capture(options: Options) -> None:
+    """开启 chromedriver 性能日志，用于记录图片响应的 requestId。
+
+    日志覆盖整个会话的网络事件，有额外开销，因此 captcha_capture 默认关闭。
+    """
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
+
+
+class ResourceCapture:
+    """按 URL 取回浏览器已加载的图片。
+
+    依次尝试：性能日志中的 requestId + CDP Network.getResponseBody；
+    当前 frame 内 fetch（命中 HTTP 缓存）。都失败时返回 None，由调用方回退为 HTTP 下载。
+    """
+
+    def __init__(self, driver: WebDriver, *, max_entries: int = 64) -> None:
+        self._driver = driver
+        self._max_entries = max_entries
+        self._request_ids: OrderedDict[str, str] = OrderedDict()
+        self._log_available = True
+
+    def _drain_performance_log(self) -> None:
+        if not self._log_available:
+            return
+        try:
+            entries = self._driver.get_log("performance")
+        except WebDriverException:
+            # 会话未开启性能日志，后续不再尝试
+            self._log_available = False
+            return
+        for entry in entries:
+            try:
+                message = json.loads(entry["message"])["message"]
+            except (KeyError, TypeError, ValueError):
+                continue
+            if message.get("method") != "Network.responseReceived":
+                continue
+            params = message.get("params") or {}
+            response = params.get("response") or {}
+            mime_type = str(response.get("mimeType") or "")
+            if params.get("type") != "Image" and not mime_type.startswith("image/"):
+                continue
+            url = response.get("url")
+            request_id = params.get("requestId")
+            if not url or not request_id:
+                continue
+            self._request_ids[url] = request_id
+            self._request_ids.move_to_end(url)
+            while len(self._request_ids) > self._max_entries:
+                self._request_ids.popitem(last=False)
+
+    def from_network(self, url: str) -> bytes | None:
+        self._drain_performance_log()
+        request_id = self._request_ids.get(url)
+        if not request_id:
+            return None
+        try:
+            body = self._driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+        except WebDriverException as e:
+            # 跨进程 iframe 的请求或已被浏览器回收的响应体无法读取
+            logger.debug(f"读取响应体失败: {e}")
+            return None
+        data = body.get("body") or ""
+        if not data or not body.get("base64Encoded"):
+            return None
+        return base64.b64decode(data)
+
+    def from_page(self, url: str) -> bytes | None:
+        try:
+            result = self._driver.execute_async_script(_FETCH_SCRIPT, url)
+        except WebDriverException as e:
+            logger.debug(f"页面内读取资源失败: {e}")
+            return None
+        if not isinstance(result, dict) or not result.get("ok"):
+            logger.debug(f"页面内读取资源失败: {result}")
+            return None
+        return base64.b64decode(result.get("data") or "")
+
+    def capture(self, url: str) -> tuple[bytes, str] | None:
+        """返回 (字节, 来源)，来源为 cdp 或 page。"""
+        for source, reader in (("cdp", self.from_network), ("page", self.from_page)):
+            data = reader(url)
+            if data:
+                return data, source
+        return None
@@ -1,9 +1,14 @@
-"""Cookies 读写。"""
+"""Cookies 读写。
+
+每个账户一个会话文件，除 cookies 外记录签发时间、最近确认有效的时间与失效标记：
+已知失效或登录 cookie 已过期的会话不再打开页面验证，直接走登录流程。
+"""
 
 import json
 import logging
 import os
 import time
+from dataclasses import asdict, dataclass
 
 from selenium.webdriver.chrome.webdriver import WebDriver
 
@@ -12,36 +17,147 @@ from rainyun.browser.urls import build_app_url
 
 logger = logging.getLogger(__name__)
 
+SESSION_VERSION = 2
+# 承载登录态的 cookie；未找到时不按过期时间判断，交由页面检查
+AUTH_COOKIE_NAMES = ("rain-session",)
+
 
 def _user_prefix(config: Config) -> str:
     user = config.display_name or config.rainyun_user
     return f"用户 {user} " if user else ""
 
 
-def save_cookies(driver: WebDriver, config: Config) -> None:
-    """保存 cookies 到文件。"""
-    prefix = _user_prefix(config)
-    cookies = driver.get_cookies()
+@dataclass
+class StoredSession:
+    cookies: list[dict]
+    # 登录获得 cookies 的时间；旧版纯列表文件取文件修改时间
+    issued_at: float
+    # 最近一次确认 cookies 仍然有效的时间，0 表示从未确认
+    validated_at: float = 0.0
+    # 最近一次使用时已失效；再次登录前不再尝试
+    stale: bool = False
+    # 最近一次 HTTP 预检接口接受该 cookies 的时间；不代表网页端路由守卫会放行，不计入确认时间
+    probed_at: float = 0.0
+
+    @property
+    def expired(self) -> bool:
+        """登录 cookie 已过期；不存在或没有过期时间（会话 cookie）时返回 False。"""
+        expiries = [
+            cookie["expiry"]
+            for cookie in self.cookies
+            if cookie.get("name") in AUTH_COOKIE_NAMES and isinstance(cookie.get("expiry"), (int, float))
+        ]
+        return bool(expiries) and min(expiries) <= time.time()
+
+
+def _age_text(stored: StoredSession) -> str:
+    def hours(ts: float) -> str:
+        return f"{(time.time() - ts) / 3600:.1f} 小时前"
+
+    validated = hours(stored.validated_at) if stored.validated_at else "未确认"
+    return f"签发于 {hours(stored.issued_at)}，上次确认 {validated}"
+
+
+def read_session(config: Config) -> StoredSession | None:
+    """读取会话文件；不存在时返回 None，内容损坏时抛出 json.JSONDecodeError。"""
+    if not os.path.exists(config.cookie_file):
+        return None
+    with open(config.cookie_file, "r") as f:
+        raw = json.load(f)
+    if isinstance(raw, list):
+        return StoredSession(cookies=raw, issued_at=os.path.getmtime(config.cookie_file))
+    if not isinstance(raw, dict) or not isinstance(raw.get("cookies"), list):
+        raise json.JSONDecodeError("会话文件格式不正确", "", 0)
+    return StoredSession(
+        cookies=raw["cookies"],
+        issued_at=float(raw.get("issued_at", 0) or 0),
+        validated_at=float(raw.get("validated_at", 0) or 0),
+        stale=bool(raw.get("stale", False)),
+        probed_at=float(raw.get("probed_at", 0) or 0),
+    )
+
+
+def write_session(config: Config, session: StoredSession) -> None:
     cookie_dir = os.path.dirname(config.cookie_file)
     if cookie_dir:
         os.makedirs(cookie_dir, exist_ok=True)
-    with open(config.cookie_file, "w") as f:
-        json.dump(cookies, f)
+    temp_path = f"{config.cookie_file}.tmp"
+    with open(temp_path, "w") as f:
+        json.dump({"version": SESSION_VERSION, **asdict(session)}, f)
+    os.replace(temp_path, config.cookie_file)
+
+
+def save_cookies(driver: WebDriver, config: Config) -> None:
+    """登录成功后保存 cookies，作为新会话记录签发与确认时间。"""
+    prefix = _user_prefix(config)
+    now = time.time()
+    write_session(config, StoredSession(cookies=driver.get_cookies(), issued_at=now, validated_at=now))
     logger.info(f"{prefix}Cookies 已保存到 {config.cookie_file}")
 
 
+def mark_session_valid(driver: WebDriver, config: Config) -> None:
+    """cookies 登录成功：刷新确认时间并保存服务端可能续期的新 cookies，签发时间不变。"""
+    prefix = _user_prefix(config)
+    try:
+        stored = read_session(config)
+        issued_at = stored.issued_at if stored else time.time()
+        probed_at = stored.probed_at if stored else 0.0
+        write_session(
+            config,
+            StoredSession(
+                cookies=driver.get_cookies(), issued_at=issued_at, validated_at=time.time(), probed_at=probed_at
+            ),
+        )
+    except Exception as e:
+        logger.warning(f"{prefix}更新会话记录失败: {e}")
+
+
+def mark_session_probed(config: Config) -> None:
+    """HTTP 预检接口接受了 cookies：只记录预检时间，确认时间与失效标记仍以浏览器检查为准。"""
+    prefix = _user_prefix(config)
+    try:
+        stored = read_session(config)
+        if stored is None:
+            return
+        stored.probed_at = time.time()
+        write_session(config, stored)
+    except Exception as e:
+        logger.warning(f"{prefix}更新会话记录失败: {e}")
+
+
+def mark_session_stale(config: Config) -> None:
+    """cookies 已失效：保留文件但标记为失效，下次运行直接走登录流程。"""
+    prefix = _user_prefix(config)
+    try:
+        stored = read_session(config)
+        if stored is None or stored.stale:
+            return
+        stored.stale = True
+        write_session(config, stored)
+    except Exception as e:
+        logger.warning(f"{prefix}标记会话失效失败: {e}")
+
+
 def load_cookies(driver: WebDriver, config: Config) -> bool:
     """从文件加载 cookies。"""
     prefix = _user_prefix(config)
-    if not os.path.exists(config.cookie_file):
-        logger.info(f"{prefix}未找到 cookies 文件")
-        return False
     try:
-        with open(config.cookie_file, "r") as f:
-            cookies = json.load(f)
+        stored = read_session(config)
+        if stored is None or not stored.cookies:
+            logger.info(f"{prefix}未找到 cookies 文件")
+            return False
+        # 已知失效的会话不再打开页面验证
+        if stored.stale:
+            logger.info(f"{prefix}Cookies 上次使用时已失效，跳过")
+            return False
+        if stored.expired:
+            logger.info(f"{prefix}登录 Cookie 已过期，跳过")
+            mark_session_stale(config)
+            return False
         # 先访问域名以便设置 cookie
         driver.get(build_app_url(config, "/"))
-        for cookie in cookies:
+        for cookie in stored.cookies:
+            cookie = dict(cookie)
             # 移除可能导致问题的字段
             cookie.pop("sameSite", None)
             cookie.pop("expiry", None)
@@ -49,7 +165,7 @@ def load_cookies(driver: WebDriver, config: Config) -> bool:
                 driver.add_cookie(cookie)
             except Exception as e:
                 logger.warning(f"{prefix}添加 cookie 失败: {e}")
-        logger.info(f"{prefix}Cookies 已加载")
+        logger.info(f"{prefix}Cookies 已加载（{_age_text(stored)}）")
         return True
     except json.JSONDecodeError as e:
         backup_path = f"{config.cookie_file}.bad-{time.strftime('%Y%m%d-%H%M%S')}"
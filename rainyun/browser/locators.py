@@ -11,6 +11,8 @@ XPATH_CONFIG = {
     "SIGN_IN_HEADER": "//div[contains(@class, 'card-header') and .//span[contains(normalize-space(.), '每日签到')]]",
     # “每日签到”按钮：兼容 a/button 标签与常见文案变体
     "SIGN_IN_BTN": "//div[contains(@class, 'card-header') and .//span[contains(normalize-space(.), '每日签到')]]//*[self::a or self::button][contains(normalize-space(.), '领取奖励') or contains(normalize-space(.), '去完成') or contains(normalize-space(.), '去签到')]",
+    # 侧栏中的奖励页菜单链接（仅登录后渲染）
+    "REWARD_MENU_LINK": "//a[contains(@href, '/account/reward/earn')]",
     # 验证码相关定位符统一为 (By, selector) 结构，避免 ID/XPath 混用
     "CAPTCHA_SUBMIT": (By.XPATH, "//div[@id='tcStatus']/div[2]/div[2]/div/div"),
     "CAPTCHA_RELOAD": (By.ID, "reload"),
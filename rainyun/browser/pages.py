@@ -10,7 +10,7 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.wait import WebDriverWait
 
-from rainyun.browser.cookies import save_cookies
+from rainyun.browser.cookies import mark_session_stale, mark_session_valid, save_cookies
 from rainyun.browser.locators import XPATH_CONFIG
 from rainyun.browser.session import RuntimeContext
 from rainyun.browser.urls import build_app_url
@@ -23,23 +23,36 @@ class LoginPage:
     _LOGIN_MAX_ATTEMPTS = 2
     _LOGIN_REDIRECT_WAIT_SECONDS = 20
     _LOGIN_CAPTCHA_WAIT_SECONDS = 8
+    _LOGIN_CHECK_WAIT_SECONDS = 10
 
     def __init__(self, ctx: RuntimeContext, captcha_handler: CaptchaHandler) -> None:
         self.ctx = ctx
         self.captcha_handler = captcha_handler
 
     def check_login_status(self) -> bool:
-        """检查是否已登录。"""
+        """检查是否已登录。
+
+        打开 dashboard 后等待路由守卫给出结果：跳转登录页，或渲染出仅登录后可见的菜单；
+        超时则按当前 URL 判断。
+        """
         user_label = self.ctx.config.display_name or self.ctx.config.rainyun_user
         self.ctx.driver.get(build_app_url(self.ctx.config, "/dashboard"))
-        time.sleep(3)
+        try:
+            WebDriverWait(self.ctx.driver, self._LOGIN_CHECK_WAIT_SECONDS, poll_frequency=0.2).until(
+                lambda driver: "login" in driver.current_url
+                or driver.find_elements(By.XPATH, XPATH_CONFIG["REWARD_MENU_LINK"])
+            )
+        except TimeoutException:
+            pass
         # 如果跳转到登录页面，说明 cookie 失效
         if "login" in self.ctx.driver.current_url:
             logger.info(f"用户 {user_label} Cookie 已失效，需要重新登录")
+            mark_session_stale(self.ctx.config)
             return False
         # 检查是否成功加载 dashboard
         if self.ctx.driver.current_url == build_app_url(self.ctx.config, "/dashboard"):
             logger.info(f"用户 {user_label} Cookie 有效，已登录")
+            mark_session_valid(self.ctx.driver, self.ctx.config)
             return True
         return False
 
@@ -125,7 +138,7 @@ class LoginPage:
 class RewardPage:
     _REWARD_PAGE_PATH = "/account/reward/earn"
     _REWARD_PAGE_URL_WAIT_SECONDS = 8
-    _REWARD_PAGE_MENU_XPATH = "//a[contains(@href, '/account/reward/earn')]"
+    _REWARD_PAGE_MENU_XPATH = XPATH_CONFIG["REWARD_MENU_LINK"]
     _DAILY_SIGN_CLAIM_TEXTS = ("领取奖励", "去完成", "去签到")
     _DAILY_SIGN_CLAIM_XPATH = "//*[self::a or self::button][contains(normalize-space(.), '领取奖励') or contains(normalize-space(.), '去完成') or contains(normalize-space(.), '去签到')]"
     # 只在“每日签到”模块内匹配这些文案，避免“已完成”在其他任务卡片出现导致误判
@@ -0,0 +1,518 @@
+"""常驻浏览器池：python -m rainyun.browser.pool
+
+定时模式下每次 cron 触发都是新进程，冷启动 Chrome 需要数秒且内存峰值较高。
+启用 BROWSER_POOL 后由本守护进程预先启动 BROWSER_POOL_SIZE 个 headless Chrome
+（开启远程调试端口），cron 进程经本地套接字租用其中一个，chromedriver 以
+debuggerAddress 方式接管，用完清理状态后归还。
+
+浏览器使用 BROWSER_POOL_MAX_USES 次后，或进程树常驻内存超过 BROWSER_POOL_MAX_RSS_MB
+时回收重启；租用方断开连接（进程崩溃）时按异常归还处理。反检测脚本按 CDP 会话注册，
+由租用方每次接管后重新注入。
+"""
+
+import itertools
+import logging
+import multiprocessing
+import os
+import secrets
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+ADDRESS_ENV = "BROWSER_POOL_ADDRESS"
+SIZE_ENV = "BROWSER_POOL_SIZE"
+MAX_USES_ENV = "BROWSER_POOL_MAX_USES"
+MAX_RSS_ENV = "BROWSER_POOL_MAX_RSS_MB"
+
+DEFAULT_ADDRESS = "/tmp/rainyun-browser-pool.sock"
+DEFAULT_SIZE = 1
+DEFAULT_MAX_USES = 20
+DEFAULT_MAX_RSS_MB = 800
+
+LEASE_TIMEOUT = 120.0
+START_TIMEOUT = 30.0
+MONITOR_INTERVAL = 60.0
+
+OP_LEASE = "lease"
+OP_RELEASE = "release"
+OP_STATS = "stats"
+
+CHROME_CANDIDATES = ("chromium", "chromium-browser", "google-chrome", "google-chrome-stable")
+
+
+def pool_address() -> str:
+    return os.environ.get(ADDRESS_ENV, "").strip() or DEFAULT_ADDRESS
+
+
+def _key_path(address: str) -> str:
+    return f"{address}.key"
+
+
+def _read_int_env(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, "").strip() or default)
+    except ValueError:
+        logger.warning(f"{name} 不是整数，使用默认值 {default}")
+        return default
+
+
+# ---------------------------------------------------------------------------
+# 进程与内存
+# ---------------------------------------------------------------------------
+
+
+def _children(pid: int) -> list[int]:
+    children: list[int] = []
+    for name in os.listdir("/proc"):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{name}/stat", "r") as f:
+                # comm 字段可能含空格，取最后一个右括号之后的字段
+                fields = f.read().rsplit(")", 1)[1].split()
+        except (OSError, IndexError):
+            continue
+        if int(fields[1]) == pid:
+            children.append(int(name))
+    return children
+
+
+def process_tree_rss_mb(pid: int) -> float:
+    """进程及其全部子进程的常驻内存之和（MB），读取 /proc，非 Linux 返回 0。"""
+    if not os.path.isdir("/proc"):
+        return 0.0
+    total_kb = 0
+    pending = [pid]
+    seen: set[int] = set()
+    while pending:
+        current = pending.pop()
+        if current in seen:
+            continue
+        seen.add(current)
+        try:
+            with open(f"/proc/{current}/status", "r") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total_kb += int(line.split()[1])
+                        break
+        except (OSError, ValueError):
+            continue
+        pending.extend(_children(current))
+    return total_kb / 1024
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _resolve_chrome_binary(chrome_bin: str) -> str:
+    if chrome_bin and os.path.exists(chrome_bin):
+        return chrome_bin
+    for name in CHROME_CANDIDATES:
+        path = shutil.which(name)
+        if path:
+            return path
+    raise FileNotFoundError("未找到 Chrome/Chromium，请设置 CHROME_BIN")
+
+
+# ---------------------------------------------------------------------------
+# 服务端（运行在浏览器池守护进程内）
+# ---------------------------------------------------------------------------
+
+
+class PooledBrowser:
+    def __init__(self, browser_id: int, process: subprocess.Popen, port: int, user_data_dir: str) -> None:
+        self.id = browser_id
+        self.process = process
+        self.port = port
+        self.user_data_dir = user_data_dir
+        self.uses = 0
+        self.launched_at = time.time()
+        self.leased = False
+
+    @property
+    def debugger_address(self) -> str:
+        return f"127.0.0.1:{self.port}"
+
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def rss_mb(self) -> float:
+        return process_tree_rss_mb(self.process.pid) if self.alive() else 0.0
+
+    def stop(self) -> None:
+        if self.alive():
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait(timeout=5)
+        shutil.rmtree(self.user_data_dir, ignore_errors=True)
+
+
+class BrowserPool:
+    def __init__(
+        self,
+        config: Any,
+        *,
+        size: int = DEFAULT_SIZE,
+        max_uses: int = DEFAULT_MAX_USES,
+        max_rss_mb: int = DEFAULT_MAX_RSS_MB,
+    ) -> None:
+        self.config = config
+        self.size = max(1, size)
+        self.max_uses = max(0, max_uses)
+        self.max_rss_mb = max(0, max_rss_mb)
+        self._browsers: list[PooledBrowser] = []
+        self._cond = threading.Condition()
+        self._ids = itertools.count(1)
+        self._leases = 0
+        self._recycled = 0
+
+    def start(self) -> None:
+        for _ in range(self.size):
+            self._browsers.append(self._launch())
+        threading.Thread(target=self._monitor_loop, name="browser-pool-monitor", daemon=True).start()
+
+    def _launch(self) -> PooledBrowser:
+        # 延迟导入：session 模块导入本模块的客户端部分
+        from rainyun.browser.session import chrome_arguments
+
+        binary = _resolve_chrome_binary(self.config.chrome_bin)
+        port = _free_port()
+        user_data_dir = tempfile.mkdtemp(prefix="rainyun-pool-")
+        command = [
+            binary,
+            *chrome_arguments(self.config, True),
+            f"--remote-debugging-port={port}",
+            "--remote-debugging-address=127.0.0.1",
+            f"--user-data-dir={user_data_dir}",
+            "--no-first-run",
+            "--password-store=basic",
+            "about:blank",
+        ]
+        process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        browser = PooledBrowser(next(self._ids), process, port, user_data_dir)
+        deadline = time.monotonic() + START_TIMEOUT
+        while time.monotonic() < deadline:
+            if not browser.alive():
+                break
+            try:
+                with urllib.request.urlopen(f"http://{browser.debugger_address}/json/version", timeout=2):
+                    logger.info(f"常驻浏览器 #{browser.id} 已启动 (pid={process.pid}, port={port})")
+                    return browser
+            except OSError:
+                time.sleep(0.2)
+        browser.stop()
+        raise RuntimeError(f"常驻浏览器启动失败（{START_TIMEOUT:.0f} 秒内未开放调试端口）")
+
+    def _replace(self, browser: PooledBrowser, reason: str) -> PooledBrowser:
+        """回收并重启，新浏览器沿用原槽位与租用状态；重启失败时抛出，原槽位保留待下次重试。"""
+        logger.info(f"回收常驻浏览器 #{browser.id}: {reason}")
+        browser.stop()
+        self._recycled += 1
+        fresh = self._launch()
+        with self._cond:
+            fresh.leased = browser.leased
+            self._browsers[self._browsers.index(browser)] = fresh
+        return fresh
+
+    def lease(self, timeout: float = LEASE_TIMEOUT) -> PooledBrowser:
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                browser = next((item for item in self._browsers if not item.leased), None)
+                if browser is not None:
+                    browser.leased = True
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError("等待空闲浏览器超时")
+                self._cond.wait(remaining)
+        if not browser.alive():
+            try:
+                browser = self._replace(browser, "进程已退出")
+            except Exception:
+                self._return(browser)
+                raise
+        self._leases += 1
+        return browser
+
+    def release(self, browser_id: int, healthy: bool) -> bool:
+        with self._cond:
+            browser = next((item for item in self._browsers if item.id == browser_id and item.leased), None)
+        if browser is None:
+            return False
+        browser.uses += 1
+        reason = ""
+        if not healthy:
+            reason = "租用方报告异常"
+        elif not browser.alive():
+            reason = "进程已退出"
+        elif self.max_uses and browser.uses >= self.max_uses:
+            reason = f"已使用 {browser.uses} 次"
+        elif self.max_rss_mb:
+            rss = browser.rss_mb()
+            if rss > self.max_rss_mb:
+                reason = f"内存 {rss:.0f} MB 超过上限 {self.max_rss_mb} MB"
+        if reason:
+            try:
+                browser = self._replace(browser, reason)
+            except Exception as e:
+                logger.error(f"重启常驻浏览器失败，下次租用时重试: {e}")
+        self._return(browser)
+        return True
+
+    def _return(self, browser: PooledBrowser) -> None:
+        with self._cond:
+            browser.leased = False
+            self._cond.notify()
+
+    def _monitor_loop(self) -> None:
+        """定期检查空闲浏览器，提前重启已退出或内存超限的实例，保证租用时总是热的。"""
+        while True:
+            time.sleep(MONITOR_INTERVAL)
+            with self._cond:
+                idle = [item for item in self._browsers if not item.leased]
+                for browser in idle:
+                    browser.leased = True
+            for browser in idle:
+                reason = ""
+                if not browser.alive():
+                    reason = "进程已退出"
+                elif self.max_rss_mb:
+                    rss = browser.rss_mb()
+                    if rss > self.max_rss_mb:
+                        reason = f"空闲内存 {rss:.0f} MB 超过上限 {self.max_rss_mb} MB"
+                if reason:
+                    try:
+                        browser = self._replace(browser, reason)
+                    except Exception as e:
+                        logger.error(f"重启常驻浏览器失败: {e}")
+                self._return(browser)
+
+    def stats(self) -> dict:
+        with self._cond:
+            browsers = list(self._browsers)
+        return {
+            "pid": os.getpid(),
+            "size": self.size,
+            "max_uses": self.max_uses,
+            "max_rss_mb": self.max_rss_mb,
+            "leases": self._leases,
+            "recycled": self._recycled,
+            "browsers": [
+                {
+                    "id": item.id,
+                    "pid": item.process.pid,
+                    "debugger_address": item.debugger_address,
+                    "alive": item.alive(),
+                    "leased": item.leased,
+                    "uses": item.uses,
+                    "rss_mb": round(item.rss_mb(), 1),
+                    "age_seconds": int(time.time() - item.launched_at),
+                }
+                for item in browsers
+            ],
+        }
+
+    def shutdown(self) -> None:
+        with self._cond:
+            browsers = list(self._browsers)
+            self._browsers.clear()
+        for browser in browsers:
+            browser.stop()
+
+
+class PoolServer:
+    """每个连接一个线程；连接断开时归还该连接仍持有的浏览器（按异常处理）。"""
+
+    def __init__(self, pool: BrowserPool) -> None:
+        self._pool = pool
+
+    def serve(self, listener: Listener) -> None:
+        while True:
+            try:
+                conn = listener.accept()
+            except multiprocessing.AuthenticationError as e:
+                logger.warning(f"浏览器池拒绝未授权连接: {e}")
+                continue
+            threading.Thread(target=self._handle, args=(conn,), name="browser-pool-conn", daemon=True).start()
+
+    def _handle(self, conn: Connection) -> None:
+        held: set[int] = set()
+        try:
+            while True:
+                op, args = conn.recv()
+                try:
+                    message = (True, self._dispatch(op, args, held))
+                except Exception as e:
+                    message = (False, f"{type(e).__name__}: {e}")
+                conn.send(message)
+        except (EOFError, OSError):
+            pass
+        finally:
+            for browser_id in held:
+                logger.warning(f"租用方断开连接，回收常驻浏览器 #{browser_id}")
+                self._pool.release(browser_id, healthy=False)
+            conn.close()
+
+    def _dispatch(self, op: str, args: tuple, held: set[int]) -> Any:
+        if op == OP_LEASE:
+            browser = self._pool.lease(*args)
+            held.add(browser.id)
+            return {"id": browser.id, "debugger_address": browser.debugger_address, "uses": browser.uses}
+        if op == OP_RELEASE:
+            browser_id, healthy = args
+            held.discard(browser_id)
+            return self._pool.release(browser_id, healthy)
+        if op == OP_STATS:
+            return self._pool.stats()
+        raise ValueError(f"未知请求类型: {op}")
+
+
+# ---------------------------------------------------------------------------
+# 客户端（运行在 cron / Web 触发的签到进程内）
+# ---------------------------------------------------------------------------
+
+
+class BrowserLease:
+    """一次租用；持有连接直至归还，进程异常退出时池进程据连接断开回收浏览器。"""
+
+    def __init__(self, conn: Connection, browser_id: int, debugger_address: str, uses: int) -> None:
+        self._conn = conn
+        self.id = browser_id
+        self.debugger_address = debugger_address
+        self.uses = uses
+
+    def release(self, healthy: bool = True) -> None:
+        try:
+            self._conn.send((OP_RELEASE, (self.id, healthy)))
+            if self._conn.poll(30):
+                self._conn.recv()
+        except (EOFError, OSError) as e:
+            logger.debug(f"归还常驻浏览器失败: {e}")
+        finally:
+            self._conn.close()
+
+
+def pool_available(address: str | None = None) -> bool:
+    address = address or pool_address()
+    return os.path.exists(address) and os.path.exists(_key_path(address))
+
+
+def _connect(address: str) -> Connection:
+    with open(_key_path(address), "r", encoding="utf-8") as f:
+        authkey = bytes.fromhex(f.read().strip())
+    return Client(address, family="AF_UNIX", authkey=authkey)
+
+
+def _request(conn: Connection, op: str, args: tuple, timeout: float) -> Any:
+    conn.send((op, args))
+    if not conn.poll(timeout):
+        raise TimeoutError(f"浏览器池响应超时: {op}")
+    ok, value = conn.recv()
+    if not ok:
+        raise RuntimeError(value)
+    return value
+
+
+def lease_browser(timeout: float = LEASE_TIMEOUT) -> BrowserLease | None:
+    """向浏览器池租用一个浏览器；池未运行或租用失败时返回 None。"""
+    address = pool_address()
+    if not pool_available(address):
+        return None
+    try:
+        conn = _connect(address)
+    except Exception as e:
+        logger.warning(f"浏览器池不可用，改为启动新浏览器: {e}")
+        return None
+    try:
+        value = _request(conn, OP_LEASE, (timeout,), timeout + 10)
+    except Exception as e:
+        conn.close()
+        logger.warning(f"租用常驻浏览器失败，改为启动新浏览器: {e}")
+        return None
+    return BrowserLease(conn, int(value["id"]), str(value["debugger_address"]), int(value["uses"]))
+
+
+def pool_stats() -> dict | None:
+    address = pool_address()
+    if not pool_available(address):
+        return None
+    try:
+        conn = _connect(address)
+    except Exception:
+        return None
+    try:
+        return _request(conn, OP_STATS, (), 10)
+    except Exception:
+        return None
+    finally:
+        conn.close()
+
+
+def main() -> None:
+    """启动浏览器池守护进程；--stats 打印运行中的池状态。"""
+    if "--stats" in sys.argv[1:]:
+        import json
+
+        stats = pool_stats()
+        if stats is None:
+            raise SystemExit("浏览器池未运行")
+        print(json.dumps(stats, ensure_ascii=False, indent=2))
+        return
+
+    from rainyun.config import Config
+
+    logging.basicConfig(
+        level=os.environ.get("LOG_LEVEL", "INFO"),
+        format="%(asctime)s - %(levelname)s - %(message)s",
+    )
+    address = pool_address()
+    pool = BrowserPool(
+        Config.from_env(os.environ),
+        size=_read_int_env(SIZE_ENV, DEFAULT_SIZE),
+        max_uses=_read_int_env(MAX_USES_ENV, DEFAULT_MAX_USES),
+        max_rss_mb=_read_int_env(MAX_RSS_ENV, DEFAULT_MAX_RSS_MB),
+    )
+    # 收到 SIGTERM 时走 finally 关闭浏览器并清理套接字
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    key_path = _key_path(address)
+    for path in (address, key_path):
+        if os.path.exists(path):
+            os.remove(path)
+    listener: Listener | None = None
+    try:
+        pool.start()
+        authkey = secrets.token_bytes(16)
+        fd = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(authkey.hex())
+        listener = Listener(address, family="AF_UNIX", authkey=authkey)
+        logger.info(f"浏览器池已就绪：{pool.size} 个浏览器，监听 {address}")
+        PoolServer(pool).serve(listener)
+    finally:
+        pool.shutdown()
+        if listener is not None:
+            listener.close()
+        for path in (address, key_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@
 import logging
 import os
 import tempfile
+import threading
 from dataclasses import dataclass
 
 import ddddocr
@@ -13,6 +14,8 @@ from selenium.webdriver.chrome.webdriver import WebDriver
 from selenium.webdriver.support.wait import WebDriverWait
 
 from rainyun.api.client import RainyunAPI
+from rainyun.browser.capture import ResourceCapture, enable_network_capture
+from rainyun.browser.pool import BrowserLease, lease_browser
 from rainyun.config import Config
 
 logger = logging.getLogger(__name__)
@@ -27,6 +30,56 @@ class RuntimeContext:
     temp_dir: str
     api: RainyunAPI
     config: Config
+    capture: ResourceCapture | None = None
+
+
+def chrome_arguments(config: Config, linux: bool) -> list[str]:
+    """Chrome 命令行参数；常驻浏览器池启动浏览器时使用同一组参数。"""
+    arguments = ["--no-sandbox"]
+    if linux:
+        arguments += ["--headless", "--disable-gpu", "--disable-dev-shm-usage"]
+        # 低配模式：适用于 1核1G 小鸡
+        if config.chrome_low_memory:
+            # 注意：--single-process 在 Docker 容器中容易导致崩溃，不使用
+            arguments += [
+                "--disable-extensions",
+                "--disable-background-networking",
+                "--disable-sync",
+                "--disable-translate",
+                "--disable-default-apps",
+                "--no-first-run",
+                "--disable-software-rasterizer",
+                "--js-flags=--max-old-space-size=256",
+            ]
+    return arguments
+
+
+def resolve_chromedriver_path(config: Config) -> str:
+    # 容器环境使用系统 chromedriver
+    driver_path = config.chromedriver_path
+    if os.path.exists(driver_path):
+        return driver_path
+    candidates = [
+        "/usr/bin/chromedriver",
+        "/usr/local/bin/chromedriver",
+        "/usr/lib/chromium/chromedriver",
+        "/usr/lib/chromium-browser/chromedriver",
+    ]
+    for candidate in candidates:
+        if os.path.exists(candidate):
+            return candidate
+    return "./chromedriver"
+
+
+@dataclass
+class BrowserContext:
+    """同一 Chrome 内的独立浏览器上下文：cookie 与存储互不共享，由单独的 chromedriver 会话接管。"""
+
+    id: str
+    target_id: str
+    driver: WebDriver
+    wait: WebDriverWait
+    capture: ResourceCapture | None = None
 
 
 class BrowserSession:
@@ -37,68 +90,179 @@ class BrowserSession:
         self.driver = None
         self.wait = None
         self.temp_dir = None
+        self.capture: ResourceCapture | None = None
+        self.lease: BrowserLease | None = None
+        self._contexts: dict[str, BrowserContext] = {}
+        # 主会话的 CDP 调用可能来自多个签到线程，串行发送
+        self._cdp_lock = threading.Lock()
 
     def start(self) -> tuple[WebDriver, WebDriverWait, str]:
-        driver = self._init_selenium()
+        driver = self._attach_pooled() or self._init_selenium()
         self._apply_stealth(driver)
         wait = WebDriverWait(driver, self.config.timeout)
         temp_dir = tempfile.mkdtemp(prefix="rainyun-")
         self.driver = driver
         self.wait = wait
         self.temp_dir = temp_dir
+        if self.config.captcha_capture:
+            self.capture = ResourceCapture(driver)
         return driver, wait, temp_dir
 
+    def open_context(self) -> BrowserContext:
+        """新建浏览器上下文与其中的标签页，并用新的 chromedriver 会话接管该标签页。
+
+        各上下文的驱动互相独立，可在不同线程中并行操作；内存开销接近一个标签页。
+        """
+        if not self.driver:
+            raise RuntimeError("浏览器会话尚未启动")
+        address = self._debugger_address()
+        with self._cdp_lock:
+            context_id = self.driver.execute_cdp_cmd(
+                "Target.createBrowserContext", {"disposeOnDetach": True}
+            )["browserContextId"]
+            target_id = self.driver.execute_cdp_cmd(
+                "Target.createTarget", {"url": "about:blank", "browserContextId": context_id}
+            )["targetId"]
+        driver = None
+        try:
+            driver = self._attach(address)
+            handle = next(
+                (item for item in driver.window_handles if item.upper().endswith(target_id.upper())), None
+            )
+            if handle is None:
+                raise RuntimeError(f"未找到新建上下文的标签页: {target_id}")
+            driver.switch_to.window(handle)
+            self._apply_stealth(driver)
+        except Exception:
+            if driver is not None:
+                try:
+                    driver.quit()
+                except Exception:
+                    pass
+            self._dispose_context(context_id)
+            raise
+        context = BrowserContext(
+            id=context_id,
+            target_id=target_id,
+            driver=driver,
+            wait=WebDriverWait(driver, self.config.timeout),
+            capture=ResourceCapture(driver) if self.config.captcha_capture else None,
+        )
+        self._contexts[context_id] = context
+        return context
+
+    def close_context(self, context: BrowserContext) -> None:
+        """结束接管并销毁上下文，其中的标签页、cookie 与存储随之清除。"""
+        self._contexts.pop(context.id, None)
+        try:
+            # 接管模式下 quit 只结束 chromedriver，不关闭浏览器
+            context.driver.quit()
+        except Exception:
+            pass
+        self._dispose_context(context.id)
+
+    def _dispose_context(self, context_id: str) -> None:
+        try:
+            with self._cdp_lock:
+                self.driver.execute_cdp_cmd("Target.disposeBrowserContext", {"browserContextId": context_id})
+        except Exception as e:
+            logger.warning(f"销毁浏览器上下文失败: {e}")
+
+    def _debugger_address(self) -> str:
+        if self.lease is not None:
+            return self.lease.debugger_address
+        options = self.driver.capabilities.get("goog:chromeOptions", {})
+        address = options.get("debuggerAddress") if isinstance(options, dict) else None
+        if not address:
+            raise RuntimeError("无法获取浏览器调试地址")
+        return address
+
     def close(self) -> None:
         if not self.driver:
             return
+        for context in list(self._contexts.values()):
+            self.close_context(context)
+        lease = self.lease
+        healthy = True
+        if lease is not None:
+            healthy = self._reset_pooled()
         try:
+            # 接管的浏览器由池进程启动，quit 只结束 chromedriver
             self.driver.quit()
         except Exception:
             pass
+        if lease is not None:
+            lease.release(healthy=healthy)
+            self.lease = None
+
+    def _attach_pooled(self) -> WebDriver | None:
+        """向常驻浏览器池租用一个已启动的 Chrome；池不可用时返回 None，由调用方冷启动。"""
+        if self.debug or not self.linux:
+            return None
+        lease = lease_browser()
+        if lease is None:
+            return None
+        try:
+            driver = self._attach(lease.debugger_address)
+        except Exception as e:
+            logger.warning(f"接管常驻浏览器失败，改为启动新浏览器: {e}")
+            lease.release(healthy=False)
+            return None
+        self.lease = lease
+        logger.info(f"使用常驻浏览器 #{lease.id}（{lease.debugger_address}，已使用 {lease.uses} 次）")
+        return driver
+
+    def _attach(self, debugger_address: str) -> WebDriver:
+        """启动 chromedriver 接管已运行的浏览器。"""
+        ops = Options()
+        ops.debugger_address = debugger_address
+        if self.config.captcha_capture:
+            enable_network_capture(ops)
+        return webdriver.Chrome(service=self._service(), options=ops)
+
+    def _service(self) -> Service:
+        if self.linux:
+            return Service(resolve_chromedriver_path(self.config))
+        return Service("chromedriver.exe")
+
+    def _reset_pooled(self) -> bool:
+        """归还前清理登录状态与多余标签页；清理失败时让池回收该浏览器。"""
+        driver = self.driver
+        try:
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+            driver.get("about:blank")
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+            driver.execute_cdp_cmd(
+                "Storage.clearDataForOrigin",
+                {"origin": self.config.app_base_url, "storageTypes": "all"},
+            )
+            return True
+        except Exception as e:
+            logger.warning(f"清理常驻浏览器状态失败，将由浏览器池回收: {e}")
+            return False
 
     def _init_selenium(self) -> WebDriver:
         ops = Options()
-        ops.add_argument("--no-sandbox")
+        for argument in chrome_arguments(self.config, self.linux):
+            ops.add_argument(argument)
+        if self.config.captcha_capture:
+            enable_network_capture(ops)
         if self.debug:
             ops.add_experimental_option("detach", True)
         if self.linux:
-            ops.add_argument("--headless")
-            ops.add_argument("--disable-gpu")
-            ops.add_argument("--disable-dev-shm-usage")
-            # 低配模式：适用于 1核1G 小鸡
             if self.config.chrome_low_memory:
                 user = self.config.display_name or self.config.rainyun_user
                 prefix = f"用户 {user} " if user else ""
                 logger.info(f"{prefix}启用 Chrome 低内存模式")
-                # 注意：--single-process 在 Docker 容器中容易导致崩溃，不使用
-                ops.add_argument("--disable-extensions")
-                ops.add_argument("--disable-background-networking")
-                ops.add_argument("--disable-sync")
-                ops.add_argument("--disable-translate")
-                ops.add_argument("--disable-default-apps")
-                ops.add_argument("--no-first-run")
-                ops.add_argument("--disable-software-rasterizer")
-                ops.add_argument("--js-flags=--max-old-space-size=256")
             # 设置 Chromium 二进制路径（支持 ARM 和 AMD64）
             if self.config.chrome_bin and os.path.exists(self.config.chrome_bin):
                 ops.binary_location = self.config.chrome_bin
-            # 容器环境使用系统 chromedriver
-            driver_path = self.config.chromedriver_path
-            if not os.path.exists(driver_path):
-                candidates = [
-                    "/usr/bin/chromedriver",
-                    "/usr/local/bin/chromedriver",
-                    "/usr/lib/chromium/chromedriver",
-                    "/usr/lib/chromium-browser/chromedriver",
-                ]
-                for candidate in candidates:
-                    if os.path.exists(candidate):
-                        driver_path = candidate
-                        break
-            if os.path.exists(driver_path):
-                return webdriver.Chrome(service=Service(driver_path), options=ops)
-            return webdriver.Chrome(service=Service("./chromedriver"), options=ops)
-        return webdriver.Chrome(service=Service("chromedriver.exe"), options=ops)
+        return webdriver.Chrome(service=self._service(), options=ops)
 
     def _apply_stealth(self, driver: WebDriver) -> None:
         with open("stealth.min.js", mode="r") as f:
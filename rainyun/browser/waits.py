@@ -0,0 +1,97 @@
+"""基于 DOM 状态的短轮询等待，替代固定 sleep。"""
+
+import re
+
+from selenium.common.exceptions import (
+    ElementClickInterceptedException,
+    ElementNotInteractableException,
+    NoSuchElementException,
+    StaleElementReferenceException,
+    TimeoutException,
+)
+from selenium.webdriver.chrome.webdriver import WebDriver
+from selenium.webdriver.support.wait import WebDriverWait
+
+from rainyun.browser.locators import XPATH_CONFIG
+
+POLL_FREQUENCY = 0.1
+
+_TRANSIENT_ERRORS = (
+    NoSuchElementException,
+    StaleElementReferenceException,
+    ElementClickInterceptedException,
+    ElementNotInteractableException,
+)
+
+# tcOperation 上可能表示失败的 class（未在实际页面确认，仅用于提前结束等待；
+# 未出现时依靠换图判断失败，或等到 RESULT_TIMEOUT）
+_FAIL_CLASSES = ("show-fail", "show-error")
+# 提交结果的最长等待时间，与原先固定 sleep(5) 一致
+RESULT_TIMEOUT = 5.0
+
+
+def _wait(driver: WebDriver, timeout: float) -> WebDriverWait:
+    return WebDriverWait(
+        driver,
+        timeout,
+        poll_frequency=POLL_FREQUENCY,
+        ignored_exceptions=_TRANSIENT_ERRORS,
+    )
+
+
+def captcha_background_url(driver: WebDriver) -> str:
+    """当前 slideBg 的背景图 URL，元素不存在或尚未设置时返回空串。"""
+    try:
+        style = driver.find_element(*XPATH_CONFIG["CAPTCHA_BG"]).get_attribute("style") or ""
+    except (NoSuchElementException, StaleElementReferenceException):
+        return ""
+    match = re.search(r"url\(([^)]+)\)", style, re.IGNORECASE)
+    return match.group(1).strip().strip('"').strip("'") if match else ""
+
+
+def click_when_ready(driver: WebDriver, locator: tuple[str, str], timeout: float) -> None:
+    """元素可点击（未被动画遮挡）时立即点击。"""
+
+    def _click(drv: WebDriver) -> bool:
+        drv.find_element(*locator).click()
+        return True
+
+    _wait(driver, timeout).until(_click)
+
+
+def wait_for_background_change(driver: WebDriver, previous_url: str, timeout: float) -> str:
+    """等待 slideBg 换成新的背景图，返回新 URL；超时抛出 TimeoutException。"""
+
+    def _changed(drv: WebDriver) -> str | bool:
+        url = captcha_background_url(drv)
+        return url if url and url != previous_url else False
+
+    return _wait(driver, timeout).until(_changed)
+
+
+def wait_for_captcha_result(driver: WebDriver, previous_url: str, timeout: float) -> bool:
+    """提交后等待结果：出现 show-success 返回 True；
+
+    出现失败 class 或验证码已自动换图时返回 False；超时则按当前 class 判断。
+    等待时间不超过 RESULT_TIMEOUT。
+    """
+
+    def _outcome(drv: WebDriver) -> str | bool:
+        classes = drv.find_element(*XPATH_CONFIG["CAPTCHA_OP"]).get_attribute("class") or ""
+        if "show-success" in classes:
+            return "success"
+        if any(name in classes for name in _FAIL_CLASSES):
+            return "fail"
+        url = captcha_background_url(drv)
+        if previous_url and url and url != previous_url:
+            return "fail"
+        return False
+
+    try:
+        return _wait(driver, min(timeout, RESULT_TIMEOUT)).until(_outcome) == "success"
+    except TimeoutException:
+        try:
+            classes = driver.find_element(*XPATH_CONFIG["CAPTCHA_OP"]).get_attribute("class") or ""
+        except (NoSuchElementException, StaleElementReferenceException):
+            return False
+        return "show-success" in classes
@@ -0,0 +1,19 @@
+"""验证码识别算法（与浏览器流程解耦）。"""
+
+from .assignment import best_assignment
+from .similarity import (
+    FeatureCache,
+    crop_boxes,
+    feature_similarity_matrix,
+    ratio_test_score,
+    template_similarity_matrix,
+)
+
+__all__ = [
+    "FeatureCache",
+    "best_assignment",
+    "crop_boxes",
+    "feature_similarity_matrix",
+    "ratio_test_score",
+    "template_similarity_matrix",
+]
@@ -0,0 +1,284 @@
+"""验证码样本归档：后台线程写入按大小轮换的 zip 分片，并维护 JSON Lines 索引。
+
+目录结构::
+
+    <root>/index.jsonl                 每个样本一行：id、分片、时间、原因、账号、相似度等
+    <root>/shard-<时间>-<随机串>.zip    <id>/background.jpg、<id>/sprite_N.jpg
+
+调用方只把图片数组放入队列，JPEG 编码与磁盘写入都在后台线程完成；队列满时丢弃
+样本而不阻塞求解。分片超过 shard_bytes 后轮换，分片数超过 max_shards 时删除最旧的
+分片并同步清理索引。Web 与定时任务进程可能同时写入同一目录，分片追加、轮换与
+索引写入都在 <root>/.lock 文件锁内进行。
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+import zipfile
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Iterator, Sequence
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = "index.jsonl"
+LOCK_FILE = ".lock"
+SHARD_BYTES = 16 * 1024 * 1024
+MAX_SHARDS = 8
+QUEUE_SIZE = 64
+JPEG_QUALITY = 90
+
+
+@contextmanager
+def _directory_lock(root: str):
+    """跨进程互斥写入归档目录；不支持文件锁的平台只依赖进程内的单写线程。"""
+    try:
+        import fcntl
+    except ImportError:
+        yield
+        return
+    fd = os.open(os.path.join(root, LOCK_FILE), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)
+
+
+@dataclass
+class ArchivedSample:
+    id: str
+    shard: str
+    ts: float
+    reason: str
+    account: str = ""
+    method: str = ""
+    similarities: list[float] = field(default_factory=list)
+    background_bytes: bytes = b""
+    sprite_bytes: list[bytes] = field(default_factory=list)
+
+
+@dataclass
+class _Pending:
+    background: np.ndarray | None
+    sprites: list[np.ndarray]
+    entry: dict
+
+
+def _encode(image: np.ndarray) -> bytes:
+    ok, buffer = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY])
+    if not ok:
+        raise ValueError("样本编码失败")
+    return buffer.tobytes()
+
+
+class SampleArchive:
+    def __init__(self, root: str, *, shard_bytes: int = SHARD_BYTES, max_shards: int = MAX_SHARDS) -> None:
+        self.root = root
+        self.shard_bytes = shard_bytes
+        self.max_shards = max(1, max_shards)
+        self._queue: queue.Queue[_Pending] = queue.Queue(maxsize=QUEUE_SIZE)
+        self._thread: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+        self._shard: str | None = None
+        self._dropped = 0
+
+    def submit(
+        self,
+        background: np.ndarray | None,
+        sprites: Sequence[np.ndarray],
+        *,
+        reason: str,
+        account: str = "",
+        method: str = "",
+        similarities: Sequence[float] = (),
+    ) -> bool:
+        """放入写入队列并立即返回；队列已满时丢弃并返回 False。"""
+        entry = {
+            "id": f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}",
+            "ts": time.time(),
+            "reason": reason,
+            "account": account,
+            "method": method,
+            "similarities": [round(float(value), 4) for value in similarities],
+        }
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait(_Pending(background, list(sprites), entry))
+        except queue.Full:
+            self._dropped += 1
+            logger.debug(f"验证码样本写入队列已满，丢弃样本（累计 {self._dropped} 个）")
+            return False
+        return True
+
+    def flush(self, timeout: float | None = None) -> None:
+        """等待队列中的样本全部写入。"""
+        if self._thread is None:
+            return
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return
+            time.sleep(0.05)
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="captcha-archive", daemon=True)
+                self._thread.start()
+                atexit.register(self.flush, 5.0)
+
+    def _run(self) -> None:
+        while True:
+            pending = self._queue.get()
+            try:
+                self._write(pending)
+            except Exception as e:
+                logger.warning(f"写入验证码样本失败: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _shard_paths(self) -> list[str]:
+        if not os.path.isdir(self.root):
+            return []
+        paths = [
+            os.path.join(self.root, name)
+            for name in os.listdir(self.root)
+            if name.startswith("shard-") and name.endswith(".zip")
+        ]
+        # 同一秒内可能创建多个分片，按修改时间排序（当前分片总是最新）
+        return sorted(paths, key=lambda path: (os.path.getmtime(path), path))
+
+    def _current_shard(self) -> str:
+        if self._shard is None:
+            shards = self._shard_paths()
+            self._shard = shards[-1] if shards else None
+        if (
+            self._shard is None
+            or not os.path.exists(self._shard)
+            or os.path.getsize(self._shard) >= self.shard_bytes
+        ):
+            self._prune()
+            name = f"shard-{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}.zip"
+            self._shard = os.path.join(self.root, name)
+        return self._shard
+
+    def _prune(self) -> None:
+        """新分片创建前删除超出上限的旧分片，并从索引中去掉对应条目。"""
+        shards = self._shard_paths()
+        removed = {os.path.basename(path) for path in shards[: max(0, len(shards) - self.max_shards + 1)]}
+        if not removed:
+            return
+        for name in removed:
+            try:
+                os.remove(os.path.join(self.root, name))
+            except OSError as e:
+                logger.warning(f"删除旧样本分片失败: {e}")
+        index_path = os.path.join(self.root, INDEX_FILE)
+        kept: list[str] = []
+        try:
+            with open(index_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        shard = json.loads(line).get("shard")
+                    except (ValueError, AttributeError):
+                        continue
+                    if shard not in removed:
+                        kept.append(line if line.endswith("\n") else line + "\n")
+        except OSError:
+            return
+        temp_path = f"{index_path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.writelines(kept)
+        os.replace(temp_path, index_path)
+
+    def _write(self, pending: _Pending) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        entry = pending.entry
+        files: list[tuple[str, bytes]] = []
+        if pending.background is not None and pending.background.size > 0:
+            files.append(("background.jpg", _encode(pending.background)))
+        for index, sprite in enumerate(pending.sprites, start=1):
+            if sprite is not None and sprite.size > 0:
+                files.append((f"sprite_{index}.jpg", _encode(sprite)))
+        entry["files"] = [name for name, _ in files]
+        with _directory_lock(self.root):
+            shard = self._current_shard()
+            # JPEG 已是压缩格式，zip 内直接存储
+            with zipfile.ZipFile(shard, "a", compression=zipfile.ZIP_STORED) as archive:
+                for name, data in files:
+                    archive.writestr(f"{entry['id']}/{name}", data)
+            entry["shard"] = os.path.basename(shard)
+            with open(os.path.join(self.root, INDEX_FILE), "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+def iter_archive(root: str, *, reasons: Sequence[str] | None = None) -> Iterator[ArchivedSample]:
+    """按写入顺序遍历归档样本；reasons 非空时只返回对应原因的样本。"""
+    index_path = os.path.join(root, INDEX_FILE)
+    if not os.path.isfile(index_path):
+        return
+    with open(index_path, "r", encoding="utf-8") as f:
+        entries = []
+        for line in f:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                continue
+    archives: dict[str, zipfile.ZipFile] = {}
+    try:
+        for entry in entries:
+            if not isinstance(entry, dict) or (reasons and entry.get("reason") not in reasons):
+                continue
+            shard = str(entry.get("shard", ""))
+            archive = archives.get(shard)
+            if archive is None:
+                try:
+                    archive = zipfile.ZipFile(os.path.join(root, shard), "r")
+                except (OSError, zipfile.BadZipFile):
+                    continue
+                archives[shard] = archive
+            prefix = f"{entry.get('id')}/"
+            try:
+                files = {name: archive.read(prefix + name) for name in entry.get("files", [])}
+            except (KeyError, zipfile.BadZipFile):
+                continue
+            yield ArchivedSample(
+                id=str(entry.get("id")),
+                shard=shard,
+                ts=float(entry.get("ts", 0)),
+                reason=str(entry.get("reason", "")),
+                account=str(entry.get("account", "")),
+                method=str(entry.get("method", "")),
+                similarities=[float(value) for value in entry.get("similarities", [])],
+                background_bytes=files.get("background.jpg", b""),
+                sprite_bytes=[files[name] for name in sorted(files) if name.startswith("sprite_")],
+            )
+    finally:
+        for archive in archives.values():
+            archive.close()
+
+
+_archives: dict[str, SampleArchive] = {}
+_archives_lock = threading.Lock()
+
+
+def get_sample_archive(root: str) -> SampleArchive:
+    """同一目录在进程内共享一个归档写入器（单写线程，保证分片与索引一致）。"""
+    key = os.path.abspath(root)
+    with _archives_lock:
+        archive = _archives.get(key)
+        if archive is None:
+            archive = SampleArchive(root)
+            _archives[key] = archive
+        return archive
@@ -0,0 +1,51 @@
+"""小图与候选框的最优一一指派。
+
+目标是对所有单射指派最大化 (最低分, 平均分, 总分)，平局时取
+combinations × permutations 枚举顺序中最先出现的那个。
+
+k 个小图里任意一行只会被其余 k-1 行占用至多 k-1 个框，所以每行最优解
+必然落在该行按 (分数降序, 下标升序) 排名的前 k 个框内：换成更靠前且
+空闲的框，分数只增不减；分数相同则下标更小，枚举顺序也更靠前。
+因此只需在各行前 k 名的并集（至多 k² 个框）内精确枚举，结果与全量
+枚举完全一致，耗时与候选框数量呈线性关系。
+"""
+
+from itertools import combinations, permutations
+
+import numpy as np
+
+
+def candidate_columns(sim_matrix: np.ndarray) -> list[int]:
+    """每行按 (分数降序, 下标升序) 取前 k 个框，返回并集（升序）。"""
+    rows, cols = sim_matrix.shape
+    keep: set[int] = set()
+    for row in range(rows):
+        order = np.argsort(-sim_matrix[row], kind="stable")
+        keep.update(int(col) for col in order[: min(rows, cols)])
+    return sorted(keep)
+
+
+def best_assignment(sim_matrix: np.ndarray) -> tuple[tuple[int, ...], list[float]] | None:
+    """返回 (每行对应的列下标, 每行得分)；列数少于行数时返回 None。"""
+    matrix = np.asarray(sim_matrix, dtype=np.float64)
+    if matrix.ndim != 2:
+        return None
+    rows, cols = matrix.shape
+    if rows == 0 or cols < rows:
+        return None
+    best_perm: tuple[int, ...] | None = None
+    best_scores: list[float] | None = None
+    best_key: tuple[float, float, float] | None = None
+    # 候选列保持升序，子集上的枚举顺序与全量枚举一致
+    for chosen in combinations(candidate_columns(matrix), rows):
+        for perm in permutations(chosen):
+            scores = [float(matrix[i, perm[i]]) for i in range(rows)]
+            sum_score = sum(scores)
+            key = (min(scores), sum_score / rows, sum_score)
+            if best_key is None or key > best_key:
+                best_key = key
+                best_perm = perm
+                best_scores = scores
+    if best_perm is None or best_scores is None:
+        return None
+    return best_perm, best_scores
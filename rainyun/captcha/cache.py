@@ -0,0 +1,154 @@
+"""验证码答案缓存：按背景图与小图的感知哈希记录上次通过的点击坐标。
+
+哈希使用 dHash（64 位），对 JPEG 重新压缩、轻微缩放不敏感；查找时先精确匹配，
+再做近似匹配：小图哈希必须完全一致（决定点击顺序），仅背景图允许小的汉明距离。
+条目按 LRU 淘汰并持久化为 JSON 文件。
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+HASH_SIZE = 8
+# 近似匹配时背景图哈希允许的最大汉明距离
+HAMMING_THRESHOLD = 3
+
+
+def dhash(image: np.ndarray, size: int = HASH_SIZE) -> int:
+    """差值哈希：缩放到 (size+1)×size 灰度图后比较相邻像素。"""
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    small = cv2.resize(gray, (size + 1, size), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def _hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def captcha_key(background: np.ndarray, sprites: list[np.ndarray]) -> str:
+    return ":".join(f"{dhash(image):016x}" for image in [background, *sprites])
+
+
+def _parse_key(key: str) -> list[int]:
+    return [int(part, 16) for part in key.split(":")]
+
+
+class CaptchaAnswerCache:
+    """线程安全的 LRU 答案缓存，每次修改后原子写回磁盘。"""
+
+    def __init__(self, path: str, max_entries: int = 500) -> None:
+        self.path = path
+        self.max_entries = max(1, max_entries)
+        self._entries: OrderedDict[str, dict] = OrderedDict()
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"验证码答案缓存读取失败，将重新生成: {e}")
+            return
+        for item in raw.get("entries", []) if isinstance(raw, dict) else []:
+            key = item.get("key") if isinstance(item, dict) else None
+            positions = item.get("positions") if isinstance(item, dict) else None
+            if not isinstance(key, str) or not isinstance(positions, list):
+                continue
+            self._entries[key] = item
+        self._trim()
+
+    def _trim(self) -> None:
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _save(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        payload = {"version": 1, "entries": list(self._entries.values())}
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            logger.warning(f"验证码答案缓存写入失败: {e}")
+
+    def _find(self, key: str) -> str | None:
+        if key in self._entries:
+            return key
+        target = _parse_key(key)
+        for candidate in reversed(self._entries):
+            hashes = _parse_key(candidate)
+            if (
+                len(hashes) == len(target)
+                and hashes[1:] == target[1:]
+                and _hamming(hashes[0], target[0]) <= HAMMING_THRESHOLD
+            ):
+                return candidate
+        return None
+
+    def lookup(self, key: str) -> tuple[str, list[tuple[int, int]]] | None:
+        """返回 (命中的条目 key, 坐标)；近似命中时条目 key 可能与查询 key 不同。"""
+        with self._lock:
+            self._ensure_loaded()
+            found = self._find(key)
+            if found is None:
+                return None
+            self._entries.move_to_end(found)
+            positions = [(int(x), int(y)) for x, y in self._entries[found]["positions"]]
+            return found, positions
+
+    def store(self, key: str, positions: list[tuple[int, int]]) -> None:
+        with self._lock:
+            self._ensure_loaded()
+            entry = self._entries.pop(key, None) or {"key": key, "hits": 0}
+            entry["positions"] = [[int(x), int(y)] for x, y in positions]
+            entry["hits"] = int(entry.get("hits", 0)) + 1
+            entry["updated_at"] = int(time.time())
+            self._entries[key] = entry
+            self._trim()
+            self._save()
+
+    def evict(self, key: str) -> None:
+        with self._lock:
+            self._ensure_loaded()
+            if self._entries.pop(key, None) is not None:
+                self._save()
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._ensure_loaded()
+            return len(self._entries)
+
+
+_caches: dict[str, CaptchaAnswerCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_answer_cache(path: str, max_entries: int) -> CaptchaAnswerCache:
+    """同一路径在进程内共享一个缓存实例。"""
+    key = os.path.abspath(path)
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = CaptchaAnswerCache(path, max_entries)
+            _caches[key] = cache
+        else:
+            cache.max_entries = max(1, max_entries)
+        return cache
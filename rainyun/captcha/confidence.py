@@ -0,0 +1,256 @@
+"""提交前的验证码通过率预测。
+
+每次提交记录匹配结果的特征与最终结局（JSON Lines），离线拟合一个逻辑回归模型：
+python -m rainyun.captcha.confidence [--outcomes 路径] [--model 路径]
+
+特征包括相似度、首选与次选得分差、候选框几何信息与匹配策略；预测概率低于
+captcha_submit_threshold 的结果直接刷新重试，省去一次提交与结果等待。
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Iterator, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+OUTCOMES_PATH_ENV = "CAPTCHA_OUTCOMES_PATH"
+MODEL_PATH_ENV = "CAPTCHA_CONFIDENCE_PATH"
+DEFAULT_OUTCOMES_PATH = "data/captcha_outcomes.jsonl"
+DEFAULT_MODEL_PATH = "data/captcha_confidence.json"
+# 低于阈值的结果仍以该概率提交并记录，避免重新校准时只剩模型已接受的样本
+EXPLORE_RATE = 0.1
+
+# 相似度口径随策略不同，按策略做独热编码
+FEATURE_METHODS = ("sift", "orb", "template")
+FEATURE_NAMES = (
+    "min_similarity",
+    "mean_similarity",
+    "min_margin",
+    "mean_margin",
+    "min_box_side",
+    "box_area_ratio",
+    "min_center_distance",
+    *(f"method_{name}" for name in FEATURE_METHODS),
+)
+MIN_TRAINING_SAMPLES = 30
+# 结果记录超过该大小时轮转为 <path>.1（只保留一份旧文件），训练时两份一起读取
+MAX_OUTCOMES_BYTES = 4 * 1024 * 1024
+
+
+def answer_features(result, image_size: tuple[int, int]) -> list[float] | None:
+    """由 MatchResult 与背景图 (宽, 高) 计算特征；缺少得分差或候选框时返回 None。"""
+    similarities = list(result.similarities)
+    margins = list(getattr(result, "margins", []) or [])
+    boxes = list(getattr(result, "boxes", []) or [])
+    if not similarities or len(margins) != len(similarities) or len(boxes) != len(similarities):
+        return None
+    width, height = (max(1, int(value)) for value in image_size)
+    sides = [min(x2 - x1, y2 - y1) for x1, y1, x2, y2 in boxes]
+    areas = [max(1, (x2 - x1) * (y2 - y1)) for x1, y1, x2, y2 in boxes]
+    centers = [((x1 + x2) / 2, (y1 + y2) / 2) for x1, y1, x2, y2 in boxes]
+    distances = [
+        math.dist(centers[i], centers[j]) for i in range(len(centers)) for j in range(i + 1, len(centers))
+    ]
+    return [
+        float(min(similarities)),
+        float(sum(similarities) / len(similarities)),
+        float(min(margins)),
+        float(sum(margins) / len(margins)),
+        min(sides) / height,
+        max(areas) / min(areas),
+        (min(distances) if distances else 0.0) / width,
+        *(1.0 if result.method == name else 0.0 for name in FEATURE_METHODS),
+    ]
+
+
+@dataclass
+class ConfidenceModel:
+    weights: list[float]
+    bias: float
+    mean: list[float]
+    scale: list[float]
+    samples: int = 0
+    fitted_at: int = 0
+
+    def predict(self, features: Sequence[float]) -> float:
+        x = (np.asarray(features, dtype=np.float64) - self.mean) / self.scale
+        z = float(np.dot(self.weights, x) + self.bias)
+        return 1.0 / (1.0 + math.exp(-max(-50.0, min(50.0, z))))
+
+    def save(self, path: str) -> None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "features": list(FEATURE_NAMES), **asdict(self)}, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+
+def fit_confidence_model(
+    features: np.ndarray, labels: np.ndarray, *, l2: float = 1.0, iterations: int = 2000
+) -> ConfidenceModel:
+    """带 L2 正则的逻辑回归（标准化特征 + 批量梯度下降）。"""
+    x = np.asarray(features, dtype=np.float64)
+    y = np.asarray(labels, dtype=np.float64)
+    mean = x.mean(axis=0)
+    scale = x.std(axis=0)
+    # 常数特征（如从未出现的策略）不参与缩放
+    scale[scale < 1e-9] = 1.0
+    x = (x - mean) / scale
+    weights = np.zeros(x.shape[1])
+    prior = min(max(y.mean(), 1e-3), 1 - 1e-3)
+    bias = math.log(prior / (1 - prior))
+    step = 0.5
+    for _ in range(iterations):
+        p = 1.0 / (1.0 + np.exp(-(x @ weights + bias)))
+        error = p - y
+        weights -= step * (x.T @ error / len(y) + l2 * weights / len(y))
+        bias -= step * float(error.mean())
+    return ConfidenceModel(
+        weights=weights.tolist(),
+        bias=bias,
+        mean=mean.tolist(),
+        scale=scale.tolist(),
+        samples=int(len(y)),
+        fitted_at=int(time.time()),
+    )
+
+
+_model_lock = threading.Lock()
+_model_cache: dict[str, tuple[float, ConfidenceModel | None]] = {}
+
+
+def load_confidence_model(path: str = DEFAULT_MODEL_PATH) -> ConfidenceModel | None:
+    """按文件修改时间缓存；文件不存在、格式不符或特征集已变化时返回 None。"""
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    with _model_lock:
+        cached = _model_cache.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        model = None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+            if raw.get("features") == list(FEATURE_NAMES):
+                model = ConfidenceModel(
+                    weights=[float(v) for v in raw["weights"]],
+                    bias=float(raw["bias"]),
+                    mean=[float(v) for v in raw["mean"]],
+                    scale=[float(v) for v in raw["scale"]],
+                    samples=int(raw.get("samples", 0)),
+                    fitted_at=int(raw.get("fitted_at", 0)),
+                )
+            else:
+                logger.warning("验证码置信度模型特征与当前版本不一致，请重新校准")
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            logger.warning(f"验证码置信度模型读取失败: {e}")
+        _model_cache[path] = (mtime, model)
+        return model
+
+
+_outcome_lock = threading.Lock()
+
+
+def record_outcome(features: Sequence[float], method: str, passed: bool, path: str = DEFAULT_OUTCOMES_PATH) -> None:
+    line = json.dumps(
+        {"ts": int(time.time()), "method": method, "features": [round(v, 6) for v in features], "passed": passed},
+        ensure_ascii=False,
+    )
+    with _outcome_lock:
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            if os.path.isfile(path) and os.path.getsize(path) >= MAX_OUTCOMES_BYTES:
+                os.replace(path, f"{path}.1")
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        except OSError as e:
+            logger.warning(f"验证码提交结果记录失败: {e}")
+
+
+def iter_outcomes(path: str = DEFAULT_OUTCOMES_PATH) -> Iterator[tuple[list[float], bool]]:
+    """按时间顺序读取轮转出的旧记录与当前记录。"""
+    for file_path in (f"{path}.1", path):
+        if not os.path.isfile(file_path):
+            continue
+        with open(file_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    item = json.loads(line)
+                except ValueError:
+                    continue
+                features = item.get("features") if isinstance(item, dict) else None
+                if isinstance(features, list) and len(features) == len(FEATURE_NAMES):
+                    yield [float(v) for v in features], bool(item.get("passed"))
+
+
+def evaluate(model: ConfidenceModel, features: np.ndarray, labels: np.ndarray) -> dict:
+    probs = np.array([model.predict(row) for row in features])
+    clipped = np.clip(probs, 1e-6, 1 - 1e-6)
+    log_loss = float(-np.mean(labels * np.log(clipped) + (1 - labels) * np.log(1 - clipped)))
+    thresholds = {}
+    for threshold in (0.1, 0.2, 0.3, 0.4, 0.5):
+        skipped = probs < threshold
+        thresholds[f"{threshold:.1f}"] = {
+            "skipped": float(skipped.mean()),
+            "failures_avoided": int(np.sum(skipped & (labels == 0))),
+            "passes_lost": int(np.sum(skipped & (labels == 1))),
+        }
+    return {
+        "samples": int(len(labels)),
+        "pass_rate": float(labels.mean()),
+        "log_loss": log_loss,
+        "brier": float(np.mean((probs - labels) ** 2)),
+        "thresholds": thresholds,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="根据提交记录校准验证码置信度模型")
+    parser.add_argument(
+        "--outcomes",
+        default=os.environ.get(OUTCOMES_PATH_ENV, "").strip() or DEFAULT_OUTCOMES_PATH,
+        help="提交记录（JSON Lines）",
+    )
+    parser.add_argument(
+        "--model",
+        default=os.environ.get(MODEL_PATH_ENV, "").strip() or DEFAULT_MODEL_PATH,
+        help="模型输出路径",
+    )
+    parser.add_argument("--l2", type=float, default=1.0, help="L2 正则强度")
+    args = parser.parse_args(argv)
+
+    rows = list(iter_outcomes(args.outcomes))
+    labels = np.array([passed for _, passed in rows], dtype=np.float64)
+    if len(rows) < MIN_TRAINING_SAMPLES or labels.min(initial=1) == labels.max(initial=0):
+        sys.stderr.write(f"提交记录不足（{len(rows)} 条，需至少 {MIN_TRAINING_SAMPLES} 条且包含通过与失败）\n")
+        return 1
+    features = np.array([row for row, _ in rows], dtype=np.float64)
+    model = fit_confidence_model(features, labels, l2=args.l2)
+    model.save(args.model)
+    report = evaluate(model, features, labels)
+    print(f"样本数: {report['samples']}  通过率: {report['pass_rate']:.1%}  "
+          f"log loss: {report['log_loss']:.3f}  Brier: {report['brier']:.3f}")
+    print("阈值   跳过比例  避免的失败  损失的通过")
+    for threshold, stats in report["thresholds"].items():
+        print(f"{threshold:>4}   {stats['skipped']:>7.1%}  {stats['failures_avoided']:>10}  {stats['passes_lost']:>10}")
+    print(f"模型已写入: {args.model}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
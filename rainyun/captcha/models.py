@@ -0,0 +1,348 @@
+"""ddddocr 模型的进程级托管。
+
+每种模型在进程内只加载一次，所有会话共享同一份 ONNX 会话（onnxruntime 的
+推理调用本身线程安全），并记录加载耗时与内存增量。
+"""
+
+import io
+import logging
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Callable, Iterable, Sequence
+
+import cv2
+import ddddocr
+import numpy as np
+import onnxruntime
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+MODEL_DET = "det"
+MODEL_OCR = "ocr"
+ALL_MODELS = (MODEL_DET, MODEL_OCR)
+
+
+def current_rss_bytes() -> int | None:
+    """读取当前进程常驻内存（仅 Linux 可用）。"""
+    try:
+        with open("/proc/self/status", "r", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        return None
+    return None
+
+
+def available_cpus() -> int:
+    """当前进程实际可用的 CPU 数（考虑亲和性与 cgroup 配额，容器内比 os.cpu_count 更准确）。"""
+    try:
+        count = len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        count = os.cpu_count() or 1
+    quota = _cgroup_cpu_quota()
+    if quota is not None:
+        count = min(count, max(1, int(quota + 0.5)))
+    return max(1, count)
+
+
+def _cgroup_cpu_quota() -> float | None:
+    try:
+        # cgroup v2: "配额 周期" 或 "max 周期"
+        with open("/sys/fs/cgroup/cpu.max", "r", encoding="ascii") as f:
+            quota, period = f.read().split()[:2]
+        if quota != "max":
+            return int(quota) / int(period)
+        return None
+    except (OSError, ValueError):
+        pass
+    try:
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us", "r", encoding="ascii") as f:
+            quota_us = int(f.read().strip())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us", "r", encoding="ascii") as f:
+            period_us = int(f.read().strip())
+        if quota_us > 0 and period_us > 0:
+            return quota_us / period_us
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def resolve_thread_count(profile: str | int | None) -> int:
+    """解析线程配置：auto（按可用 CPU）、single（单线程）或正整数。"""
+    text = str(profile if profile is not None else "auto").strip().lower()
+    if text == "single":
+        return 1
+    if text.isdigit() and int(text) > 0:
+        return int(text)
+    if text not in ("", "auto"):
+        logger.warning(f"无法识别的推理线程配置 {profile!r}，按 auto 处理")
+    return available_cpus()
+
+
+def _session_options(threads: int) -> onnxruntime.SessionOptions:
+    options = onnxruntime.SessionOptions()
+    options.intra_op_num_threads = threads
+    options.inter_op_num_threads = 1
+    options.execution_mode = onnxruntime.ExecutionMode.ORT_SEQUENTIAL
+    return options
+
+
+def _rebuild_session(model: ddddocr.DdddOcr, threads: int) -> None:
+    """按线程数重建 ddddocr 内部的 onnxruntime 会话（ddddocr 未暴露 SessionOptions）。"""
+    graph_path = getattr(model, "_DdddOcr__graph_path", None)
+    if not graph_path:
+        return
+    providers = getattr(model, "_DdddOcr__providers", None) or ["CPUExecutionProvider"]
+    model._DdddOcr__ort_session = onnxruntime.InferenceSession(
+        graph_path, sess_options=_session_options(threads), providers=providers
+    )
+
+
+class _ThreadedOnnxRuntime:
+    """替身模块：ddddocr 构造会话时注入线程配置，模型只需加载一次。"""
+
+    def __init__(self, threads: int) -> None:
+        self._threads = threads
+
+    def InferenceSession(self, path, *args, **kwargs):  # noqa: N802 - 与 onnxruntime 同名
+        kwargs.setdefault("sess_options", _session_options(self._threads))
+        return onnxruntime.InferenceSession(path, *args, **kwargs)
+
+    def __getattr__(self, name: str):
+        return getattr(onnxruntime, name)
+
+
+# ddddocr 通过模块级 onnxruntime 创建会话，替换期间需串行
+_construct_lock = threading.Lock()
+
+
+def _load_ddddocr(name: str, threads: int | None = None) -> ddddocr.DdddOcr:
+    if name == MODEL_DET:
+        kwargs = {"det": True}
+    elif name == MODEL_OCR:
+        kwargs = {"ocr": True}
+    else:
+        raise ValueError(f"未知模型类型: {name}")
+    if threads is None:
+        return ddddocr.DdddOcr(show_ad=False, **kwargs)
+    with _construct_lock:
+        ddddocr.onnxruntime = _ThreadedOnnxRuntime(threads)
+        try:
+            return ddddocr.DdddOcr(show_ad=False, **kwargs)
+        finally:
+            ddddocr.onnxruntime = onnxruntime
+
+
+@dataclass(frozen=True)
+class OcrLabel:
+    text: str
+    # 各输出字符最大 softmax 概率的最小值；无字符时为空白概率均值；回退路径为 None
+    confidence: float | None
+
+
+@dataclass(frozen=True)
+class ModelStats:
+    name: str
+    load_seconds: float
+    rss_delta_mb: float | None
+    loaded_at: str
+
+
+class ModelRegistry:
+    """线程安全的模型注册表：按名称懒加载，每个模型单独加锁互不阻塞。"""
+
+    def __init__(self, loader: Callable[[str, int | None], ddddocr.DdddOcr] = _load_ddddocr) -> None:
+        self._loader = loader
+        self._models: dict[str, ddddocr.DdddOcr] = {}
+        self._stats: dict[str, ModelStats] = {}
+        self._locks = {name: threading.Lock() for name in ALL_MODELS}
+        self._guard = threading.Lock()
+        self._threads: int | None = None
+
+    def _lock_for(self, name: str) -> threading.Lock:
+        with self._guard:
+            return self._locks.setdefault(name, threading.Lock())
+
+    def get(self, name: str) -> ddddocr.DdddOcr:
+        model = self._models.get(name)
+        if model is not None:
+            return model
+        with self._lock_for(name):
+            model = self._models.get(name)
+            if model is None:
+                model = self._load(name)
+        return model
+
+    def _load(self, name: str) -> ddddocr.DdddOcr:
+        logger.info(f"初始化 ddddocr({name})")
+        rss_before = current_rss_bytes()
+        start = time.perf_counter()
+        model = self._loader(name, self._threads)
+        elapsed = time.perf_counter() - start
+        rss_after = current_rss_bytes()
+        rss_delta_mb = None
+        if rss_before is not None and rss_after is not None:
+            rss_delta_mb = (rss_after - rss_before) / 1024 / 1024
+        self._stats[name] = ModelStats(
+            name=name,
+            load_seconds=elapsed,
+            rss_delta_mb=rss_delta_mb,
+            loaded_at=datetime.now().isoformat(timespec="seconds"),
+        )
+        self._models[name] = model
+        memory_text = f"{rss_delta_mb:.1f}MB" if rss_delta_mb is not None else "未知"
+        logger.info(f"ddddocr({name}) 加载完成，耗时 {elapsed:.2f}s，内存增量 {memory_text}")
+        return model
+
+    @property
+    def threads(self) -> int | None:
+        return self._threads
+
+    def set_threads(self, threads: int) -> None:
+        """设置推理线程数；已加载的模型按新线程数重建会话。"""
+        with self._guard:
+            if threads == self._threads:
+                return
+            self._threads = threads
+        for name in list(self._models):
+            with self._lock_for(name):
+                model = self._models.get(name)
+                if model is not None:
+                    _rebuild_session(model, threads)
+        logger.info(f"ddddocr 推理线程数设为 {threads}")
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._models
+
+    def warmup(self, names: Iterable[str] = ALL_MODELS) -> None:
+        for name in names:
+            try:
+                self.get(name)
+            except Exception as e:
+                logger.warning(f"预热 ddddocr({name}) 失败: {e}")
+
+    def warmup_in_background(self, names: Iterable[str] = ALL_MODELS) -> threading.Thread:
+        thread = threading.Thread(
+            target=self.warmup, args=(tuple(names),), name="ddddocr-warmup", daemon=True
+        )
+        thread.start()
+        return thread
+
+    def stats(self) -> dict:
+        rss = current_rss_bytes()
+        return {
+            "models": [asdict(item) for item in self._stats.values()],
+            "rss_mb": rss / 1024 / 1024 if rss is not None else None,
+            "threads": self._threads,
+        }
+
+
+MODEL_REGISTRY = ModelRegistry()
+
+
+def apply_thread_profile(profile: str | int | None, registry: ModelRegistry | None = None) -> int:
+    """把线程配置同时应用到 OpenCV 与 onnxruntime，返回生效的线程数。"""
+    threads = resolve_thread_count(profile)
+    cv2.setNumThreads(threads)
+    (registry or MODEL_REGISTRY).set_threads(threads)
+    return threads
+
+
+def warmup_enabled() -> bool:
+    return os.environ.get("OCR_WARMUP", "false").strip().lower() == "true"
+
+
+def _ocr_internals(model: ddddocr.DdddOcr):
+    """取内置 OCR 模型的会话与字符集；自定义/整词模型返回 None（走逐张回退）。"""
+    if getattr(model, "det", False) or getattr(model, "use_import_onnx", False):
+        return None
+    session = getattr(model, "_DdddOcr__ort_session", None)
+    charset = getattr(model, "_DdddOcr__charset", None)
+    if session is None or not charset or getattr(model, "_DdddOcr__word", False):
+        return None
+    return session, charset
+
+
+def _ocr_input(image) -> np.ndarray:
+    """与 ddddocr 内置模型一致的预处理：等比缩放到高 64、灰度、归一化到 [-1, 1]。"""
+    if isinstance(image, bytes):
+        image = Image.open(io.BytesIO(image))
+    width = max(1, int(image.size[0] * (64 / image.size[1])))
+    gray = image.resize((width, 64), Image.LANCZOS).convert("L")
+    return (np.asarray(gray, dtype=np.float32) / 255.0 - 0.5) / 0.5
+
+
+def _ctc_decode(logits: np.ndarray, charset: list[str]) -> OcrLabel:
+    """logits 形状为 (T, C)，0 为空白类。"""
+    shifted = logits - logits.max(axis=1, keepdims=True)
+    probs = np.exp(shifted)
+    probs /= probs.sum(axis=1, keepdims=True)
+    best = probs.argmax(axis=1)
+    chars: list[str] = []
+    scores: list[float] = []
+    last = 0
+    for step, index in enumerate(best):
+        if index != last and index != 0:
+            chars.append(charset[index])
+            scores.append(float(probs[step, index]))
+        last = index
+    confidence = min(scores) if scores else float(probs[:, 0].mean())
+    return OcrLabel(text="".join(chars), confidence=confidence)
+
+
+def classify_batch(model: ddddocr.DdddOcr, images: Sequence) -> list[OcrLabel]:
+    """一次调用识别多张图片。
+
+    内置模型的 ONNX 输入 batch 维固定为 1，此时逐张推理但共用预处理与解码；
+    若模型 batch 维可变，则同宽度的图片合并为一次推理。
+    """
+    internals = _ocr_internals(model)
+    if internals is None:
+        return [OcrLabel(text=model.classification(image), confidence=None) for image in images]
+    session, charset = internals
+    batch_dim = session.get_inputs()[0].shape[0]
+    inputs = [_ocr_input(image) for image in images]
+    results: list[OcrLabel | None] = [None] * len(inputs)
+    groups: dict[int, list[int]] = {}
+    for index, array in enumerate(inputs):
+        key = array.shape[1] if batch_dim != 1 else -1 - index
+        groups.setdefault(key, []).append(index)
+    for indices in groups.values():
+        stacked = np.stack([inputs[index] for index in indices])[:, None, :, :]
+        # 输出形状 (T, B, C)
+        outputs = session.run(None, {"input1": stacked})[0]
+        for position, index in enumerate(indices):
+            results[index] = _ctc_decode(outputs[:, position, :], charset)
+    return results
+
+
+class LazyDdddOcr:
+    """延迟初始化的 ddddocr 句柄，首次调用时从进程级注册表取共享实例。"""
+
+    def __init__(self, *, det: bool = False, registry: ModelRegistry | None = None) -> None:
+        self._det = det
+        self._registry = registry or MODEL_REGISTRY
+
+    def _ensure(self) -> ddddocr.DdddOcr:
+        return self._registry.get(MODEL_DET if self._det else MODEL_OCR)
+
+    def classification(self, image):
+        """image 可为字节或 PIL 图片（与 ddddocr 一致）。"""
+        if self._det:
+            raise AttributeError("当前实例为 det 模式，无法调用 classification")
+        return self._ensure().classification(image)
+
+    def classification_batch(self, images: Sequence) -> list[OcrLabel]:
+        if self._det:
+            raise AttributeError("当前实例为 det 模式，无法调用 classification")
+        return classify_batch(self._ensure(), images)
+
+    def detection(self, image_bytes: bytes):
+        if not self._det:
+            raise AttributeError("当前实例为 ocr 模式，无法调用 detection")
+        return self._ensure().detection(image_bytes)
@@ -0,0 +1,126 @@
+"""验证码小图与候选框的批量相似度计算。"""
+
+import cv2
+import numpy as np
+
+from rainyun.utils.image import normalize_gray
+
+Box = tuple[int, int, int, int]
+
+# 模板匹配统一缩放到的边长：候选框与小图先缩放到同尺寸再做相关系数，
+# 这样整张相似度矩阵只需要一次矩阵乘法
+TEMPLATE_SIZE = 48
+
+
+def crop_boxes(background: np.ndarray, boxes: list[Box]) -> list[np.ndarray]:
+    return [background[y1:y2, x1:x2] for x1, y1, x2, y2 in boxes]
+
+
+def _is_empty(image: np.ndarray | None) -> bool:
+    return image is None or image.size == 0
+
+
+def _zero_mean_unit_vectors(images: list[np.ndarray | None], size: int) -> np.ndarray:
+    """灰度化、缩放并展平，每行减均值后归一化为单位向量（空图为全 0 行）。"""
+    vectors = np.zeros((len(images), size * size), dtype=np.float32)
+    for index, image in enumerate(images):
+        if _is_empty(image):
+            continue
+        gray = normalize_gray(image)
+        if gray.shape != (size, size):
+            gray = cv2.resize(gray, (size, size), interpolation=cv2.INTER_AREA)
+        vectors[index] = gray.reshape(-1)
+    vectors -= vectors.mean(axis=1, keepdims=True)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    # 纯色图方差为 0，相关系数无意义，按 0 分处理
+    norms[norms <= 1e-6] = np.inf
+    vectors /= norms
+    return vectors
+
+
+def template_similarity_matrix(
+    background: np.ndarray,
+    sprites: list[np.ndarray],
+    boxes: list[Box],
+    *,
+    size: int = TEMPLATE_SIZE,
+) -> np.ndarray:
+    """返回 (小图数, 候选框数) 的归一化相关系数矩阵，等价于同尺寸 TM_CCOEFF_NORMED。"""
+    sprite_vectors = _zero_mean_unit_vectors(list(sprites), size)
+    spec_vectors = _zero_mean_unit_vectors(crop_boxes(background, boxes), size)
+    return np.clip(sprite_vectors @ spec_vectors.T, -1.0, 1.0)
+
+
+class FeatureCache:
+    """单次求解内的局部特征缓存。
+
+    背景整图只提取一次关键点/描述子，再按坐标分配给各候选框；
+    小图描述子按下标缓存，特征提取次数与图片数量成正比而非配对数量。
+    """
+
+    def __init__(self, detector, background: np.ndarray) -> None:
+        self._detector = detector
+        self._background = background
+        self._points: np.ndarray | None = None
+        self._descriptors: np.ndarray | None = None
+        self._sprites: dict[int, np.ndarray | None] = {}
+
+    def _ensure_background(self) -> None:
+        if self._points is not None:
+            return
+        keypoints, descriptors = self._detector.detectAndCompute(normalize_gray(self._background), None)
+        if descriptors is None or not keypoints:
+            self._points = np.zeros((0, 2), dtype=np.float32)
+            self._descriptors = None
+            return
+        self._points = np.array([kp.pt for kp in keypoints], dtype=np.float32)
+        self._descriptors = descriptors
+
+    def box_descriptors(self, box: Box) -> np.ndarray | None:
+        self._ensure_background()
+        if self._descriptors is None:
+            return None
+        x1, y1, x2, y2 = box
+        xs, ys = self._points[:, 0], self._points[:, 1]
+        mask = (xs >= x1) & (xs < x2) & (ys >= y1) & (ys < y2)
+        if not mask.any():
+            return None
+        return self._descriptors[mask]
+
+    def sprite_descriptors(self, index: int, sprite: np.ndarray | None) -> np.ndarray | None:
+        if index not in self._sprites:
+            descriptors = None
+            if not _is_empty(sprite):
+                _, descriptors = self._detector.detectAndCompute(normalize_gray(sprite), None)
+            self._sprites[index] = descriptors
+        return self._sprites[index]
+
+
+def ratio_test_score(matcher, query: np.ndarray | None, train: np.ndarray | None, ratio: float) -> float:
+    """knn 比值检验通过数 / 匹配数，口径与逐对 SIFT 相似度一致。"""
+    if query is None or train is None or len(query) == 0 or len(train) == 0:
+        return 0.0
+    matches = matcher.knnMatch(query, train, k=2)
+    good = sum(1 for pair in matches if len(pair) == 2 and pair[0].distance < ratio * pair[1].distance)
+    if not matches or good == 0:
+        return 0.0
+    return good / len(matches)
+
+
+def feature_similarity_matrix(
+    cache: FeatureCache,
+    sprites: list[np.ndarray],
+    boxes: list[Box],
+    matcher,
+    *,
+    ratio: float = 0.8,
+) -> np.ndarray:
+    box_descriptors = [cache.box_descriptors(box) for box in boxes]
+    matrix = np.zeros((len(sprites), len(boxes)), dtype=np.float64)
+    for row, sprite in enumerate(sprites):
+        sprite_descriptors = cache.sprite_descriptors(row, sprite)
+        if sprite_descriptors is None:
+            continue
+        for col, descriptors in enumerate(box_descriptors):
+            matrix[row, col] = ratio_test_score(matcher, sprite_descriptors, descriptors, ratio)
+    return matrix
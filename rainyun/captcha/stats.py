@@ -0,0 +1,221 @@
+"""匹配策略的历史统计：命中率、结果通过率与平均耗时。
+
+计数按 DECAY 指数衰减，近期样本权重更高，验证码换代后排序能较快跟上。
+求解器据此按「期望成功率 / 耗时」排序策略，长期几乎不命中的策略会被跳过。
+为避免排序永久固化（顺序执行时只有排在前面的策略能积累样本），每次排序以
+EXPLORE_RATE 的概率把一个非首位策略提到最前，被跳过的策略也以同样概率保留试探。
+统计在内存中累积，最多每 SAVE_INTERVAL 秒写盘一次，进程退出时补写。
+"""
+
+import atexit
+import json
+import logging
+import os
+import random
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Sequence, TypeVar
+
+logger = logging.getLogger(__name__)
+
+STATS_PATH_ENV = "CAPTCHA_STATS_PATH"
+DEFAULT_STATS_PATH = "data/captcha_stats.json"
+
+DECAY = 0.995
+# 样本不足时不跳过，默认耗时按此估计
+MIN_RUNS = 20
+DEFAULT_LATENCY_MS = 50.0
+SKIP_SUCCESS_RATE = 0.05
+EXPLORE_RATE = 0.05
+SAVE_INTERVAL = 30.0
+
+T = TypeVar("T")
+
+
+@dataclass
+class MatcherStats:
+    runs: float = 0.0
+    hits: float = 0.0
+    latency_ms: float = 0.0
+    outcomes: float = 0.0
+    passes: float = 0.0
+    updated_at: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        # 拉普拉斯平滑，无样本时为 0.5
+        return (self.hits + 1) / (self.runs + 2)
+
+    @property
+    def pass_rate(self) -> float:
+        return (self.passes + 1) / (self.outcomes + 2)
+
+    @property
+    def mean_latency_ms(self) -> float:
+        return self.latency_ms / self.runs if self.runs else DEFAULT_LATENCY_MS
+
+    @property
+    def success_rate(self) -> float:
+        return self.hit_rate * self.pass_rate
+
+    @property
+    def score(self) -> float:
+        """每毫秒的期望成功数。"""
+        return self.success_rate / max(self.mean_latency_ms, 1.0)
+
+
+class MatcherStatsStore:
+    """线程安全的策略统计，更新后按 SAVE_INTERVAL 节流原子写回磁盘。"""
+
+    def __init__(
+        self, path: str, *, rng: random.Random | None = None, save_interval: float = SAVE_INTERVAL
+    ) -> None:
+        self.path = path
+        self.save_interval = save_interval
+        self._stats: dict[str, MatcherStats] = {}
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._dirty = False
+        self._last_save = 0.0
+        self._rng = rng or random.Random()
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"匹配策略统计读取失败，将重新统计: {e}")
+            return
+        matchers = raw.get("matchers") if isinstance(raw, dict) else None
+        for name, item in (matchers or {}).items():
+            if not isinstance(item, dict):
+                continue
+            try:
+                self._stats[name] = MatcherStats(
+                    runs=float(item.get("runs", 0)),
+                    hits=float(item.get("hits", 0)),
+                    latency_ms=float(item.get("latency_ms", 0)),
+                    outcomes=float(item.get("outcomes", 0)),
+                    passes=float(item.get("passes", 0)),
+                    updated_at=int(item.get("updated_at", 0)),
+                )
+            except (TypeError, ValueError):
+                continue
+
+    def _mark_dirty(self) -> None:
+        self._dirty = True
+        now = time.monotonic()
+        if now - self._last_save >= self.save_interval:
+            self._save()
+
+    def flush(self) -> None:
+        """把未写盘的统计立即写回。"""
+        with self._lock:
+            if self._dirty:
+                self._save()
+
+    def _save(self) -> None:
+        self._dirty = False
+        self._last_save = time.monotonic()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        payload = {"version": 1, "matchers": {name: asdict(item) for name, item in self._stats.items()}}
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            logger.warning(f"匹配策略统计写入失败: {e}")
+
+    def _entry(self, name: str) -> MatcherStats:
+        entry = self._stats.get(name)
+        if entry is None:
+            entry = MatcherStats()
+            self._stats[name] = entry
+        return entry
+
+    def record_attempt(self, name: str, hit: bool, elapsed: float) -> None:
+        with self._lock:
+            self._ensure_loaded()
+            entry = self._entry(name)
+            entry.runs = entry.runs * DECAY + 1
+            entry.hits = entry.hits * DECAY + (1 if hit else 0)
+            entry.latency_ms = entry.latency_ms * DECAY + elapsed * 1000
+            entry.updated_at = int(time.time())
+            self._mark_dirty()
+
+    def record_outcome(self, name: str, passed: bool) -> None:
+        """记录策略结果的最终结局：提交通过为 True，提交失败或校验未通过为 False。"""
+        with self._lock:
+            self._ensure_loaded()
+            entry = self._entry(name)
+            entry.outcomes = entry.outcomes * DECAY + 1
+            entry.passes = entry.passes * DECAY + (1 if passed else 0)
+            entry.updated_at = int(time.time())
+            self._mark_dirty()
+
+    def order(self, matchers: Sequence[T]) -> list[T]:
+        """按期望收益降序排列并剔除长期不命中的策略，至少保留一个。
+
+        matchers 需有 name 属性；分数相同时保持原顺序。以 EXPLORE_RATE 的概率
+        随机把一个非首位策略提到最前，让其他策略也能积累样本。
+        """
+        with self._lock:
+            self._ensure_loaded()
+            scored = [(self._stats.get(m.name) or MatcherStats(), index, m) for index, m in enumerate(matchers)]
+        scored.sort(key=lambda item: (-item[0].score, item[1]))
+        if len(scored) > 1 and self._rng.random() < EXPLORE_RATE:
+            explored = scored.pop(self._rng.randrange(1, len(scored)))
+            scored.insert(0, explored)
+            logger.debug(f"试探匹配策略: {explored[2].name}")
+        ordered: list[T] = []
+        for stats, _, matcher in scored:
+            poor = stats.runs >= MIN_RUNS and stats.success_rate < SKIP_SUCCESS_RATE
+            if ordered and poor and self._rng.random() >= EXPLORE_RATE:
+                logger.debug(f"跳过低命中率匹配策略: {matcher.name}（成功率 {stats.success_rate:.1%}）")
+                continue
+            ordered.append(matcher)
+        return ordered
+
+    def snapshot(self) -> dict[str, dict]:
+        with self._lock:
+            self._ensure_loaded()
+            return {
+                name: {
+                    "runs": round(item.runs, 2),
+                    "hit_rate": item.hit_rate,
+                    "pass_rate": item.pass_rate,
+                    "mean_latency_ms": item.mean_latency_ms,
+                    "score": item.score,
+                }
+                for name, item in self._stats.items()
+            }
+
+
+_stores: dict[str, MatcherStatsStore] = {}
+_stores_lock = threading.Lock()
+
+
+def stats_path_from_env() -> str:
+    return os.environ.get(STATS_PATH_ENV, "").strip() or DEFAULT_STATS_PATH
+
+
+def get_matcher_stats(path: str | None = None) -> MatcherStatsStore:
+    """同一路径在进程内共享一个统计实例。"""
+    path = path or stats_path_from_env()
+    key = os.path.abspath(path)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = MatcherStatsStore(path)
+            _stores[key] = store
+            atexit.register(store.flush)
+        return store
@@ -0,0 +1,560 @@
+"""验证码推理进程。
+
+启用 CAPTCHA_WORKER 后，ddddocr 模型与 OpenCV 匹配集中到一个独立子进程，
+各浏览器会话（线程或子进程）通过本地套接字发送图片并取回候选框、识别结果与
+MatchResult，并发会话共享同一份模型，内存不随并发数增长。
+
+子进程内由 SERVER_THREADS 个线程并行处理请求：一个会话的 SIFT 匹配不会阻塞其他会话
+的检测；onnxruntime 与 OpenCV 计算时释放 GIL，线程数按推理线程配置控制总占用。
+"""
+
+import atexit
+import itertools
+import logging
+import multiprocessing
+import os
+import secrets
+import signal
+import sys
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Any, Callable, Sequence
+
+import numpy as np
+
+from .models import (
+    MODEL_DET,
+    MODEL_OCR,
+    MODEL_REGISTRY,
+    LazyDdddOcr,
+    ModelRegistry,
+    OcrLabel,
+    apply_thread_profile,
+    classify_batch,
+    warmup_enabled,
+)
+from .stats import get_matcher_stats
+
+logger = logging.getLogger(__name__)
+
+WORKER_ENV = "CAPTCHA_WORKER"
+ADDRESS_ENV = "CAPTCHA_WORKER_ADDRESS"
+AUTHKEY_ENV = "CAPTCHA_WORKER_AUTHKEY"
+# 自动启动的推理进程把密钥写入仅本用户可读的文件，子进程经此路径连接，密钥不进入环境变量
+KEYFILE_ENV = "CAPTCHA_WORKER_KEYFILE"
+
+SERVER_THREADS = 4
+CALL_TIMEOUT = 120.0
+START_TIMEOUT = 30.0
+
+OP_DETECT = "detect"
+OP_CLASSIFY = "classify"
+OP_CLASSIFY_BATCH = "classify_batch"
+OP_SOLVE = "solve"
+OP_STATS = "stats"
+OP_CONFIGURE = "configure"
+OP_FEEDBACK = "feedback"
+
+
+class WorkerUnavailableError(RuntimeError):
+    """推理进程无法连接、已退出或响应超时。"""
+
+
+class WorkerCallError(RuntimeError):
+    """推理进程内执行请求失败。"""
+
+
+def worker_enabled() -> bool:
+    return os.environ.get(WORKER_ENV, "false").strip().lower() == "true"
+
+
+def _parse_address(text: str) -> str | tuple[str, int]:
+    host, sep, port = text.rpartition(":")
+    if sep and port.isdigit() and not text.startswith("/"):
+        return host, int(port)
+    return text
+
+
+def _format_address(address: str | tuple[str, int]) -> str:
+    if isinstance(address, tuple):
+        return f"{address[0]}:{address[1]}"
+    return str(address)
+
+
+# ---------------------------------------------------------------------------
+# 服务端（运行在推理子进程内）
+# ---------------------------------------------------------------------------
+
+
+class _Reply:
+    """同一连接上的回包需串行写入。"""
+
+    def __init__(self, conn: Connection) -> None:
+        self._conn = conn
+        self._lock = threading.Lock()
+
+    def send(self, request_id: int, result: Any) -> None:
+        if isinstance(result, Exception):
+            message = (False, f"{type(result).__name__}: {result}")
+        else:
+            message = (True, result)
+        try:
+            with self._lock:
+                self._conn.send((request_id, *message))
+        except (OSError, ValueError):
+            # 客户端已断开，丢弃回包
+            pass
+
+
+def _call(fn: Callable[..., Any], *args: Any) -> Any:
+    try:
+        return fn(*args)
+    except Exception as e:
+        return e
+
+
+class InferenceServer:
+    def __init__(self, registry: ModelRegistry = MODEL_REGISTRY, *, threads: int = SERVER_THREADS) -> None:
+        self._registry = registry
+        self._executor = ThreadPoolExecutor(max_workers=max(1, threads), thread_name_prefix="inference")
+        self._solvers: dict[tuple[bool, bool], Any] = {}
+        self._solvers_lock = threading.Lock()
+        self._requests = 0
+        self._active = 0
+        self._peak_active = 0
+        self._counter_lock = threading.Lock()
+        self._handlers: dict[str, Callable[..., Any]] = {
+            OP_DETECT: self._detect,
+            OP_CLASSIFY: self._classify,
+            OP_CLASSIFY_BATCH: self._classify_batch,
+            OP_SOLVE: self._solve,
+            OP_STATS: self._stats,
+            OP_CONFIGURE: self._configure,
+            OP_FEEDBACK: self._feedback,
+        }
+
+    def serve(self, listener: Listener) -> None:
+        while True:
+            try:
+                conn = listener.accept()
+            except multiprocessing.AuthenticationError as e:
+                logger.warning(f"推理进程拒绝未授权连接: {e}")
+                continue
+            threading.Thread(target=self._read_loop, args=(conn,), name="inference-conn", daemon=True).start()
+
+    def _read_loop(self, conn: Connection) -> None:
+        reply = _Reply(conn)
+        try:
+            while True:
+                request_id, op, args = conn.recv()
+                self._executor.submit(self._handle, reply, request_id, op, args)
+        except (EOFError, OSError):
+            pass
+        finally:
+            conn.close()
+
+    def _handle(self, reply: _Reply, request_id: int, op: str, args: tuple) -> None:
+        with self._counter_lock:
+            self._requests += 1
+            self._active += 1
+            self._peak_active = max(self._peak_active, self._active)
+        try:
+            handler = self._handlers.get(op)
+            if handler is None:
+                result: Any = ValueError(f"未知请求类型: {op}")
+            else:
+                result = _call(handler, *args)
+        finally:
+            with self._counter_lock:
+                self._active -= 1
+        reply.send(request_id, result)
+
+    def _detect(self, image_bytes: bytes) -> Any:
+        return self._registry.get(MODEL_DET).detection(image_bytes)
+
+    def _classify(self, image) -> str:
+        return self._classify_batch([image])[0].text
+
+    def _classify_batch(self, images: list) -> list[OcrLabel]:
+        return classify_batch(self._registry.get(MODEL_OCR), images)
+
+    def _solve(self, background, sprites, bboxes, concurrent: bool, adaptive: bool) -> Any:
+        return self._solver(concurrent, adaptive).solve(background, sprites, bboxes)
+
+    def _solver(self, concurrent: bool, adaptive: bool):
+        with self._solvers_lock:
+            solver = self._solvers.get((concurrent, adaptive))
+            if solver is None:
+                # 延迟导入：匹配器定义在 rainyun.main，避免循环导入
+                from rainyun.main import StrategyCaptchaSolver, build_default_matchers, check_answer
+
+                solver = StrategyCaptchaSolver(
+                    build_default_matchers(),
+                    concurrent=concurrent,
+                    accept=check_answer,
+                    stats=get_matcher_stats() if adaptive else None,
+                )
+                self._solvers[(concurrent, adaptive)] = solver
+            return solver
+
+    def _feedback(self, result, passed: bool) -> None:
+        """提交结果回传：策略统计由推理进程独占写入，避免多个进程覆盖同一文件。"""
+        self._solver(False, True).record_outcome(result, passed)
+
+    def _configure(self, thread_profile: str) -> int:
+        """线程配置在推理进程内生效。"""
+        return apply_thread_profile(thread_profile)
+
+    def _stats(self) -> dict:
+        with self._counter_lock:
+            counters = {"requests": self._requests, "active": self._active, "peak_active": self._peak_active}
+        return {"pid": os.getpid(), **counters, **self._registry.stats()}
+
+
+def _exit_on_sigterm() -> None:
+    """SIGTERM 时正常退出，让 atexit 写回节流中的策略统计。"""
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+
+def _worker_main(ready: Connection, authkey: bytes) -> None:
+    logging.basicConfig(
+        level=os.environ.get("LOG_LEVEL", "INFO"),
+        format="%(asctime)s - %(levelname)s - %(message)s",
+    )
+    listener = Listener(None, authkey=authkey)
+    ready.send(listener.address)
+    ready.close()
+    logger.info(f"验证码推理进程已就绪 (pid={os.getpid()})")
+    if warmup_enabled():
+        MODEL_REGISTRY.warmup()
+    _exit_on_sigterm()
+    InferenceServer().serve(listener)
+
+
+# ---------------------------------------------------------------------------
+# 客户端（运行在浏览器会话所在进程）
+# ---------------------------------------------------------------------------
+
+
+class InferenceClient:
+    """单连接多路复用：多个线程可同时发起请求，按请求 ID 分发回包。"""
+
+    def __init__(self, address: str | tuple[str, int], authkey: bytes, *, timeout: float = CALL_TIMEOUT) -> None:
+        self.address = address
+        self.timeout = timeout
+        self._conn = Client(address, authkey=authkey)
+        self._send_lock = threading.Lock()
+        self._pending: dict[int, Future] = {}
+        self._pending_lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._closed = False
+        threading.Thread(target=self._read_loop, name="inference-client", daemon=True).start()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def call(self, op: str, *args: Any, timeout: float | None = None) -> Any:
+        if self._closed:
+            raise WorkerUnavailableError("推理进程连接已断开")
+        request_id = next(self._ids)
+        future: Future = Future()
+        with self._pending_lock:
+            self._pending[request_id] = future
+        try:
+            with self._send_lock:
+                self._conn.send((request_id, op, args))
+        except (OSError, ValueError) as e:
+            self._discard(request_id)
+            self._closed = True
+            raise WorkerUnavailableError(f"发送推理请求失败: {e}") from e
+        try:
+            return future.result(timeout=timeout or self.timeout)
+        except FutureTimeoutError:
+            self._discard(request_id)
+            raise WorkerUnavailableError(f"推理进程响应超时: {op}") from None
+
+    def _discard(self, request_id: int) -> None:
+        with self._pending_lock:
+            self._pending.pop(request_id, None)
+
+    def _read_loop(self) -> None:
+        try:
+            while True:
+                request_id, ok, value = self._conn.recv()
+                with self._pending_lock:
+                    future = self._pending.pop(request_id, None)
+                if future is None:
+                    continue
+                if ok:
+                    future.set_result(value)
+                else:
+                    future.set_exception(WorkerCallError(value))
+        except (EOFError, OSError):
+            pass
+        finally:
+            self._closed = True
+            with self._pending_lock:
+                pending, self._pending = self._pending, {}
+            for future in pending.values():
+                future.set_exception(WorkerUnavailableError("推理进程连接已断开"))
+
+    def detection(self, image_bytes: bytes):
+        return self.call(OP_DETECT, image_bytes)
+
+    def classification(self, image):
+        return self.call(OP_CLASSIFY, image)
+
+    def classification_batch(self, images: Sequence) -> list[OcrLabel]:
+        return self.call(OP_CLASSIFY_BATCH, list(images))
+
+    def solve(
+        self,
+        background: np.ndarray,
+        sprites: list[np.ndarray],
+        bboxes: list[tuple[int, int, int, int]],
+        *,
+        concurrent: bool = False,
+        adaptive: bool = False,
+    ):
+        return self.call(OP_SOLVE, background, sprites, list(bboxes), concurrent, adaptive)
+
+    def feedback(self, result, passed: bool) -> None:
+        self.call(OP_FEEDBACK, result, passed, timeout=10)
+
+    def stats(self) -> dict:
+        return self.call(OP_STATS, timeout=5)
+
+    def configure(self, thread_profile: str) -> int:
+        """在推理进程内应用线程配置，返回生效的线程数。"""
+        return self.call(OP_CONFIGURE, thread_profile, timeout=60)
+
+    def close(self) -> None:
+        self._closed = True
+        try:
+            self._conn.close()
+        except OSError:
+            pass
+
+
+class RemoteDdddOcr:
+    """与 LazyDdddOcr 同接口的远程句柄，推理进程不可用时回退为进程内模型。"""
+
+    def __init__(self, client: InferenceClient, *, det: bool = False) -> None:
+        self._client = client
+        self._det = det
+        self._fallback = LazyDdddOcr(det=det)
+
+    def classification(self, image):
+        if self._det:
+            raise AttributeError("当前实例为 det 模式，无法调用 classification")
+        try:
+            return self._client.classification(image)
+        except WorkerUnavailableError as e:
+            logger.warning(f"推理进程不可用，回退为进程内识别: {e}")
+            return self._fallback.classification(image)
+
+    def classification_batch(self, images: Sequence) -> list[OcrLabel]:
+        if self._det:
+            raise AttributeError("当前实例为 det 模式，无法调用 classification")
+        try:
+            return self._client.classification_batch(images)
+        except WorkerUnavailableError as e:
+            logger.warning(f"推理进程不可用，回退为进程内识别: {e}")
+            return self._fallback.classification_batch(images)
+
+    def detection(self, image_bytes: bytes):
+        if not self._det:
+            raise AttributeError("当前实例为 ocr 模式，无法调用 detection")
+        try:
+            return self._client.detection(image_bytes)
+        except WorkerUnavailableError as e:
+            logger.warning(f"推理进程不可用，回退为进程内检测: {e}")
+            return self._fallback.detection(image_bytes)
+
+
+class RemoteCaptchaSolver:
+    """在推理进程内求解，推理进程不可用时回退为本地求解器。"""
+
+    def __init__(self, client: InferenceClient, *, concurrent: bool, adaptive: bool = False, fallback) -> None:
+        self._client = client
+        self._concurrent = concurrent
+        self._adaptive = adaptive
+        self._fallback = fallback
+
+    def solve(
+        self,
+        background: np.ndarray,
+        sprites: list[np.ndarray],
+        bboxes: list[tuple[int, int, int, int]],
+    ):
+        try:
+            return self._client.solve(
+                background, sprites, bboxes, concurrent=self._concurrent, adaptive=self._adaptive
+            )
+        except WorkerUnavailableError as e:
+            logger.warning(f"推理进程不可用，回退为本地求解: {e}")
+        except WorkerCallError as e:
+            logger.warning(f"推理进程求解失败，回退为本地求解: {e}")
+        return self._fallback.solve(background, sprites, bboxes)
+
+    def record_outcome(self, result, passed: bool) -> None:
+        if not self._adaptive:
+            return
+        try:
+            self._client.feedback(result, passed)
+        except (WorkerUnavailableError, WorkerCallError) as e:
+            logger.debug(f"推理进程记录提交结果失败: {e}")
+
+
+_client_lock = threading.Lock()
+_client: InferenceClient | None = None
+_process: multiprocessing.process.BaseProcess | None = None
+
+
+def _write_keyfile(authkey: bytes) -> str:
+    # mkstemp 创建的文件权限为 0600
+    fd, path = tempfile.mkstemp(prefix="rainyun-worker-", suffix=".key")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(authkey.hex())
+    atexit.register(_remove_file, path)
+    return path
+
+
+def _remove_file(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _read_authkey() -> bytes | None:
+    """密钥优先取 CAPTCHA_WORKER_AUTHKEY（独立部署时手动配置），否则读取密钥文件。"""
+    authkey_text = os.environ.get(AUTHKEY_ENV, "").strip()
+    if not authkey_text:
+        keyfile = os.environ.get(KEYFILE_ENV, "").strip()
+        if not keyfile:
+            return None
+        try:
+            with open(keyfile, "r", encoding="utf-8") as f:
+                authkey_text = f.read().strip()
+        except OSError:
+            return None
+    try:
+        return bytes.fromhex(authkey_text)
+    except ValueError:
+        return None
+
+
+def _connect_existing() -> InferenceClient | None:
+    address_text = os.environ.get(ADDRESS_ENV, "").strip()
+    authkey = _read_authkey()
+    if not address_text or authkey is None or (_process is not None and not _process.is_alive()):
+        return None
+    try:
+        return InferenceClient(_parse_address(address_text), authkey)
+    except (OSError, ValueError, multiprocessing.AuthenticationError) as e:
+        logger.warning(f"连接推理进程 {address_text} 失败: {e}")
+        return None
+
+
+def _spawn_worker() -> tuple[str | tuple[str, int], bytes]:
+    global _process
+    mp_context = multiprocessing.get_context("spawn")
+    authkey = secrets.token_bytes(16)
+    reader, writer = mp_context.Pipe(duplex=False)
+    process = mp_context.Process(
+        target=_worker_main,
+        args=(writer, authkey),
+        name="captcha-worker",
+        daemon=True,
+    )
+    process.start()
+    writer.close()
+    try:
+        if not reader.poll(START_TIMEOUT):
+            process.terminate()
+            raise WorkerUnavailableError("推理进程启动超时")
+        address = reader.recv()
+    except EOFError:
+        raise WorkerUnavailableError(f"推理进程启动失败 (exitcode={process.exitcode})") from None
+    finally:
+        reader.close()
+    _process = process
+    # 地址与密钥文件路径写回环境变量，由本进程派生的子进程可直接连接同一个推理进程
+    os.environ[ADDRESS_ENV] = _format_address(address)
+    os.environ[KEYFILE_ENV] = _write_keyfile(authkey)
+    logger.info(f"验证码推理进程已启动 (pid={process.pid})")
+    return address, authkey
+
+
+def _connect() -> InferenceClient:
+    client = _connect_existing()
+    if client is not None:
+        return client
+    address, authkey = _spawn_worker()
+    return InferenceClient(address, authkey)
+
+
+def get_inference_client() -> InferenceClient | None:
+    """返回进程内共享的推理进程客户端；未启用或启动失败时返回 None。"""
+    global _client
+    if not worker_enabled():
+        return None
+    client = _client
+    if client is not None and not client.closed:
+        return client
+    with _client_lock:
+        if _client is not None and not _client.closed:
+            return _client
+        try:
+            _client = _connect()
+        except Exception as e:
+            logger.warning(f"验证码推理进程不可用，使用进程内推理: {e}")
+            _client = None
+        return _client
+
+
+def peek_inference_client() -> InferenceClient | None:
+    """返回已有的推理进程连接；不会启动推理进程，供状态查询等只读场景使用。"""
+    global _client
+    if not worker_enabled():
+        return None
+    with _client_lock:
+        if _client is None or _client.closed:
+            _client = _connect_existing()
+        return _client
+
+
+def warmup_in_background() -> None:
+    """按运行模式预热：启用推理进程时启动并预热子进程，否则预热进程内模型。"""
+    if not warmup_enabled():
+        return
+    if worker_enabled():
+        threading.Thread(target=get_inference_client, name="captcha-worker-start", daemon=True).start()
+        return
+    MODEL_REGISTRY.warmup_in_background()
+
+
+def main() -> None:
+    """独立运行推理进程：python -m rainyun.captcha.worker（地址与密钥取自环境变量或密钥文件）。"""
+    address_text = os.environ.get(ADDRESS_ENV, "").strip()
+    authkey = _read_authkey()
+    if not address_text or authkey is None:
+        raise SystemExit(f"请设置 {ADDRESS_ENV} 与 {AUTHKEY_ENV}（或 {KEYFILE_ENV}）")
+    logging.basicConfig(
+        level=os.environ.get("LOG_LEVEL", "INFO"),
+        format="%(asctime)s - %(levelname)s - %(message)s",
+    )
+    listener = Listener(_parse_address(address_text), authkey=authkey)
+    logger.info(f"验证码推理进程监听 {address_text}")
+    if warmup_enabled():
+        MODEL_REGISTRY.warmup()
+    _exit_on_sigterm()
+    InferenceServer().serve(listener)
+
+
+if __name__ == "__main__":
+    main()
@@ -254,10 +254,22 @@ class Config:
     api_base_url: str
     app_version: str
     cookie_file: str
+    captcha_cache_path: str
+    captcha_stats_path: str
+    captcha_outcomes_path: str
+    captcha_confidence_path: str
     points_to_cny_rate: int
     captcha_retry_limit: int
     captcha_retry_unlimited: bool
     captcha_save_samples: bool
+    captcha_parallel_matchers: bool
+    captcha_capture: bool
+    captcha_answer_cache: bool
+    captcha_answer_cache_size: int
+    captcha_adaptive_matchers: bool
+    captcha_click_delay: float
+    captcha_submit_threshold: float
+    inference_threads: str
     request_timeout: int
     max_retries: int
     retry_delay: float
@@ -293,11 +305,23 @@ class Config:
         api_base_url = _read_str(env, "API_BASE_URL", "https://api.v2.rainyun.com").rstrip("/")
         app_version = _read_str(env, "APP_VERSION", "3.0")
         cookie_file = _read_str(env, "COOKIE_FILE", "data/cookies/cookies.json")
+        captcha_cache_path = _read_str(env, "CAPTCHA_CACHE_PATH", "data/captcha_cache.json")
+        captcha_stats_path = _read_str(env, "CAPTCHA_STATS_PATH", "data/captcha_stats.json")
+        captcha_outcomes_path = _read_str(env, "CAPTCHA_OUTCOMES_PATH", "data/captcha_outcomes.jsonl")
+        captcha_confidence_path = _read_str(env, "CAPTCHA_CONFIDENCE_PATH", "data/captcha_confidence.json")
 
         points_to_cny_rate = 2000
         captcha_retry_limit = 5
         captcha_retry_unlimited = False
         captcha_save_samples = False
+        captcha_parallel_matchers = False
+        captcha_capture = False
+        captcha_answer_cache = True
+        captcha_answer_cache_size = 500
+        captcha_adaptive_matchers = True
+        captcha_click_delay = 0.2
+        captcha_submit_threshold = 0.0
+        inference_threads = "auto"
 
         request_timeout = 15
         max_retries = 3
@@ -334,10 +358,22 @@ class Config:
             api_base_url=api_base_url,
             app_version=app_version,
             cookie_file=cookie_file,
+            captcha_cache_path=captcha_cache_path,
+            captcha_stats_path=captcha_stats_path,
+            captcha_outcomes_path=captcha_outcomes_path,
+            captcha_confidence_path=captcha_confidence_path,
             points_to_cny_rate=points_to_cny_rate,
             captcha_retry_limit=captcha_retry_limit,
             captcha_retry_unlimited=captcha_retry_unlimited,
             captcha_save_samples=captcha_save_samples,
+            captcha_parallel_matchers=captcha_parallel_matchers,
+            captcha_capture=captcha_capture,
+            captcha_answer_cache=captcha_answer_cache,
+            captcha_answer_cache_size=captcha_answer_cache_size,
+            captcha_adaptive_matchers=captcha_adaptive_matchers,
+            captcha_click_delay=captcha_click_delay,
+            captcha_submit_threshold=captcha_submit_threshold,
+            inference_threads=inference_threads,
             request_timeout=request_timeout,
             max_retries=max_retries,
             retry_delay=retry_delay,
@@ -374,6 +410,12 @@ class Config:
         api_base_url = _coerce_str_value(payload.get("api_base_url"), base.api_base_url).rstrip("/")
         app_version = _coerce_str_value(payload.get("app_version"), base.app_version)
         cookie_file = _coerce_str_value(payload.get("cookie_file"), base.cookie_file)
+        captcha_cache_path = _coerce_str_value(payload.get("captcha_cache_path"), base.captcha_cache_path)
+        captcha_stats_path = _coerce_str_value(payload.get("captcha_stats_path"), base.captcha_stats_path)
+        captcha_outcomes_path = _coerce_str_value(payload.get("captcha_outcomes_path"), base.captcha_outcomes_path)
+        captcha_confidence_path = _coerce_str_value(
+            payload.get("captcha_confidence_path"), base.captcha_confidence_path
+        )
 
         points_to_cny_rate = _coerce_int_value(payload.get("points_to_cny_rate"), base.points_to_cny_rate)
         captcha_retry_limit = _coerce_int_value(payload.get("captcha_retry_limit"), base.captcha_retry_limit)
@@ -381,6 +423,26 @@ class Config:
             payload.get("captcha_retry_unlimited"), base.captcha_retry_unlimited
         )
         captcha_save_samples = _coerce_bool_value(payload.get("captcha_save_samples"), base.captcha_save_samples)
+        captcha_parallel_matchers = _coerce_bool_value(
+            payload.get("captcha_parallel_matchers"), base.captcha_parallel_matchers
+        )
+        captcha_capture = _coerce_bool_value(payload.get("captcha_capture"), base.captcha_capture)
+        captcha_answer_cache = _coerce_bool_value(
+            payload.get("captcha_answer_cache"), base.captcha_answer_cache
+        )
+        captcha_answer_cache_size = _coerce_int_value(
+            payload.get("captcha_answer_cache_size"), base.captcha_answer_cache_size
+        )
+        captcha_adaptive_matchers = _coerce_bool_value(
+            payload.get("captcha_adaptive_matchers"), base.captcha_adaptive_matchers
+        )
+        captcha_click_delay = _coerce_float_value(
+            payload.get("captcha_click_delay"), base.captcha_click_delay
+        )
+        captcha_submit_threshold = _coerce_float_value(
+            payload.get("captcha_submit_threshold"), base.captcha_submit_threshold
+        )
+        inference_threads = _coerce_str_value(payload.get("inference_threads"), base.inference_threads)
 
         request_timeout = _coerce_int_value(payload.get("request_timeout"), base.request_timeout)
         max_retries = _coerce_int_value(payload.get("max_retries"), base.max_retries)
@@ -435,10 +497,22 @@ class Config:
             api_base_url=api_base_url,
             app_version=app_version,
             cookie_file=cookie_file,
+            captcha_cache_path=captcha_cache_path,
+            captcha_stats_path=captcha_stats_path,
+            captcha_outcomes_path=captcha_outcomes_path,
+            captcha_confidence_path=captcha_confidence_path,
             points_to_cny_rate=points_to_cny_rate,
             captcha_retry_limit=captcha_retry_limit,
             captcha_retry_unlimited=captcha_retry_unlimited,
             captcha_save_samples=captcha_save_samples,
+            captcha_parallel_matchers=captcha_parallel_matchers,
+            captcha_capture=captcha_capture,
+            captcha_answer_cache=captcha_answer_cache,
+            captcha_answer_cache_size=captcha_answer_cache_size,
+            captcha_adaptive_matchers=captcha_adaptive_matchers,
+            captcha_click_delay=captcha_click_delay,
+            captcha_submit_threshold=captcha_submit_threshold,
+            inference_threads=inference_threads,
             request_timeout=request_timeout,
             max_retries=max_retries,
             retry_delay=retry_delay,
@@ -483,6 +557,14 @@ class Config:
         captcha_retry_limit = base.captcha_retry_limit
         captcha_retry_unlimited = base.captcha_retry_unlimited
         captcha_save_samples = base.captcha_save_samples
+        captcha_parallel_matchers = base.captcha_parallel_matchers
+        captcha_capture = base.captcha_capture
+        captcha_answer_cache = base.captcha_answer_cache
+        captcha_answer_cache_size = base.captcha_answer_cache_size
+        captcha_adaptive_matchers = base.captcha_adaptive_matchers
+        captcha_click_delay = base.captcha_click_delay
+        captcha_submit_threshold = base.captcha_submit_threshold
+        inference_threads = base.inference_threads
         skip_push_title = base.skip_push_title
         push_config = DEFAULT_PUSH_CONFIG.copy()
         notify_channels: list[dict[str, Any]] = []
@@ -504,6 +586,20 @@ class Config:
                 settings, "captcha_retry_unlimited", captcha_retry_unlimited
             )
             captcha_save_samples = getattr(settings, "captcha_save_samples", captcha_save_samples)
+            captcha_parallel_matchers = getattr(
+                settings, "captcha_parallel_matchers", captcha_parallel_matchers
+            )
+            captcha_capture = getattr(settings, "captcha_capture", captcha_capture)
+            captcha_answer_cache = getattr(settings, "captcha_answer_cache", captcha_answer_cache)
+            captcha_answer_cache_size = getattr(
+                settings, "captcha_answer_cache_size", captcha_answer_cache_size
+            )
+            captcha_adaptive_matchers = getattr(
+                settings, "captcha_adaptive_matchers", captcha_adaptive_matchers
+            )
+            captcha_click_delay = getattr(settings, "captcha_click_delay", captcha_click_delay)
+            captcha_submit_threshold = getattr(settings, "captcha_submit_threshold", captcha_submit_threshold)
+            inference_threads = getattr(settings, "inference_threads", inference_threads)
             skip_push_title = getattr(settings, "skip_push_title", skip_push_title)
             notify_config = getattr(settings, "notify_config", None)
             if isinstance(notify_config, Mapping):
@@ -558,6 +654,14 @@ class Config:
             captcha_retry_limit=captcha_retry_limit,
             captcha_retry_unlimited=captcha_retry_unlimited,
             captcha_save_samples=captcha_save_samples,
+            captcha_parallel_matchers=captcha_parallel_matchers,
+            captcha_capture=captcha_capture,
+            captcha_answer_cache=captcha_answer_cache,
+            captcha_answer_cache_size=captcha_answer_cache_size,
+            captcha_adaptive_matchers=captcha_adaptive_matchers,
+            captcha_click_delay=captcha_click_delay,
+            captcha_submit_threshold=captcha_submit_threshold,
+            inference_threads=inference_threads,
             skip_push_title=skip_push_title,
             push_config=push_config,
             notify_channels=notify_channels,
@@ -194,6 +194,8 @@ class Settings:
     cron_schedule: str = "0 8 * * *"
     timeout: int = 15
     max_delay: int = 90
+    checkin_concurrency: int = 1
+    checkin_http_probe: bool = True
     debug: bool = False
     request_timeout: int = 15
     max_retries: int = 3
@@ -204,6 +206,14 @@ class Settings:
     captcha_retry_limit: int = 5
     captcha_retry_unlimited: bool = False
     captcha_save_samples: bool = False
+    captcha_parallel_matchers: bool = False
+    captcha_capture: bool = False
+    captcha_answer_cache: bool = True
+    captcha_answer_cache_size: int = 500
+    captcha_adaptive_matchers: bool = True
+    captcha_click_delay: float = 0.2
+    captcha_submit_threshold: float = 0.0
+    inference_threads: str = "auto"
     skip_push_title: str = ""
     notify_config: dict[str, str] = field(default_factory=dict)
     notify_channels: list[dict[str, Any]] = field(default_factory=list)
@@ -218,6 +228,8 @@ class Settings:
             cron_schedule=_read_str(payload, "cron_schedule", "0 8 * * *"),
             timeout=_read_int(payload, "timeout", 15),
             max_delay=_read_int(payload, "max_delay", 90),
+            checkin_concurrency=_read_int(payload, "checkin_concurrency", 1),
+            checkin_http_probe=_read_bool(payload, "checkin_http_probe", True),
             debug=_read_bool(payload, "debug", False),
             request_timeout=_read_int(payload, "request_timeout", 15),
             max_retries=_read_int(payload, "max_retries", 3),
@@ -228,6 +240,14 @@ class Settings:
             captcha_retry_limit=_read_int(payload, "captcha_retry_limit", 5),
             captcha_retry_unlimited=_read_bool(payload, "captcha_retry_unlimited", False),
             captcha_save_samples=_read_bool(payload, "captcha_save_samples", False),
+            captcha_parallel_matchers=_read_bool(payload, "captcha_parallel_matchers", False),
+            captcha_capture=_read_bool(payload, "captcha_capture", False),
+            captcha_answer_cache=_read_bool(payload, "captcha_answer_cache", True),
+            captcha_answer_cache_size=_read_int(payload, "captcha_answer_cache_size", 500),
+            captcha_adaptive_matchers=_read_bool(payload, "captcha_adaptive_matchers", True),
+            captcha_click_delay=_read_float(payload, "captcha_click_delay", 0.2),
+            captcha_submit_threshold=_read_float(payload, "captcha_submit_threshold", 0.0),
+            inference_threads=_read_str(payload, "inference_threads", "auto"),
             skip_push_title=_read_str(payload, "skip_push_title", ""),
             notify_config=_read_dict_str(payload, "notify_config"),
             notify_channels=_read_list_dict(payload, "notify_channels"),
@@ -241,6 +261,8 @@ class Settings:
             "cron_schedule": self.cron_schedule,
             "timeout": self.timeout,
             "max_delay": self.max_delay,
+            "checkin_concurrency": self.checkin_concurrency,
+            "checkin_http_probe": self.checkin_http_probe,
             "debug": self.debug,
             "request_timeout": self.request_timeout,
             "max_retries": self.max_retries,
@@ -251,6 +273,14 @@ class Settings:
             "captcha_retry_limit": self.captcha_retry_limit,
             "captcha_retry_unlimited": self.captcha_retry_unlimited,
             "captcha_save_samples": self.captcha_save_samples,
+            "captcha_parallel_matchers": self.captcha_parallel_matchers,
+            "captcha_capture": self.captcha_capture,
+            "captcha_answer_cache": self.captcha_answer_cache,
+            "captcha_answer_cache_size": self.captcha_answer_cache_size,
+            "captcha_adaptive_matchers": self.captcha_adaptive_matchers,
+            "captcha_click_delay": self.captcha_click_delay,
+            "captcha_submit_threshold": self.captcha_submit_threshold,
+            "inference_threads": self.inference_threads,
             "skip_push_title": self.skip_push_title,
             "notify_config": dict(self.notify_config),
             "notify_channels": list(self.notify_channels),
@@ -5,16 +5,34 @@ import re
 import shutil
 import time
 from collections import deque
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
 from datetime import datetime
-from itertools import combinations, permutations
-from threading import Lock
-from typing import Protocol, Sequence
+from threading import Lock, local
+from typing import Callable, Protocol, Sequence
 
 import cv2
-import ddddocr
 import numpy as np
 from .api.client import RainyunAPI
+from .captcha.archive import get_sample_archive
+from .captcha.assignment import best_assignment
+from .captcha.cache import captcha_key, get_answer_cache
+from .captcha.confidence import (
+    EXPLORE_RATE as CONFIDENCE_EXPLORE_RATE,
+    answer_features,
+    load_confidence_model,
+    record_outcome as record_submit_outcome,
+)
+from .captcha.models import LazyDdddOcr, apply_thread_profile
+from .captcha.similarity import FeatureCache, feature_similarity_matrix, template_similarity_matrix
+from .captcha.stats import MatcherStatsStore, get_matcher_stats
+from .captcha.worker import (
+    RemoteCaptchaSolver,
+    RemoteDdddOcr,
+    WorkerCallError,
+    WorkerUnavailableError,
+    get_inference_client,
+)
 from selenium.common.exceptions import TimeoutException
 from selenium.webdriver import ActionChains
 from selenium.webdriver.support import expected_conditions as EC
@@ -25,28 +43,34 @@ from .browser.cookies import load_cookies
 from .browser.locators import XPATH_CONFIG
 from .browser.pages import LoginPage, RewardPage
 from .browser.session import BrowserSession, RuntimeContext
-from .utils.http import download_bytes, download_to_file
-from .utils.image import decode_image_bytes, encode_image_bytes, normalize_gray, split_sprite_image
+from .browser.waits import (
+    captcha_background_url,
+    click_when_ready,
+    wait_for_background_change,
+    wait_for_captcha_result,
+)
+from .utils.http import download_many
+from .utils.image import EncodedImage, decode_image_bytes, split_sprite_image, to_pil_image
 
-# 用户日志前缀（用于多账号区分）
-_LOG_USER_PREFIX = ""
+# 验证码样本归档目录（rainyun.bench.captcha 默认从这里回放）
+SAMPLES_DIR = os.path.join("temp", "captcha_samples")
+# 最后一次图标点击与点击确认之间的最短间隔（秒），captcha_click_delay 为 0 时同样生效
+MIN_CONFIRM_PAUSE = 0.3
+
+# 用户日志前缀（用于多账号区分）；按线程保存，并发签到时各账户互不覆盖
+_log_context = local()
 
 
 def _set_log_user(user: str | None) -> None:
-    global _LOG_USER_PREFIX
-    if user:
-        _LOG_USER_PREFIX = f"用户 {user} "
-    else:
-        _LOG_USER_PREFIX = ""
+    _log_context.prefix = f"用户 {user} " if user else ""
 
 
 def _set_log_prefix(prefix: str) -> None:
-    global _LOG_USER_PREFIX
-    _LOG_USER_PREFIX = prefix
+    _log_context.prefix = prefix
 
 
 def _get_log_prefix() -> str:
-    return _LOG_USER_PREFIX
+    return getattr(_log_context, "prefix", "")
 
 
 # 自定义异常：验证码处理过程中可重试的错误
@@ -55,33 +79,6 @@ class CaptchaRetryableError(Exception):
     pass
 
 
-class LazyDdddOcr:
-    """延迟初始化的 ddddocr，只有首次调用才创建实例。"""
-
-    def __init__(self, *, det: bool = False) -> None:
-        self._det = det
-        self._instance: ddddocr.DdddOcr | None = None
-
-    def _ensure(self) -> ddddocr.DdddOcr:
-        if self._instance is None:
-            if self._det:
-                logging.getLogger(__name__).info(f"{_get_log_prefix()}初始化 ddddocr(det)")
-                self._instance = ddddocr.DdddOcr(det=True, show_ad=False)
-            else:
-                logging.getLogger(__name__).info(f"{_get_log_prefix()}初始化 ddddocr(ocr)")
-                self._instance = ddddocr.DdddOcr(ocr=True, show_ad=False)
-        return self._instance
-
-    def classification(self, image_bytes: bytes):
-        if self._det:
-            raise AttributeError("当前实例为 det 模式，无法调用 classification")
-        return self._ensure().classification(image_bytes)
-
-    def detection(self, image_bytes: bytes):
-        if not self._det:
-            raise AttributeError("当前实例为 ocr 模式，无法调用 detection")
-        return self._ensure().detection(image_bytes)
-
 try:
     from .notify import configure, send
 
@@ -152,6 +149,15 @@ class MatchResult:
     positions: list[tuple[int, int]]
     similarities: list[float]
     method: str
+    # 各小图所选候选框得分与同行次优得分之差，以及所选候选框（缓存命中时为空）
+    margins: list[float] = field(default_factory=list)
+    boxes: list[tuple[int, int, int, int]] = field(default_factory=list)
+
+
+# (背景图, 小图列表, 合法候选框) -> (小图数, 候选框数) 相似度矩阵
+SimilarityMatrixFn = Callable[
+    [np.ndarray, list[np.ndarray], list[tuple[int, int, int, int]]], np.ndarray
+]
 
 
 class CaptchaMatcher(Protocol):
@@ -175,10 +181,39 @@ class CaptchaSolver(Protocol):
     ) -> MatchResult | None:
         ...
 
+    def record_outcome(self, result: MatchResult, passed: bool) -> None:
+        ...
+
 
 class StrategyCaptchaSolver:
-    def __init__(self, matchers: Sequence[CaptchaMatcher]) -> None:
+    def __init__(
+        self,
+        matchers: Sequence[CaptchaMatcher],
+        *,
+        concurrent: bool = False,
+        accept: Callable[[MatchResult], bool] | None = None,
+        max_workers: int = 2,
+        stats: MatcherStatsStore | None = None,
+    ) -> None:
         self.matchers = list(matchers)
+        self.concurrent = concurrent
+        self.accept = accept
+        self.max_workers = max_workers
+        # 提供统计时按历史期望收益排序/跳过策略，否则按固定顺序
+        self.stats = stats
+
+    def _ordered_matchers(self) -> list[CaptchaMatcher]:
+        if self.stats is None:
+            return self.matchers
+        return self.stats.order(self.matchers)
+
+    def _record_attempt(self, matcher: CaptchaMatcher, result: MatchResult | None, elapsed: float) -> None:
+        if self.stats is not None:
+            self.stats.record_attempt(matcher.name, bool(result), elapsed)
+
+    def record_outcome(self, result: MatchResult, passed: bool) -> None:
+        if self.stats is not None and any(matcher.name == result.method for matcher in self.matchers):
+            self.stats.record_outcome(result.method, passed)
 
     def solve(
         self,
@@ -186,21 +221,91 @@ class StrategyCaptchaSolver:
         sprites: list[np.ndarray],
         bboxes: list[tuple[int, int, int, int]],
     ) -> MatchResult | None:
+        matchers = self._ordered_matchers()
+        if self.concurrent and len(matchers) > 1:
+            return self._solve_concurrent(matchers, background, sprites, bboxes)
         prefix = _get_log_prefix()
-        for matcher in self.matchers:
-            result = matcher.match(background, sprites, bboxes)
+        for matcher in matchers:
+            result, elapsed = _timed_match(matcher, background, sprites, bboxes)
+            self._record_attempt(matcher, result, elapsed)
             if result:
-                logger.info(f"{prefix}验证码匹配策略命中: {matcher.name}")
+                logger.info(f"{prefix}验证码匹配策略命中: {matcher.name}（耗时 {elapsed * 1000:.0f}ms）")
                 return result
-            logger.warning(f"{prefix}验证码匹配策略失败: {matcher.name}")
+            logger.warning(f"{prefix}验证码匹配策略失败: {matcher.name}（耗时 {elapsed * 1000:.0f}ms）")
         return None
 
+    def _solve_concurrent(
+        self,
+        matchers: list[CaptchaMatcher],
+        background: np.ndarray,
+        sprites: list[np.ndarray],
+        bboxes: list[tuple[int, int, int, int]],
+    ) -> MatchResult | None:
+        """并行执行所有策略（OpenCV 计算期间会释放 GIL）。
+
+        返回最先通过 accept 校验的结果；都未通过时返回得分最高的结果。
+        """
+        prefix = _get_log_prefix()
+        started = time.perf_counter()
+        executor = ThreadPoolExecutor(
+            max_workers=max(1, min(self.max_workers, len(matchers))),
+            thread_name_prefix="captcha-matcher",
+        )
+        futures = {
+            executor.submit(_timed_match, matcher, background, sprites, bboxes): matcher
+            for matcher in matchers
+        }
+        candidates: list[tuple[MatchResult, str]] = []
+        try:
+            for future in as_completed(futures):
+                matcher = futures[future]
+                result, elapsed = future.result()
+                self._record_attempt(matcher, result, elapsed)
+                if not result:
+                    logger.warning(f"{prefix}验证码匹配策略失败: {matcher.name}（耗时 {elapsed * 1000:.0f}ms）")
+                    continue
+                logger.info(f"{prefix}验证码匹配策略完成: {matcher.name}（耗时 {elapsed * 1000:.0f}ms）")
+                if self.accept is None or self.accept(result):
+                    logger.info(
+                        f"{prefix}验证码匹配策略命中: {matcher.name}"
+                        f"（并行总耗时 {(time.perf_counter() - started) * 1000:.0f}ms）"
+                    )
+                    return result
+                candidates.append((result, matcher.name))
+        finally:
+            # 已命中时取消尚未开始的策略，正在执行的策略结果直接丢弃
+            executor.shutdown(wait=False, cancel_futures=True)
+        if not candidates:
+            return None
+        result, name = max(candidates, key=lambda item: _result_score(item[0]))
+        logger.info(f"{prefix}无策略通过校验，选用得分最高的策略: {name}")
+        return result
+
+
+def _timed_match(
+    matcher: CaptchaMatcher,
+    background: np.ndarray,
+    sprites: list[np.ndarray],
+    bboxes: list[tuple[int, int, int, int]],
+) -> tuple[MatchResult | None, float]:
+    start = time.perf_counter()
+    result = matcher.match(background, sprites, bboxes)
+    return result, time.perf_counter() - start
+
+
+def _result_score(result: MatchResult) -> tuple[float, float]:
+    if not result.similarities:
+        return 0.0, 0.0
+    return min(result.similarities), sum(result.similarities) / len(result.similarities)
+
 
 class SiftMatcher:
     name = "sift"
 
     def __init__(self) -> None:
         self._sift = cv2.SIFT_create() if hasattr(cv2, "SIFT_create") else None
+        # 同一匹配器实例复用一个 BFMatcher，避免每对图片重复构造
+        self._matcher = cv2.BFMatcher() if self._sift else None
         if not self._sift:
             prefix = _get_log_prefix()
             logger.warning(f"{prefix}SIFT 不可用，将跳过 SiftMatcher")
@@ -213,11 +318,45 @@ class SiftMatcher:
     ) -> MatchResult | None:
         if not self._sift:
             return None
+        # 特征缓存只在本次求解内有效：背景整图提取一次特征后按候选框坐标分配
+        cache = FeatureCache(self._sift, background)
+        return build_match_result(
+            background,
+            sprites,
+            bboxes,
+            lambda _bg, items, boxes: feature_similarity_matrix(cache, items, boxes, self._matcher),
+            self.name,
+        )
+
+
+class OrbMatcher:
+    """ORB 二进制描述子 + 汉明距离匹配，所有 OpenCV 构建均可用，耗时远低于 SIFT。"""
+
+    name = "orb"
+    # 小图只有约 50px，默认 31px 的边缘/采样窗口会让小图几乎提不出关键点
+    PATCH_SIZE = 15
+    MAX_FEATURES = 1000
+
+    def __init__(self) -> None:
+        self._orb = cv2.ORB_create(
+            nfeatures=self.MAX_FEATURES,
+            edgeThreshold=self.PATCH_SIZE,
+            patchSize=self.PATCH_SIZE,
+        )
+        self._matcher = cv2.BFMatcher(cv2.NORM_HAMMING)
+
+    def match(
+        self,
+        background: np.ndarray,
+        sprites: list[np.ndarray],
+        bboxes: list[tuple[int, int, int, int]],
+    ) -> MatchResult | None:
+        cache = FeatureCache(self._orb, background)
         return build_match_result(
             background,
             sprites,
             bboxes,
-            lambda sprite, spec: compute_sift_similarity(sprite, spec, self._sift),
+            lambda _bg, items, boxes: feature_similarity_matrix(cache, items, boxes, self._matcher),
             self.name,
         )
 
@@ -235,44 +374,68 @@ class TemplateMatcher:
             background,
             sprites,
             bboxes,
-            compute_template_similarity,
+            template_similarity_matrix,
             self.name,
         )
 
 
-def temp_path(ctx: RuntimeContext, filename: str) -> str:
-    return os.path.join(ctx.temp_dir, filename)
+def build_default_matchers() -> list[CaptchaMatcher]:
+    """默认匹配策略（按尝试顺序）。"""
+    return [SiftMatcher(), OrbMatcher(), TemplateMatcher()]
 
 
-def clear_temp_dir(temp_dir: str) -> None:
-    if not os.path.exists(temp_dir):
-        return
-    for filename in os.listdir(temp_dir):
-        file_path = os.path.join(temp_dir, filename)
-        if os.path.isfile(file_path) or os.path.islink(file_path):
-            os.remove(file_path)
-
+def create_captcha_models(
+    config: Config | None = None,
+) -> tuple[LazyDdddOcr | RemoteDdddOcr, LazyDdddOcr | RemoteDdddOcr]:
+    """返回 (ocr, det)：启用推理进程时为远程句柄，否则为进程内共享模型。
 
-def download_image(url: str, output_path: str, config: Config) -> bool:
-    return download_to_file(url, output_path, config, log=logger)
+    传入 config 时按 inference_threads 设置 onnxruntime/OpenCV 线程数
+    （推理进程模式下在推理进程内生效）。
+    """
+    client = get_inference_client()
+    if client:
+        if config is not None:
+            try:
+                threads = client.configure(config.inference_threads)
+                logger.info(f"推理进程线程数: {threads}")
+            except (WorkerUnavailableError, WorkerCallError) as e:
+                logger.warning(f"推理进程应用线程配置失败: {e}")
+        return RemoteDdddOcr(client, det=False), RemoteDdddOcr(client, det=True)
+    if config is not None:
+        apply_thread_profile(config.inference_threads)
+    return LazyDdddOcr(det=False), LazyDdddOcr(det=True)
+
+
+def create_captcha_solver(config: Config) -> CaptchaSolver:
+    stats = get_matcher_stats(config.captcha_stats_path) if config.captcha_adaptive_matchers else None
+    solver = StrategyCaptchaSolver(
+        build_default_matchers(),
+        concurrent=config.captcha_parallel_matchers,
+        accept=check_answer,
+        stats=stats,
+    )
+    client = get_inference_client()
+    if client:
+        return RemoteCaptchaSolver(
+            client,
+            concurrent=config.captcha_parallel_matchers,
+            adaptive=config.captcha_adaptive_matchers,
+            fallback=solver,
+        )
+    return solver
 
 
-def download_image_bytes(url: str, config: Config, fallback_path: str | None = None) -> bytes:
-    prefix = _get_log_prefix()
+def download_images_bytes(urls: list[str], config: Config) -> list[bytes]:
+    """并发下载（共享 keep-alive 连接池），总耗时取决于最慢的一张。"""
     try:
-        return download_bytes(
-            url,
+        return download_many(
+            urls,
             timeout=config.download_timeout,
             max_retries=config.download_max_retries,
             retry_delay=config.download_retry_delay,
             log=logger,
         )
     except RuntimeError as e:
-        if fallback_path:
-            logger.warning(f"{prefix}内存下载失败，尝试降级为文件下载")
-            if download_image(url, fallback_path, config):
-                with open(fallback_path, "rb") as f:
-                    return f.read()
         raise CaptchaRetryableError(f"验证码图片下载失败: {e}")
 
 
@@ -316,19 +479,16 @@ def get_element_size(element) -> tuple[float, float]:
     return float(width), float(height)
 
 
-def detect_captcha_bboxes(
-    ctx: RuntimeContext,
-    captcha_bytes: bytes,
-    captcha_image: np.ndarray,
-) -> list[tuple[int, int, int, int]]:
+def detect_captcha_bboxes(ctx: RuntimeContext, background: EncodedImage) -> list[tuple[int, int, int, int]]:
     prefix = _get_log_prefix()
-    payloads = [
-        ("raw", captcha_bytes),
-        ("reencode", encode_image_bytes(captcha_image, "验证码背景图")),
+    # 重新编码的版本仅在原始字节检测失败时才生成
+    payloads: list[tuple[str, Callable[[], bytes]]] = [
+        ("raw", lambda: background.data),
+        ("reencode", background.reencoded),
     ]
     for label, payload in payloads:
         try:
-            bboxes = ctx.det.detection(payload)
+            bboxes = ctx.det.detection(payload())
             if bboxes:
                 logger.info(f"{prefix}验证码检测成功({label}): {len(bboxes)} 个候选框")
                 return bboxes
@@ -338,37 +498,11 @@ def detect_captcha_bboxes(
     return []
 
 
-def compute_sift_similarity(sprite: np.ndarray, spec: np.ndarray, sift) -> float:
-    sprite_gray = normalize_gray(sprite)
-    spec_gray = normalize_gray(spec)
-    kp1, des1 = sift.detectAndCompute(sprite_gray, None)
-    kp2, des2 = sift.detectAndCompute(spec_gray, None)
-    if des1 is None or des2 is None:
-        return 0.0
-    bf = cv2.BFMatcher()
-    matches = bf.knnMatch(des1, des2, k=2)
-    good = [m for m_n in matches if len(m_n) == 2 for m, n in [m_n] if m.distance < 0.8 * n.distance]
-    if not matches or len(good) == 0:
-        return 0.0
-    return len(good) / len(matches)
-
-
-def compute_template_similarity(sprite: np.ndarray, spec: np.ndarray) -> float:
-    sprite_gray = normalize_gray(sprite)
-    spec_gray = normalize_gray(spec)
-    if sprite_gray is None or spec_gray is None or sprite_gray.size == 0 or spec_gray.size == 0:
-        return 0.0
-    if sprite_gray.shape != spec_gray.shape:
-        sprite_gray = cv2.resize(sprite_gray, (spec_gray.shape[1], spec_gray.shape[0]))
-    result = cv2.matchTemplate(spec_gray, sprite_gray, cv2.TM_CCOEFF_NORMED)
-    return float(np.max(result))
-
-
 def build_match_result(
     background: np.ndarray,
     sprites: list[np.ndarray],
     bboxes: list[tuple[int, int, int, int]],
-    similarity_fn,
+    matrix_fn: SimilarityMatrixFn,
     method: str,
 ) -> MatchResult | None:
     prefix = _get_log_prefix()
@@ -380,69 +514,61 @@ def build_match_result(
         return None
     best_positions: list[tuple[int, int] | None] = [None, None, None]
     best_scores: list[float | None] = [None, None, None]
-    valid_specs: list[tuple[tuple[int, int], np.ndarray]] = []
+    best_columns: list[int | None] = [None, None, None]
+    valid_boxes: list[tuple[int, int, int, int]] = []
+    centers: list[tuple[int, int]] = []
     for bbox in bboxes:
         if len(bbox) != 4:
             continue
         x1, y1, x2, y2 = map(int, bbox)
         if x2 <= x1 or y2 <= y1:
             continue
-        spec = background[y1:y2, x1:x2]
-        if spec.size == 0:
+        if background[y1:y2, x1:x2].size == 0:
             continue
-        center = (int((x1 + x2) / 2), int((y1 + y2) / 2))
-        valid_specs.append((center, spec))
-    if not valid_specs:
+        valid_boxes.append((x1, y1, x2, y2))
+        centers.append((int((x1 + x2) / 2), int((y1 + y2) / 2)))
+    if not valid_boxes:
         return None
-    if len(valid_specs) < len(sprites):
-        for center, spec in valid_specs:
-            for index, sprite in enumerate(sprites):
-                if sprite is None or sprite.size == 0:
-                    continue
-                similarity = similarity_fn(sprite, spec)
-                if best_scores[index] is None or similarity > best_scores[index]:
-                    best_scores[index] = similarity
-                    best_positions[index] = center
+    # 整张 小图×候选框 相似度矩阵一次算完，后续只做查表
+    sim_matrix = np.asarray(matrix_fn(background, sprites, valid_boxes), dtype=np.float64)
+    if len(valid_boxes) < len(sprites):
+        for index, sprite in enumerate(sprites):
+            if sprite is None or sprite.size == 0:
+                continue
+            bbox_index = int(np.argmax(sim_matrix[index]))
+            best_scores[index] = float(sim_matrix[index, bbox_index])
+            best_positions[index] = centers[bbox_index]
+            best_columns[index] = bbox_index
     else:
-        sim_matrix: list[list[float]] = []
-        for sprite in sprites:
-            row: list[float] = []
-            for _, spec in valid_specs:
-                if sprite is None or sprite.size == 0:
-                    row.append(0.0)
-                    continue
-                row.append(similarity_fn(sprite, spec))
-            sim_matrix.append(row)
-
-        best_perm: tuple[int, ...] | None = None
-        best_scores_local: list[float] | None = None
-        best_key: tuple[float, float, float] | None = None
-        bbox_indices = range(len(valid_specs))
-        for chosen in combinations(bbox_indices, len(sprites)):
-            for perm in permutations(chosen):
-                scores = [sim_matrix[i][perm[i]] for i in range(len(sprites))]
-                min_score = min(scores)
-                avg_score = sum(scores) / len(scores)
-                sum_score = sum(scores)
-                key = (min_score, avg_score, sum_score)
-                if best_key is None or key > best_key:
-                    best_key = key
-                    best_perm = perm
-                    best_scores_local = scores
-        if best_perm is not None and best_scores_local is not None:
+        assignment = best_assignment(sim_matrix)
+        if assignment is not None:
+            best_perm, best_scores_local = assignment
             for sprite_index, bbox_index in enumerate(best_perm):
-                center, _ = valid_specs[bbox_index]
-                best_positions[sprite_index] = center
+                best_positions[sprite_index] = centers[bbox_index]
                 best_scores[sprite_index] = best_scores_local[sprite_index]
+                best_columns[sprite_index] = bbox_index
     if any(pos is None for pos in best_positions):
         return None
+    columns = [int(column) for column in best_columns if column is not None]
     return MatchResult(
         positions=[pos for pos in best_positions if pos is not None],
         similarities=[float(score) if score is not None else 0.0 for score in best_scores],
         method=method,
+        margins=score_margins(sim_matrix, columns),
+        boxes=[valid_boxes[column] for column in columns],
     )
 
 
+def score_margins(sim_matrix: np.ndarray, columns: list[int]) -> list[float]:
+    """每行所选列得分减去该行其余列的最高分；只有一列时为所选得分本身。"""
+    margins: list[float] = []
+    for row, column in enumerate(columns):
+        others = np.delete(sim_matrix[row], column)
+        runner_up = float(others.max()) if others.size else 0.0
+        margins.append(float(sim_matrix[row, column]) - runner_up)
+    return margins
+
+
 def log_match_result(result: MatchResult) -> None:
     prefix = _get_log_prefix()
     for index, (position, similarity) in enumerate(zip(result.positions, result.similarities), start=1):
@@ -465,17 +591,24 @@ def process_captcha(ctx: RuntimeContext, retry_count: int = 0):
     prefix = _get_log_prefix()
 
     def refresh_captcha() -> bool:
+        previous_url = captcha_background_url(ctx.driver)
         try:
-            reload_btn = ctx.driver.find_element(*XPATH_CONFIG["CAPTCHA_RELOAD"])
-            time.sleep(2)
-            reload_btn.click()
-            time.sleep(2)
-            return True
+            click_when_ready(ctx.driver, XPATH_CONFIG["CAPTCHA_RELOAD"], ctx.config.timeout)
         except Exception as refresh_error:
             logger.error(f"{prefix}无法刷新验证码，放弃重试: {refresh_error}")
             return False
+        try:
+            wait_for_background_change(ctx.driver, previous_url, ctx.config.timeout)
+        except TimeoutException:
+            logger.warning(f"{prefix}刷新后验证码图片未变化，继续尝试")
+        return True
 
-    solver = StrategyCaptchaSolver([SiftMatcher(), TemplateMatcher()])
+    solver = create_captcha_solver(ctx.config)
+    answer_cache = (
+        get_answer_cache(ctx.config.captcha_cache_path, ctx.config.captcha_answer_cache_size)
+        if ctx.config.captcha_answer_cache
+        else None
+    )
     current_retry = retry_count
     try:
         while True:
@@ -486,56 +619,24 @@ def process_captcha(ctx: RuntimeContext, retry_count: int = 0):
                 logger.info(f"{prefix}无限重试模式，当前第 {current_retry + 1} 次尝试")
 
             try:
-                captcha_bytes, captcha_image, sprites = download_captcha_assets(ctx)
-                if check_captcha(ctx, captcha_image, sprites):
+                background, sprites = download_captcha_assets(ctx)
+                captcha_image = background.array
+                cache_key = captcha_key(captcha_image, sprites) if answer_cache and len(sprites) == 3 else ""
+                cached = answer_cache.lookup(cache_key) if cache_key else None
+                result = None
+                if cached:
+                    cache_key, positions = cached
+                    logger.info(f"{prefix}验证码答案缓存命中，跳过检测与匹配")
+                    result = MatchResult(positions=positions, similarities=[1.0] * len(positions), method="cache")
+                elif check_captcha(ctx, captcha_image, sprites):
                     logger.info(f"{prefix}开始识别验证码 (第 {current_retry + 1} 次尝试)")
-                    bboxes = detect_captcha_bboxes(ctx, captcha_bytes, captcha_image)
+                    bboxes = detect_captcha_bboxes(ctx, background)
                     if not bboxes:
                         logger.error(f"{prefix}验证码检测失败，正在重试")
                         save_captcha_samples(captcha_image, sprites, config=ctx.config, reason="no_bboxes")
                     else:
                         result = solver.solve(captcha_image, sprites, bboxes)
-                        if result:
-                            log_match_result(result)
-                            if check_answer(result):
-                                for position in result.positions:
-                                    slide_bg = ctx.wait.until(
-                                        EC.visibility_of_element_located(XPATH_CONFIG["CAPTCHA_BG"])
-                                    )
-                                    style = slide_bg.get_attribute("style")
-                                    x, y = position
-                                    width_raw, height_raw = captcha_image.shape[1], captcha_image.shape[0]
-                                    try:
-                                        width = get_width_from_style(style)
-                                        height = get_height_from_style(style)
-                                    except ValueError:
-                                        width, height = get_element_size(slide_bg)
-                                    x_offset, y_offset = float(-width / 2), float(-height / 2)
-                                    final_x = int(x_offset + x / width_raw * width)
-                                    final_y = int(y_offset + y / height_raw * height)
-                                    ActionChains(ctx.driver).move_to_element_with_offset(
-                                        slide_bg, final_x, final_y
-                                    ).click().perform()
-                                confirm = ctx.wait.until(EC.element_to_be_clickable(XPATH_CONFIG["CAPTCHA_SUBMIT"]))
-                                logger.info(f"{prefix}提交验证码")
-                                confirm.click()
-                                time.sleep(5)
-                                result_el = ctx.wait.until(
-                                    EC.visibility_of_element_located(XPATH_CONFIG["CAPTCHA_OP"])
-                                )
-                                if 'show-success' in result_el.get_attribute("class"):
-                                    logger.info(f"{prefix}验证码通过")
-                                    return True
-                                logger.error(f"{prefix}验证码未通过，正在重试")
-                                save_captcha_samples(
-                                    captcha_image, sprites, config=ctx.config, reason="submit_failed"
-                                )
-                            else:
-                                logger.error(f"{prefix}验证码识别结果无效，正在重试")
-                                save_captcha_samples(
-                                    captcha_image, sprites, config=ctx.config, reason="answer_invalid"
-                                )
-                        else:
+                        if not result:
                             logger.error(f"{prefix}验证码匹配失败，正在重试")
                             save_captcha_samples(
                                 captcha_image, sprites, config=ctx.config, reason="match_failed"
@@ -543,6 +644,38 @@ def process_captcha(ctx: RuntimeContext, retry_count: int = 0):
                 else:
                     logger.error(f"{prefix}当前验证码识别率低，尝试刷新")
 
+                if result:
+                    log_match_result(result)
+                    features = answer_features(result, (captcha_image.shape[1], captcha_image.shape[0]))
+                    if not check_answer(result):
+                        logger.error(f"{prefix}验证码识别结果无效，正在重试")
+                        solver.record_outcome(result, False)
+                        save_captcha_samples(
+                            captcha_image, sprites, config=ctx.config, reason="answer_invalid", result=result
+                        )
+                    elif not confident_enough(ctx.config, features):
+                        save_captcha_samples(
+                            captcha_image, sprites, config=ctx.config, reason="predicted_fail", result=result
+                        )
+                    else:
+                        passed = submit_captcha_answer(ctx, captcha_image, result)
+                        solver.record_outcome(result, passed)
+                        if features is not None:
+                            record_submit_outcome(
+                                features, result.method, passed, path=ctx.config.captcha_outcomes_path
+                            )
+                        if passed:
+                            logger.info(f"{prefix}验证码通过")
+                            if cache_key:
+                                answer_cache.store(cache_key, result.positions)
+                            return True
+                        logger.error(f"{prefix}验证码未通过，正在重试")
+                        if result.method == "cache":
+                            answer_cache.evict(cache_key)
+                        save_captcha_samples(
+                            captcha_image, sprites, config=ctx.config, reason="submit_failed", result=result
+                        )
+
                 if not refresh_captcha():
                     return False
                 current_retry += 1
@@ -555,22 +688,104 @@ def process_captcha(ctx: RuntimeContext, retry_count: int = 0):
         _set_log_prefix(prev_prefix)
 
 
-def download_captcha_assets(ctx: RuntimeContext) -> tuple[bytes, np.ndarray, list[np.ndarray]]:
+def confident_enough(config: Config, features: list[float] | None) -> bool:
+    """置信度模型预测的通过率不低于 captcha_submit_threshold 时才提交。
+
+    阈值为 0、尚未校准模型或结果缺少特征（如答案缓存命中）时总是提交。
+    被拒绝的结果不会产生提交记录，重新校准的样本因此偏向模型已接受的答案、预测偏乐观；
+    为此低于阈值的结果仍以 EXPLORE_RATE 的概率提交并记录，缓解但不能完全消除这种偏差。
+    """
+    if config.captcha_submit_threshold <= 0 or features is None:
+        return True
+    model = load_confidence_model(config.captcha_confidence_path)
+    if model is None:
+        return True
+    probability = model.predict(features)
+    if probability >= config.captcha_submit_threshold:
+        return True
+    prefix = _get_log_prefix()
+    if random.random() < CONFIDENCE_EXPLORE_RATE:
+        logger.info(f"{prefix}预测通过率 {probability:.1%} 低于阈值，仍提交以积累校准样本")
+        return True
+    logger.warning(
+        f"{prefix}预测通过率 {probability:.1%} 低于阈值 {config.captcha_submit_threshold:.0%}，跳过提交直接刷新"
+    )
+    return False
+
+
+def submit_captcha_answer(ctx: RuntimeContext, captcha_image: np.ndarray, result: MatchResult) -> bool:
+    """按匹配坐标依次点击并提交，返回是否通过。
+
+    背景图元素与显示尺寸只解析一次，图标点击合并为一个动作序列一次下发；
+    点击间隔按 captcha_click_delay 上下浮动 30%，模拟人工操作节奏。
+    确认按钮在图标点击完成后再解析，点击前至少停顿 MIN_CONFIRM_PAUSE 秒。
+    """
+    prefix = _get_log_prefix()
+    slide_bg = ctx.wait.until(EC.visibility_of_element_located(XPATH_CONFIG["CAPTCHA_BG"]))
+    style = slide_bg.get_attribute("style")
+    try:
+        width = get_width_from_style(style)
+        height = get_height_from_style(style)
+    except ValueError:
+        width, height = get_element_size(slide_bg)
+    try:
+        submitted_url = get_url_from_style(style)
+    except ValueError:
+        submitted_url = ""
+
+    width_raw, height_raw = captcha_image.shape[1], captcha_image.shape[0]
+    x_offset, y_offset = float(-width / 2), float(-height / 2)
+    delay = max(0.0, ctx.config.captcha_click_delay)
+    actions = ActionChains(ctx.driver)
+    for index, (x, y) in enumerate(result.positions):
+        if index and delay:
+            actions.pause(delay * random.uniform(0.7, 1.3))
+        final_x = int(x_offset + x / width_raw * width)
+        final_y = int(y_offset + y / height_raw * height)
+        actions.move_to_element_with_offset(slide_bg, final_x, final_y).click()
+    actions.pause(max(delay * random.uniform(0.7, 1.3), MIN_CONFIRM_PAUSE))
+    actions.perform()
+    # 确认按钮可能在图标全部点击后才变为可点击
+    click_when_ready(ctx.driver, XPATH_CONFIG["CAPTCHA_SUBMIT"], ctx.config.timeout)
+    logger.info(f"{prefix}提交验证码")
+    return wait_for_captcha_result(ctx.driver, submitted_url, ctx.config.timeout)
+
+
+def fetch_captcha_images(ctx: RuntimeContext, urls: list[str]) -> list[bytes]:
+    """优先从浏览器会话取回已加载的图片，取不到的再并发走 HTTP 下载。"""
     prefix = _get_log_prefix()
-    clear_temp_dir(ctx.temp_dir)
+    images: list[bytes | None] = [None] * len(urls)
+    if ctx.capture:
+        for index, url in enumerate(urls):
+            captured = ctx.capture.capture(url)
+            if captured:
+                data, source = captured
+                logger.info(f"{prefix}已从浏览器获取验证码图片({index + 1}) [{source}]: {len(data)} 字节")
+                images[index] = data
+            else:
+                logger.warning(f"{prefix}无法从浏览器获取验证码图片({index + 1})，改为下载")
+    missing = [index for index, data in enumerate(images) if data is None]
+    if missing:
+        for index in missing:
+            logger.info(f"{prefix}开始下载验证码图片({index + 1}): {urls[index]}")
+        downloaded = download_images_bytes([urls[index] for index in missing], ctx.config)
+        for index, data in zip(missing, downloaded):
+            images[index] = data
+    return images
+
+
+def download_captcha_assets(ctx: RuntimeContext) -> tuple[EncodedImage, list[np.ndarray]]:
     slide_bg = ctx.wait.until(EC.visibility_of_element_located(XPATH_CONFIG["CAPTCHA_BG"]))
     img1_style = slide_bg.get_attribute("style")
     img1_url = get_url_from_style(img1_style)
-    logger.info(f"{prefix}开始下载验证码图片(1): {img1_url}")
-    captcha_bytes = download_image_bytes(img1_url, ctx.config, temp_path(ctx, "captcha.jpg"))
     sprite = ctx.wait.until(EC.visibility_of_element_located(XPATH_CONFIG["CAPTCHA_IMG_INSTRUCTION"]))
     img2_url = sprite.get_attribute("src")
-    logger.info(f"{prefix}开始下载验证码图片(2): {img2_url}")
-    sprite_bytes = download_image_bytes(img2_url, ctx.config, temp_path(ctx, "sprite.jpg"))
-    captcha_image = decode_image_bytes(captcha_bytes, "验证码背景图")
-    sprite_image = decode_image_bytes(sprite_bytes, "验证码小图")
-    sprites = split_sprite_image(sprite_image)
-    return captcha_bytes, captcha_image, sprites
+    captcha_bytes, sprite_bytes = fetch_captcha_images(ctx, [img1_url, img2_url])
+    background = EncodedImage(captcha_bytes, label="验证码背景图")
+    # 提前解码，格式异常时在此处抛出 ValueError 触发刷新
+    background.array
+    sprites = split_sprite_image(decode_image_bytes(sprite_bytes, "验证码小图"))
+    return background, sprites
 
 
 def save_captcha_samples(
@@ -579,25 +794,21 @@ def save_captcha_samples(
     *,
     config: Config,
     reason: str,
+    result: MatchResult | None = None,
 ) -> None:
-    """保存验证码样本用于排查。"""
+    """保存验证码样本用于排查（放入后台归档队列，不阻塞求解）。"""
     if not config.captcha_save_samples:
         return
     prefix = _get_log_prefix()
     try:
-        base_dir = os.path.join("temp", "captcha_samples")
-        os.makedirs(base_dir, exist_ok=True)
-        stamp = time.strftime("%Y%m%d-%H%M%S")
-        sample_dir = os.path.join(base_dir, f"{stamp}-{reason}-{random.randint(1000, 9999)}")
-        os.makedirs(sample_dir, exist_ok=True)
-        if captcha_image is not None and captcha_image.size > 0:
-            cv2.imwrite(os.path.join(sample_dir, "background.jpg"), captcha_image)
-        for index, sprite in enumerate(sprites, start=1):
-            if sprite is None or sprite.size == 0:
-                continue
-            cv2.imwrite(os.path.join(sample_dir, f"sprite_{index}.jpg"), sprite)
-        with open(os.path.join(sample_dir, "reason.txt"), "w", encoding="utf-8") as f:
-            f.write(f"reason:{reason}\n")
+        get_sample_archive(SAMPLES_DIR).submit(
+            captcha_image,
+            sprites,
+            reason=reason,
+            account=config.display_name or config.rainyun_user,
+            method=result.method if result else "",
+            similarities=result.similarities if result else (),
+        )
     except Exception as e:
         logger.warning(f"{prefix}保存验证码样本失败: {e}")
 
@@ -609,11 +820,12 @@ def check_captcha(ctx: RuntimeContext, captcha_image: np.ndarray, sprites: list[
         save_captcha_samples(captcha_image, sprites, config=ctx.config, reason="sprite_count")
         return False
     low_confidence = 0
-    for index, sprite in enumerate(sprites, start=1):
-        sprite_bytes = encode_image_bytes(sprite, f"验证码小图{index}")
-        if ctx.ocr.classification(sprite_bytes) in ["0", "1"]:
+    labels = ctx.ocr.classification_batch([to_pil_image(sprite) for sprite in sprites])
+    for index, label in enumerate(labels, start=1):
+        if label.text in ["0", "1"]:
             low_confidence += 1
-            logger.warning(f"{prefix}验证码小图 {index} 识别为低置信度标记")
+            confidence = f"（置信度 {label.confidence:.2f}）" if label.confidence is not None else ""
+            logger.warning(f"{prefix}验证码小图 {index} 识别为低置信度标记{confidence}")
     if low_confidence >= 2:
         logger.error(f"{prefix}低置信度小图过多，跳过本次识别")
         save_captcha_samples(captcha_image, sprites, config=ctx.config, reason="low_confidence")
@@ -691,9 +903,8 @@ def run_with_config(config: Config) -> bool:
         if not debug:
             logger.info(f"{prefix}随机延时等待 {delay} 分钟 {delay_sec} 秒")
             time.sleep(delay * 60 + delay_sec)
-        logger.info(f"{prefix}准备 OCR/DET（延迟初始化）")
-        ocr = LazyDdddOcr(det=False)
-        det = LazyDdddOcr(det=True)
+        logger.info(f"{prefix}准备 OCR/DET（首次使用时加载）")
+        ocr, det = create_captcha_models(config)
         logger.info(f"{prefix}初始化 Selenium")
         session = BrowserSession(config=config, debug=debug, linux=linux)
         driver, wait, temp_dir = session.start()
@@ -704,7 +915,8 @@ def run_with_config(config: Config) -> bool:
             det=det,
             temp_dir=temp_dir,
             api=api_client,
-            config=config
+            config=config,
+            capture=session.capture,
         )
 
         login_page = LoginPage(ctx, captcha_handler=process_captcha)
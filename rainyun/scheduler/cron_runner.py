@@ -7,6 +7,7 @@ import os
 import sys
 from datetime import datetime
 
+from rainyun.captcha.worker import warmup_in_background
 from rainyun.config import Config
 from rainyun.data.store import DataStore
 from rainyun.web.logs import ensure_file_handler
@@ -50,6 +51,9 @@ def main() -> int:
         logger.info("已有任务在执行中，跳过本次调度")
         return 0
 
+    # 与随机延时并行加载模型，首个账户无需再等待
+    warmup_in_background()
+
     try:
         store = DataStore()
         runner = MultiAccountRunner(store)
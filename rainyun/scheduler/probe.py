@@ -0,0 +1,93 @@
+"""签到前的 HTTP 预检：不启动浏览器判断账户今天是否已签到。
+
+依次使用：本地签到记录（今天已成功则无需任何请求）；保存的 cookies 以登录态请求接口
+（接口接受时只记录预检时间，不等同于网页端登录有效）；API 密钥请求积分任务列表。任一方式明确确认「每日签到」奖励已领取
+才跳过该账户；任务状态无法识别、请求失败或会话被拒绝时一律视为未知，交给浏览器处理
+（cookies 是否失效也由浏览器的登录检查判定）。
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any
+
+from rainyun.api.client import RainyunAPI, RainyunAPIError
+from rainyun.browser.cookies import mark_session_probed, read_session
+from rainyun.config import Config
+
+logger = logging.getLogger(__name__)
+
+DAILY_SIGN_TASK = "每日签到"
+# 任务字段中出现该文案才视为奖励已领取；数字状态码含义未经确认，不作判断
+CLAIMED_TEXT = "已领取"
+
+
+@dataclass
+class ProbeResult:
+    signed_today: bool = False
+    # 接口是否接受保存的 cookies（不代表网页端路由守卫放行），None 表示未知
+    session_valid: bool | None = None
+    points: int | None = None
+    source: str = ""
+
+
+def signed_today_locally(account: Any) -> bool:
+    """本地记录显示今天已签到成功。"""
+    if getattr(account, "last_status", "") != "success":
+        return False
+    try:
+        return datetime.fromisoformat(getattr(account, "last_checkin", "")).date() == date.today()
+    except (TypeError, ValueError):
+        return False
+
+
+def _daily_reward_claimed(api: RainyunAPI) -> bool:
+    for task in api.get_reward_tasks():
+        if isinstance(task, dict) and DAILY_SIGN_TASK in str(task.get("Name", "")):
+            return any(isinstance(value, str) and CLAIMED_TEXT in value for value in task.values())
+    return False
+
+
+def probe_account(account: Any, settings: Any) -> ProbeResult:
+    if signed_today_locally(account):
+        return ProbeResult(signed_today=True, source="record")
+
+    config = Config.from_account(account, settings)
+    user = config.display_name or config.rainyun_user
+    result = ProbeResult()
+    clients: list[tuple[str, RainyunAPI]] = []
+
+    try:
+        stored = read_session(config)
+    except Exception:
+        stored = None
+    if stored is not None and stored.cookies and not stored.stale and not stored.expired:
+        cookies = {
+            str(item["name"]): str(item.get("value", ""))
+            for item in stored.cookies
+            if isinstance(item, dict) and item.get("name")
+        }
+        api = RainyunAPI("", config, cookies=cookies)
+        try:
+            result.points = api.get_user_points()
+            result.session_valid = True
+            mark_session_probed(config)
+            clients.append(("cookies", api))
+        except RainyunAPIError as e:
+            logger.debug("用户 %s 预检请求失败（cookies）: %s", user, e)
+    if config.rainyun_api_key:
+        clients.append(("api_key", RainyunAPI(config.rainyun_api_key, config)))
+
+    for source, api in clients:
+        try:
+            if result.points is None:
+                result.points = api.get_user_points()
+            if _daily_reward_claimed(api):
+                result.signed_today = True
+                result.source = source
+                break
+        except RainyunAPIError as e:
+            logger.debug("用户 %s 预检请求失败（%s）: %s", user, source, e)
+    return result
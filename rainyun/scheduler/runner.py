@@ -1,24 +1,29 @@
-"""多账户串行调度执行。"""
+"""多账户调度执行：每个账户在同一 Chrome 内的独立浏览器上下文中签到，可按 checkin_concurrency 并发。"""
 
 from __future__ import annotations
 
 import logging
 import random
+import threading
 import time
 import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass, replace
 from datetime import datetime
-from typing import Any
+from typing import Any, Iterator
 
 from rainyun.api.client import RainyunAPI
+from rainyun.browser.capture import ResourceCapture
 from rainyun.browser.cookies import load_cookies
 from rainyun.browser.pages import LoginPage, RewardPage
-from rainyun.browser.session import BrowserSession, RuntimeContext
+from rainyun.browser.session import BrowserContext, BrowserSession, RuntimeContext
 from rainyun.config import Config
 from rainyun.data.store import DataStore
 from rainyun.server.manager import ServerManager
-from rainyun.main import LazyDdddOcr, process_captcha
+from rainyun.main import _set_log_user, create_captcha_models, process_captcha
+from rainyun.scheduler.probe import ProbeResult, probe_account
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +35,60 @@ except Exception:
         pass
 
 
+MAX_CONCURRENCY = 16
+PROBE_WORKERS = 8
+_PROBE_SOURCES = {"record": "本地记录", "cookies": "登录态接口", "api_key": "API 任务列表"}
+
+# 进程内同时运行的 Chrome 数：批量签到的所有账户共用一个 Chrome，Web 触发的单账户签到
+# 需等待其结束，避免两个 Chrome 同时占用内存
+MAX_BROWSERS = 1
+_browser_slots = threading.BoundedSemaphore(MAX_BROWSERS)
+
+# 进程内共享的签到名额（同一 Chrome 中同时进行的账户数）
+_account_slots: tuple[int, threading.BoundedSemaphore] | None = None
+_account_slots_lock = threading.Lock()
+
+
+def _checkin_concurrency(settings: Any) -> int:
+    value = getattr(settings, "checkin_concurrency", 1)
+    if not isinstance(value, int):
+        return 1
+    return max(1, min(value, MAX_CONCURRENCY))
+
+
+def _get_account_slots(limit: int) -> threading.BoundedSemaphore:
+    """上限变化时换用新的信号量，已持有旧名额的账户照常归还到旧信号量。"""
+    global _account_slots
+    with _account_slots_lock:
+        if _account_slots is None or _account_slots[0] != limit:
+            _account_slots = (limit, threading.BoundedSemaphore(limit))
+        return _account_slots[1]
+
+
+@contextmanager
+def _browser_slot() -> Iterator[None]:
+    """在 Chrome 的整个生命周期内持有；须先于账户名额获取，避免互相等待。"""
+    if not _browser_slots.acquire(blocking=False):
+        logger.info("已有签到任务在使用浏览器，等待其结束")
+        _browser_slots.acquire()
+    try:
+        yield
+    finally:
+        _browser_slots.release()
+
+
+@contextmanager
+def _account_slot(settings: Any) -> Iterator[None]:
+    slots = _get_account_slots(_checkin_concurrency(settings))
+    if not slots.acquire(blocking=False):
+        logger.info("同时签到的账户数已达上限，等待其他签到结束")
+        slots.acquire()
+    try:
+        yield
+    finally:
+        slots.release()
+
+
 @dataclass
 class AccountRunResult:
     account_id: str
@@ -54,7 +113,7 @@ class AccountRenewResult:
 
 
 class MultiAccountRunner:
-    """串行执行启用账户并回写结果。"""
+    """执行启用账户并回写结果。"""
 
     def __init__(self, store: DataStore) -> None:
         self.store = store
@@ -77,14 +136,29 @@ class MultiAccountRunner:
                 settings, "captcha_retry_unlimited", base_config.captcha_retry_unlimited
             ),
             captcha_save_samples=getattr(settings, "captcha_save_samples", base_config.captcha_save_samples),
+            captcha_parallel_matchers=getattr(
+                settings, "captcha_parallel_matchers", base_config.captcha_parallel_matchers
+            ),
+            captcha_capture=getattr(settings, "captcha_capture", base_config.captcha_capture),
+            captcha_answer_cache=getattr(settings, "captcha_answer_cache", base_config.captcha_answer_cache),
+            captcha_answer_cache_size=getattr(
+                settings, "captcha_answer_cache_size", base_config.captcha_answer_cache_size
+            ),
+            captcha_adaptive_matchers=getattr(
+                settings, "captcha_adaptive_matchers", base_config.captcha_adaptive_matchers
+            ),
+            captcha_click_delay=getattr(settings, "captcha_click_delay", base_config.captcha_click_delay),
+            captcha_submit_threshold=getattr(
+                settings, "captcha_submit_threshold", base_config.captcha_submit_threshold
+            ),
+            inference_threads=getattr(settings, "inference_threads", base_config.inference_threads),
         )
 
     def _create_session(self, settings: Any):
         base_config = self._build_base_config(settings)
         session = BrowserSession(base_config, debug=base_config.debug, linux=base_config.linux_mode)
         driver, wait, temp_dir = session.start()
-        ocr = LazyDdddOcr(det=False)
-        det = LazyDdddOcr(det=True)
+        ocr, det = create_captcha_models(base_config)
         return base_config, session, driver, wait, temp_dir, ocr, det
 
     def _apply_random_delay(self, settings: Any) -> None:
@@ -113,30 +187,108 @@ class MultiAccountRunner:
         if not any(getattr(account, "enabled", False) for account in data.accounts):
             logger.info("没有启用的账户，跳过多账户调度")
             return []
-        if delay:
-            self._apply_random_delay(data.settings)
 
-        base_config, session, driver, wait, temp_dir, ocr, det = self._create_session(data.settings)
+        accounts = [account for account in data.accounts if account.enabled]
+        settings = data.settings
+        results: dict[int, AccountRunResult] = {}
+        if getattr(settings, "checkin_http_probe", True):
+            results = self._probe_accounts(accounts, settings)
+        pending = [index for index in range(len(accounts)) if index not in results]
+        if not pending:
+            logger.info("所有账户今日均已签到，无需启动浏览器")
+        else:
+            # 预检不受随机延时影响，只有仍需签到时才等待
+            if delay:
+                self._apply_random_delay(settings)
+            browser_results = self._run_in_browser([accounts[index] for index in pending], settings)
+            results.update(zip(pending, browser_results))
+        return [results[index] for index in range(len(accounts))]
 
-        results: list[AccountRunResult] = []
-        try:
-            for account in data.accounts:
-                if not account.enabled:
-                    continue
-                results.append(
-                    self._run_single_account(
+    def _probe_accounts(self, accounts: list[Any], settings: Any) -> dict[int, AccountRunResult]:
+        """HTTP 预检，返回已确认今日签到完成的账户结果（键为账户序号）。"""
+
+        def probe(account: Any) -> ProbeResult | None:
+            try:
+                return probe_account(account, settings)
+            except Exception as exc:
+                logger.warning("用户 %s 签到预检失败: %s", getattr(account, "name", "") or account.id, exc)
+                return None
+
+        with ThreadPoolExecutor(max_workers=min(PROBE_WORKERS, len(accounts)), thread_name_prefix="probe") as executor:
+            probes = list(executor.map(probe, accounts))
+        results: dict[int, AccountRunResult] = {}
+        for index, (account, result) in enumerate(zip(accounts, probes)):
+            if result is None or not result.signed_today:
+                continue
+            logger.info(
+                "用户 %s 今日已签到（%s），跳过浏览器",
+                getattr(account, "name", "") or account.id,
+                _PROBE_SOURCES.get(result.source, result.source),
+            )
+            results[index] = self._mark_result(
+                account,
+                success=True,
+                message="success",
+                status="already_signed",
+                current_points=result.points,
+            )
+        return results
+
+    def _run_in_browser(self, accounts: list[Any], settings: Any) -> list[AccountRunResult]:
+        with _browser_slot():
+            return self._run_accounts_in_session(accounts, settings)
+
+    def _run_accounts_in_session(self, accounts: list[Any], settings: Any) -> list[AccountRunResult]:
+        concurrency = min(_checkin_concurrency(settings), len(accounts))
+        base_config, session, driver, wait, temp_dir, ocr, det = self._create_session(settings)
+        # 无法新建上下文时退回共享标签页，同一时间只允许一个账户使用
+        shared_tab = threading.Lock()
+
+        def run_account(account: Any) -> AccountRunResult:
+            with _account_slot(settings):
+                context = self._open_context(session)
+                if context is None:
+                    with shared_tab:
+                        return self._run_single_account(
+                            account=account,
+                            settings=settings,
+                            driver=driver,
+                            wait=wait,
+                            ocr=ocr,
+                            det=det,
+                            temp_dir=temp_dir,
+                            capture=session.capture,
+                        )
+                try:
+                    return self._run_single_account(
                         account=account,
-                        settings=data.settings,
-                        driver=driver,
-                        wait=wait,
+                        settings=settings,
+                        driver=context.driver,
+                        wait=context.wait,
                         ocr=ocr,
                         det=det,
                         temp_dir=temp_dir,
+                        capture=context.capture,
+                        isolated=True,
                     )
-                )
+                finally:
+                    session.close_context(context)
+
+        try:
+            if concurrency <= 1:
+                return [run_account(account) for account in accounts]
+            logger.info("并发签到：%s 个账户，同时进行 %s 个", len(accounts), concurrency)
+            with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="checkin") as executor:
+                return list(executor.map(run_account, accounts))
         finally:
             self._close_session(session, temp_dir, base_config)
-        return results
+
+    def _open_context(self, session: BrowserSession) -> BrowserContext | None:
+        try:
+            return session.open_context()
+        except Exception as exc:
+            logger.warning("新建浏览器上下文失败，改用共享标签页: %s", exc)
+            return None
 
     def run_for_account(self, account_id: str, delay: bool = False) -> AccountRunResult | None:
         data = self.store.load() if self.store.data is None else self.store.data
@@ -148,19 +300,21 @@ class MultiAccountRunner:
             return None
         if delay:
             self._apply_random_delay(data.settings)
-        base_config, session, driver, wait, temp_dir, ocr, det = self._create_session(data.settings)
-        try:
-            return self._run_single_account(
-                account=account,
-                settings=data.settings,
-                driver=driver,
-                wait=wait,
-                ocr=ocr,
-                det=det,
-                temp_dir=temp_dir,
-            )
-        finally:
-            self._close_session(session, temp_dir, base_config)
+        with _browser_slot(), _account_slot(data.settings):
+            base_config, session, driver, wait, temp_dir, ocr, det = self._create_session(data.settings)
+            try:
+                return self._run_single_account(
+                    account=account,
+                    settings=data.settings,
+                    driver=driver,
+                    wait=wait,
+                    ocr=ocr,
+                    det=det,
+                    temp_dir=temp_dir,
+                    capture=session.capture,
+                )
+            finally:
+                self._close_session(session, temp_dir, base_config)
 
     def run_renew(self) -> list[AccountRenewResult]:
         data = self.store.load() if self.store.data is None else self.store.data
@@ -234,12 +388,15 @@ class MultiAccountRunner:
         ocr: ddddocr.DdddOcr,
         det: ddddocr.DdddOcr,
         temp_dir: str,
+        capture: ResourceCapture | None = None,
+        isolated: bool = False,
     ) -> AccountRunResult:
         config = Config.from_account(account, settings)
         account_id = str(getattr(account, "id", "") or "").strip()
         account_name = str(getattr(account, "name", "") or "").strip()
         account_username = str(getattr(account, "username", "") or "").strip()
         user_label = account_name or account_username or account_id or "unknown"
+        _set_log_user(user_label)
         configure(config)
         api_client = RainyunAPI(config.rainyun_api_key, config=config)
         ctx = RuntimeContext(
@@ -250,12 +407,15 @@ class MultiAccountRunner:
             temp_dir=temp_dir,
             api=api_client,
             config=config,
+            capture=capture,
         )
 
-        try:
-            driver.delete_all_cookies()
-        except Exception as exc:
-            logger.warning("用户 %s 清理 cookies 失败: %s", user_label, exc)
+        # 独立上下文本身没有其他账户的 cookie，共享标签页才需要清理
+        if not isolated:
+            try:
+                driver.delete_all_cookies()
+            except Exception as exc:
+                logger.warning("用户 %s 清理 cookies 失败: %s", user_label, exc)
 
         try:
             start_points = 0
@@ -1,15 +1,33 @@
 """Utility helpers for Rainyun."""
 
-from .http import download_bytes, download_to_file, post_with_retry, request_with_retry
-from .image import decode_image_bytes, encode_image_bytes, normalize_gray, split_sprite_image
+from .http import (
+    download_bytes,
+    download_many,
+    download_to_file,
+    get_http_session,
+    post_with_retry,
+    request_with_retry,
+)
+from .image import (
+    EncodedImage,
+    decode_image_bytes,
+    encode_image_bytes,
+    normalize_gray,
+    split_sprite_image,
+    to_pil_image,
+)
 
 __all__ = [
     "download_bytes",
+    "download_many",
     "download_to_file",
+    "get_http_session",
     "post_with_retry",
     "request_with_retry",
+    "EncodedImage",
     "decode_image_bytes",
     "encode_image_bytes",
     "normalize_gray",
     "split_sprite_image",
+    "to_pil_image",
 ]
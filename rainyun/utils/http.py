@@ -2,15 +2,36 @@
 
 import logging
 import os
+import threading
 import time
-from typing import Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Sequence
 
 import requests
+from requests.adapters import HTTPAdapter
 
 from rainyun.config import Config
 
 logger = logging.getLogger(__name__)
 
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+
+
+def get_http_session() -> requests.Session:
+    """进程内共享的 keep-alive 会话，同一主机的连接可跨请求复用。"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                # 重试由调用方控制，连接池上限覆盖并发下载
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=0)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _session = session
+    return _session
+
 
 def request_with_retry(
     method: str,
@@ -64,7 +85,7 @@ def download_bytes(
     log = log or logger
     for attempt in range(1, max_retries + 1):
         try:
-            response = requests.get(url, timeout=timeout)
+            response = get_http_session().get(url, timeout=timeout)
             if response.status_code == 200 and response.content:
                 return response.content
             last_error = f"status_code={response.status_code}"
@@ -77,6 +98,35 @@ def download_bytes(
     raise RuntimeError(f"下载图片失败，已重试 {max_retries} 次: {last_error}, URL: {url}")
 
 
+def download_many(
+    urls: Sequence[str],
+    *,
+    timeout: int,
+    max_retries: int = 3,
+    retry_delay: float = 2,
+    log: logging.Logger | None = None,
+) -> list[bytes]:
+    """并发下载多张图片，按输入顺序返回；任一失败时抛出 RuntimeError。"""
+    if len(urls) <= 1:
+        return [
+            download_bytes(url, timeout=timeout, max_retries=max_retries, retry_delay=retry_delay, log=log)
+            for url in urls
+        ]
+    with ThreadPoolExecutor(max_workers=len(urls), thread_name_prefix="download") as executor:
+        futures = [
+            executor.submit(
+                download_bytes,
+                url,
+                timeout=timeout,
+                max_retries=max_retries,
+                retry_delay=retry_delay,
+                log=log,
+            )
+            for url in urls
+        ]
+        return [future.result() for future in futures]
+
+
 def download_to_file(
     url: str,
     output_path: str,
@@ -91,7 +141,7 @@ def download_to_file(
     log = log or logger
     for attempt in range(1, config.download_max_retries + 1):
         try:
-            response = requests.get(url, timeout=config.download_timeout)
+            response = get_http_session().get(url, timeout=config.download_timeout)
             if response.status_code == 200:
                 with open(output_path, "wb") as f:
                     f.write(response.content)
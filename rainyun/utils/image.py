@@ -2,6 +2,7 @@
 
 import cv2
 import numpy as np
+from PIL import Image
 
 
 def decode_image_bytes(image_bytes: bytes, label: str) -> np.ndarray:
@@ -45,3 +46,41 @@ def normalize_gray(image: np.ndarray) -> np.ndarray:
     if len(image.shape) == 2:
         return image
     return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+
+def to_pil_image(image: np.ndarray) -> Image.Image:
+    """BGR/灰度数组转为 PIL 图片（ddddocr 分类可直接接收，无需 JPEG 编解码）。"""
+    if image.ndim == 2:
+        return Image.fromarray(image)
+    return Image.fromarray(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+
+
+class EncodedImage:
+    """原始压缩字节与解码后的数组并存，缺少的一方在首次访问时生成并缓存。"""
+
+    def __init__(self, data: bytes | None = None, *, array: np.ndarray | None = None, label: str = "图片") -> None:
+        if not data and array is None:
+            raise ValueError(f"{label} 数据为空")
+        self.label = label
+        self._data = data or None
+        self._array = array
+        self._reencoded: bytes | None = None
+
+    @property
+    def data(self) -> bytes:
+        """原始字节；仅由数组构造时才编码。"""
+        if self._data is None:
+            self._data = self.reencoded()
+        return self._data
+
+    @property
+    def array(self) -> np.ndarray:
+        if self._array is None:
+            self._array = decode_image_bytes(self._data, self.label)
+        return self._array
+
+    def reencoded(self) -> bytes:
+        """按解码结果重新编码的 JPEG，仅在原始字节不被下游接受时使用。"""
+        if self._reencoded is None:
+            self._reencoded = encode_image_bytes(self.array, self.label)
+        return self._reencoded
@@ -10,6 +10,7 @@ from fastapi.responses import FileResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import JSONResponse
 
+from rainyun.captcha.worker import warmup_in_background
 from rainyun.web.errors import ApiError
 from rainyun.web.logs import init_log_buffer
 from rainyun.web.responses import error_response
@@ -29,6 +30,10 @@ def create_app() -> FastAPI:
     init_log_buffer()
     app = FastAPI(title="Rainyun Web API")
 
+    @app.on_event("startup")
+    async def warmup_models() -> None:
+        warmup_in_background()
+
     @app.exception_handler(ApiError)
     async def api_error_handler(request: Request, exc: ApiError) -> JSONResponse:
         return JSONResponse(
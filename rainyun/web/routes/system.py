@@ -6,6 +6,8 @@ from typing import Mapping
 
 from fastapi import APIRouter, Body, Depends
 
+from rainyun.captcha.models import MODEL_REGISTRY
+from rainyun.captcha.worker import WorkerUnavailableError, peek_inference_client
 from rainyun.data.models import Settings
 from rainyun.data.store import DataStore
 from rainyun.notify import send
@@ -61,6 +63,18 @@ def update_settings(
     return success_response(settings.to_dict())
 
 
+@router.get("/models")
+def get_models() -> dict:
+    data = MODEL_REGISTRY.stats()
+    client = peek_inference_client()
+    if client:
+        try:
+            data["worker"] = client.stats()
+        except WorkerUnavailableError as exc:
+            logger.warning("获取推理进程状态失败: %s", exc)
+    return success_response(data)
+
+
 @router.post("/notify/test")
 def test_notify(payload: dict = Body(default_factory=dict), store: DataStore = Depends(get_store)) -> dict:
     channel_id = payload.get("channel_id")
@@ -44,6 +44,8 @@ const cronPreview = document.getElementById("cron-preview");
 const cronNext = document.getElementById("cron-next");
 const settingTimeout = document.getElementById("setting-timeout");
 const settingMaxDelay = document.getElementById("setting-max-delay");
+const settingCheckinConcurrency = document.getElementById("setting-checkin-concurrency");
+const settingCheckinHttpProbe = document.getElementById("setting-checkin-http-probe");
 const settingDebug = document.getElementById("setting-debug");
 const settingRequestTimeout = document.getElementById("setting-request-timeout");
 const settingMaxRetries = document.getElementById("setting-max-retries");
@@ -54,6 +56,14 @@ const settingDownloadRetryDelay = document.getElementById("setting-download-retr
 const settingCaptchaRetryLimit = document.getElementById("setting-captcha-retry-limit");
 const settingCaptchaRetryUnlimited = document.getElementById("setting-captcha-retry-unlimited");
 const settingCaptchaSaveSamples = document.getElementById("setting-captcha-save-samples");
+const settingCaptchaParallelMatchers = document.getElementById("setting-captcha-parallel-matchers");
+const settingCaptchaCapture = document.getElementById("setting-captcha-capture");
+const settingCaptchaAnswerCache = document.getElementById("setting-captcha-answer-cache");
+const settingCaptchaAnswerCacheSize = document.getElementById("setting-captcha-answer-cache-size");
+const settingCaptchaAdaptiveMatchers = document.getElementById("setting-captcha-adaptive-matchers");
+const settingCaptchaClickDelay = document.getElementById("setting-captcha-click-delay");
+const settingCaptchaSubmitThreshold = document.getElementById("setting-captcha-submit-threshold");
+const settingInferenceThreads = document.getElementById("setting-inference-threads");
 const settingSkipPushTitle = document.getElementById("setting-skip-push-title");
 const saveSettingsBtn = document.getElementById("save-settings");
 
@@ -1599,6 +1609,8 @@ async function loadSettings() {
   updateCronPreview();
   settingTimeout.value = settings.timeout ?? 15;
   settingMaxDelay.value = settings.max_delay ?? 90;
+  settingCheckinConcurrency.value = settings.checkin_concurrency ?? 1;
+  settingCheckinHttpProbe.checked = !!settings.checkin_http_probe;
   settingDebug.checked = !!settings.debug;
   settingRequestTimeout.value = settings.request_timeout ?? 15;
   settingMaxRetries.value = settings.max_retries ?? 3;
@@ -1609,6 +1621,14 @@ async function loadSettings() {
   settingCaptchaRetryLimit.value = settings.captcha_retry_limit ?? 5;
   settingCaptchaRetryUnlimited.checked = !!settings.captcha_retry_unlimited;
   settingCaptchaSaveSamples.checked = !!settings.captcha_save_samples;
+  settingCaptchaParallelMatchers.checked = !!settings.captcha_parallel_matchers;
+  settingCaptchaCapture.checked = !!settings.captcha_capture;
+  settingCaptchaAnswerCache.checked = !!settings.captcha_answer_cache;
+  settingCaptchaAnswerCacheSize.value = settings.captcha_answer_cache_size ?? 500;
+  settingCaptchaAdaptiveMatchers.checked = !!settings.captcha_adaptive_matchers;
+  settingCaptchaClickDelay.value = settings.captcha_click_delay ?? 0.2;
+  settingCaptchaSubmitThreshold.value = settings.captcha_submit_threshold ?? 0;
+  settingInferenceThreads.value = settings.inference_threads || "auto";
   settingSkipPushTitle.value = settings.skip_push_title || "";
   notifyChannels = normalizeNotifyChannels(settings);
   renderNotifyList();
@@ -1890,6 +1910,8 @@ async function saveSettings() {
     cron_schedule: cronSchedule || "0 8 * * *",
     timeout: readNumberValue(settingTimeout, 15),
     max_delay: readNumberValue(settingMaxDelay, 90),
+    checkin_concurrency: readNumberValue(settingCheckinConcurrency, 1),
+    checkin_http_probe: settingCheckinHttpProbe.checked,
     debug: settingDebug.checked,
     request_timeout: readNumberValue(settingRequestTimeout, 15),
     max_retries: readNumberValue(settingMaxRetries, 3),
@@ -1900,6 +1922,14 @@ async function saveSettings() {
     captcha_retry_limit: readNumberValue(settingCaptchaRetryLimit, 5),
     captcha_retry_unlimited: settingCaptchaRetryUnlimited.checked,
     captcha_save_samples: settingCaptchaSaveSamples.checked,
+    captcha_parallel_matchers: settingCaptchaParallelMatchers.checked,
+    captcha_capture: settingCaptchaCapture.checked,
+    captcha_answer_cache: settingCaptchaAnswerCache.checked,
+    captcha_answer_cache_size: readNumberValue(settingCaptchaAnswerCacheSize, 500),
+    captcha_adaptive_matchers: settingCaptchaAdaptiveMatchers.checked,
+    captcha_click_delay: readNumberValue(settingCaptchaClickDelay, 0.2),
+    captcha_submit_threshold: readNumberValue(settingCaptchaSubmitThreshold, 0),
+    inference_threads: settingInferenceThreads.value.trim() || "auto",
     skip_push_title: settingSkipPushTitle.value.trim(),
     notify_config: {},
     notify_channels: notifyChannelsPayload,